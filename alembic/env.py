@@ -14,7 +14,8 @@ from app.core.database import Base
 # Import all models so Alembic can detect them
 from app.modules.auth.models import User, RefreshToken
 from app.modules.requirement_analyzer.models import (
-    AnalysisJob, AnalysisResult, AdmissionCircular, DepartmentRequirement
+    AnalysisJob, AnalysisResult, AdmissionCircular, DepartmentRequirement, UrlValidator, UrlFailure,
+    ExtractionCacheEntry, LlmRateUsage
 )
 from app.modules.student_registration.models import Student, StudentDocument
 from app.modules.requirement_check.models import RequirementCheck
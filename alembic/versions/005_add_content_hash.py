@@ -0,0 +1,38 @@
+"""Add content hash for deduplicating analyzed circulars
+
+Revision ID: 005_content_hash
+Revises: 004_comprehensive_student
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_content_hash'
+down_revision = '004_comprehensive_student'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    analysis_results_columns = {}
+    if 'analysis_results' in inspector.get_table_names():
+        analysis_results_columns = {col['name']: col for col in inspector.get_columns('analysis_results')}
+
+    # Add content hash and reuse tracking to analysis_results (if columns don't exist)
+    if 'content_hash' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('content_hash', sa.String(length=64), nullable=True))
+        op.create_index('ix_analysis_results_content_hash', 'analysis_results', ['content_hash'])
+    if 'reused_from_result_id' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('reused_from_result_id', postgresql.UUID(as_uuid=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'reused_from_result_id')
+    op.drop_index('ix_analysis_results_content_hash', table_name='analysis_results')
+    op.drop_column('analysis_results', 'content_hash')
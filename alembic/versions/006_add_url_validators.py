@@ -0,0 +1,36 @@
+"""Add url_validators table for conditional HTTP revalidation
+
+Revision ID: 006_url_validators
+Revises: 005_content_hash
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_url_validators'
+down_revision = '005_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    # Create url_validators table if it doesn't exist
+    if 'url_validators' not in inspector.get_table_names():
+        op.create_table(
+            'url_validators',
+            sa.Column('url', sa.String(), primary_key=True),
+            sa.Column('etag', sa.String(), nullable=True),
+            sa.Column('last_modified', sa.String(), nullable=True),
+            sa.Column('content_hash', sa.String(length=64), nullable=True),
+            sa.Column('mime_type', sa.String(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('url_validators')
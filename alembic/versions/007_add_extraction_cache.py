@@ -0,0 +1,43 @@
+"""Add extraction_cache table
+
+Revision ID: 007_extraction_cache
+Revises: 006_url_validators
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '007_extraction_cache'
+down_revision = '006_url_validators'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    # Create extraction_cache table if it doesn't exist
+    if 'extraction_cache' not in inspector.get_table_names():
+        op.create_table(
+            'extraction_cache',
+            sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column('content_hash', sa.String(length=64), nullable=False),
+            sa.Column('prompt_version', sa.String(), nullable=False),
+            sa.Column('model_name', sa.String(), nullable=False),
+            sa.Column('data', postgresql.JSONB(), nullable=False),
+            sa.Column('raw_response', sa.Text(), nullable=True),
+            sa.Column('hit_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.Column('last_hit_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+            sa.UniqueConstraint('content_hash', 'prompt_version', 'model_name', name='uq_extraction_cache_key'),
+        )
+        op.create_index('ix_extraction_cache_content_hash', 'extraction_cache', ['content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_extraction_cache_content_hash', table_name='extraction_cache')
+    op.drop_table('extraction_cache')
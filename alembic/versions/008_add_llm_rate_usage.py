@@ -0,0 +1,33 @@
+"""Add llm_rate_usage table for cross-worker LLM rate limiting
+
+Revision ID: 008_llm_rate_usage
+Revises: 007_extraction_cache
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_llm_rate_usage'
+down_revision = '007_extraction_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    # Create llm_rate_usage table if it doesn't exist
+    if 'llm_rate_usage' not in inspector.get_table_names():
+        op.create_table(
+            'llm_rate_usage',
+            sa.Column('window_start', sa.DateTime(timezone=True), primary_key=True),
+            sa.Column('requests', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('tokens', sa.Integer(), nullable=False, server_default='0'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('llm_rate_usage')
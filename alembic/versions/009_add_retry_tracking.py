@@ -0,0 +1,35 @@
+"""Add retry tracking to analysis_results
+
+Revision ID: 009_retry_tracking
+Revises: 008_llm_rate_usage
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_retry_tracking'
+down_revision = '008_llm_rate_usage'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    analysis_results_columns = {}
+    if 'analysis_results' in inspector.get_table_names():
+        analysis_results_columns = {col['name']: col for col in inspector.get_columns('analysis_results')}
+
+    # Add attempt count and last error class (if columns don't exist)
+    if 'attempt_count' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('attempt_count', sa.Integer(), nullable=False, server_default='0'))
+    if 'last_error_class' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('last_error_class', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'last_error_class')
+    op.drop_column('analysis_results', 'attempt_count')
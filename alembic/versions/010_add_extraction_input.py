@@ -0,0 +1,35 @@
+"""Add extraction input and LLM payload size to analysis_results
+
+Revision ID: 010_extraction_input
+Revises: 009_retry_tracking
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_extraction_input'
+down_revision = '009_retry_tracking'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    analysis_results_columns = {}
+    if 'analysis_results' in inspector.get_table_names():
+        analysis_results_columns = {col['name']: col for col in inspector.get_columns('analysis_results')}
+
+    # Add extraction input kind and payload size (if columns don't exist)
+    if 'extraction_input' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('extraction_input', sa.String(), nullable=True))
+    if 'llm_payload_bytes' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('llm_payload_bytes', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'llm_payload_bytes')
+    op.drop_column('analysis_results', 'extraction_input')
@@ -0,0 +1,35 @@
+"""Add page counts to analysis_results
+
+Revision ID: 011_page_filter
+Revises: 010_extraction_input
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_page_filter'
+down_revision = '010_extraction_input'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    analysis_results_columns = {}
+    if 'analysis_results' in inspector.get_table_names():
+        analysis_results_columns = {col['name']: col for col in inspector.get_columns('analysis_results')}
+
+    # Add total and dropped page counts (if columns don't exist)
+    if 'pages_total' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('pages_total', sa.Integer(), nullable=True))
+    if 'pages_dropped' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('pages_dropped', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'pages_dropped')
+    op.drop_column('analysis_results', 'pages_total')
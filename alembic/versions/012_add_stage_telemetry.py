@@ -0,0 +1,51 @@
+"""Add stage timings and token telemetry to analysis_results
+
+Revision ID: 012_stage_telemetry
+Revises: 011_page_filter
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '012_stage_telemetry'
+down_revision = '011_page_filter'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    analysis_results_columns = {}
+    if 'analysis_results' in inspector.get_table_names():
+        analysis_results_columns = {col['name']: col for col in inspector.get_columns('analysis_results')}
+
+    # Add per-stage timings, token counts, model and cache hit (if columns don't exist)
+    if 'stage_timings' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('stage_timings', postgresql.JSONB(), nullable=True))
+    if 'input_tokens' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('input_tokens', sa.Integer(), nullable=True))
+    if 'output_tokens' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('output_tokens', sa.Integer(), nullable=True))
+    if 'model_name' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('model_name', sa.String(), nullable=True))
+    if 'cache_hit' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('cache_hit', sa.Boolean(), nullable=True))
+
+    # The aggregate endpoint scans results by time window
+    existing_indexes = {index['name'] for index in inspector.get_indexes('analysis_results')}
+    if 'ix_analysis_results_updated_at' not in existing_indexes:
+        op.create_index('ix_analysis_results_updated_at', 'analysis_results', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_analysis_results_updated_at', table_name='analysis_results')
+    op.drop_column('analysis_results', 'cache_hit')
+    op.drop_column('analysis_results', 'model_name')
+    op.drop_column('analysis_results', 'output_tokens')
+    op.drop_column('analysis_results', 'input_tokens')
+    op.drop_column('analysis_results', 'stage_timings')
@@ -0,0 +1,32 @@
+"""Add sniffed file type to analysis_results
+
+Revision ID: 013_detected_mime_type
+Revises: 012_stage_telemetry
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '013_detected_mime_type'
+down_revision = '012_stage_telemetry'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    analysis_results_columns = {}
+    if 'analysis_results' in inspector.get_table_names():
+        analysis_results_columns = {col['name']: col for col in inspector.get_columns('analysis_results')}
+
+    # Add the type detected from the file's magic bytes (if column doesn't exist)
+    if 'detected_mime_type' not in analysis_results_columns:
+        op.add_column('analysis_results', sa.Column('detected_mime_type', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('analysis_results', 'detected_mime_type')
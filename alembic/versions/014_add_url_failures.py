@@ -0,0 +1,36 @@
+"""Add url_failures table (negative cache of failed URL fetches)
+
+Revision ID: 014_url_failures
+Revises: 013_detected_mime_type
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '014_url_failures'
+down_revision = '013_detected_mime_type'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    # Create url_failures table if it doesn't exist
+    if 'url_failures' not in inspector.get_table_names():
+        op.create_table(
+            'url_failures',
+            sa.Column('url', sa.String(), primary_key=True),
+            sa.Column('failure_class', sa.String(), nullable=False),
+            sa.Column('status_code', sa.Integer(), nullable=True),
+            sa.Column('failure_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('url_failures')
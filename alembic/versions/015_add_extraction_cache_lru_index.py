@@ -0,0 +1,30 @@
+"""Index extraction_cache.last_hit_at for LRU eviction
+
+Revision ID: 015_cache_lru_index
+Revises: 014_url_failures
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '015_cache_lru_index'
+down_revision = '014_url_failures'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    # Eviction orders the cache by last use (if the index doesn't exist)
+    if 'extraction_cache' in inspector.get_table_names():
+        existing_indexes = {index['name'] for index in inspector.get_indexes('extraction_cache')}
+        if 'ix_extraction_cache_last_hit_at' not in existing_indexes:
+            op.create_index('ix_extraction_cache_last_hit_at', 'extraction_cache', ['last_hit_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_extraction_cache_last_hit_at', table_name='extraction_cache')
@@ -0,0 +1,36 @@
+"""Add prompt version and model to admission_circulars
+
+Revision ID: 016_circular_version
+Revises: 015_cache_lru_index
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '016_circular_version'
+down_revision = '015_cache_lru_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    admission_circulars_columns = {}
+    if 'admission_circulars' in inspector.get_table_names():
+        admission_circulars_columns = {col['name']: col for col in inspector.get_columns('admission_circulars')}
+
+    # Add the extraction that produced each circular (if columns don't exist);
+    # existing circulars stay NULL and are no longer reused for identical files
+    if 'prompt_version' not in admission_circulars_columns:
+        op.add_column('admission_circulars', sa.Column('prompt_version', sa.String(), nullable=True))
+    if 'model_name' not in admission_circulars_columns:
+        op.add_column('admission_circulars', sa.Column('model_name', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('admission_circulars', 'model_name')
+    op.drop_column('admission_circulars', 'prompt_version')
@@ -8,7 +8,16 @@ class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
     
     # Gemini AI Configuration
-    gemini_api_key: str
+    gemini_api_key: str = ""  # Required when extraction_backend is "gemini"
+    gemini_model: str = "gemini-2.5-flash"
+    
+    # Extraction Backend Configuration
+    extraction_backend: str = "gemini"  # "gemini" or "stub" (offline, for load tests)
+    stub_fixtures_dir: Optional[str] = None  # Directory of AdmissionCircularData JSON fixtures
+    stub_latency_ms: int = 0  # Simulated extraction latency
+    stub_latency_jitter_ms: int = 0  # Random +/- jitter added to the latency
+    stub_error_rate: float = 0.0  # Fraction of extractions that fail (0.0-1.0)
+    stub_seed: int = 0  # Seed for latency jitter and error injection
     
     # Database Configuration - Individual components
     db_host: str = "localhost"
@@ -42,6 +51,79 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 30
     
+    # Outbound HTTP Configuration (shared pooled client)
+    http_timeout_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_max_connections_per_host: int = 6
+    http_keepalive_expiry_seconds: float = 30.0
+    http2_enabled: bool = True
+    
+    # Requirement Analyzer Configuration
+    blob_store_dir: str = "data/blobs"  # Content-addressed store for fetched circular files
+    download_chunk_bytes: int = 64 * 1024  # Chunk size when streaming downloads to the blob store
+    download_max_bytes: int = 50 * 1024 * 1024  # Larger files are refused (Content-Length) or aborted mid-download
+    # Negative cache of failed URL fetches (dead URLs fail fast, non-documents skip the download)
+    url_failure_cache_enabled: bool = True
+    url_failure_ttl_seconds: int = 600  # TTL after the first failure, doubled per consecutive failure
+    url_failure_max_ttl_seconds: int = 24 * 3600
+    # Adaptive limit on in-flight extractions across all jobs
+    analysis_initial_concurrency: int = 5
+    analysis_min_concurrency: int = 1
+    analysis_max_concurrency: int = 32
+    analysis_concurrency_window: int = 20  # Completed extractions per adjustment step
+    fetch_max_concurrency: int = 16  # Circular downloads in flight across all jobs (below HTTP_MAX_CONNECTIONS)
+    llm_max_workers: int = 32  # Threads for blocking Gemini SDK calls (hard ceiling on concurrency)
+    # Process-wide LLM quota (requests and tokens per minute)
+    llm_requests_per_minute: int = 1000
+    llm_tokens_per_minute: int = 1000000
+    llm_rate_limit_backend: str = "local"  # "local" or "postgres" (shared across workers)
+    llm_estimated_output_tokens: int = 4000  # Token estimate per request before the real count is known
+    llm_estimated_document_tokens: int = 8000  # Extra estimate when a file is attached
+    llm_inline_max_bytes: int = 4 * 1024 * 1024  # Smaller files are sent inline instead of uploaded
+    llm_file_reuse_seconds: int = 46 * 3600  # Reuse uploaded files this long (they expire after 48h)
+    llm_uploaded_files_max: int = 500  # Uploaded file handles kept for reuse
+    llm_quota_max_retries: int = 3  # Re-queue attempts after a quota (429) rejection
+    llm_quota_backoff_seconds: float = 10.0  # Pause after a quota rejection (multiplied by attempt)
+    llm_response_schema_enabled: bool = True  # Constrain Gemini output to the AdmissionCircularData schema
+    llm_streaming_enabled: bool = True  # Stream responses and save partial circulars while they generate
+    llm_stream_progress_seconds: float = 1.0  # Minimum interval between partial saves of one response
+    # Retries of transient analysis errors
+    retry_max_attempts: int = 3  # Attempts per URL (including the first)
+    retry_base_delay_seconds: float = 2.0  # Backoff base, doubled per attempt (full jitter)
+    retry_max_delay_seconds: float = 60.0
+    retry_job_budget_ratio: float = 0.2  # Retries per job as a fraction of its URLs
+    retry_job_budget_min: int = 5  # ...but at least this many
+    extraction_cache_memory_entries: int = 256  # In-process LRU size in front of the cache table
+    extraction_cache_max_rows: int = 50000  # Least recently used rows beyond this are evicted
+    extraction_cache_evict_interval_seconds: float = 300.0  # Minimum interval between eviction runs
+    # Local PDF text-layer pre-pass (send page text instead of the binary when possible)
+    pdf_text_layer_enabled: bool = True
+    pdf_text_min_chars_per_page: int = 200  # Pages with less text are treated as scanned
+    pdf_text_min_coverage: float = 0.5  # Share of text pages needed to send text (scanned pages go as a sub-PDF)
+    preprocess_max_workers: int = 2  # Processes for CPU-bound document pre-processing
+    # Image circulars: downscale, grayscale and recompress before upload
+    image_preprocess_enabled: bool = True
+    image_max_dimension: int = 2000  # Longest side in pixels (enough for OCR of a printed circular)
+    image_jpeg_quality: int = 80
+    # Relevance filter: drop boilerplate pages (payment instructions, maps, signatures) before extraction
+    page_filter_enabled: bool = True
+    page_filter_min_hits: int = 2  # Requirement keyword hits below which a boilerplate-looking page is dropped
+    page_filter_extra_keywords: str = ""  # Comma-separated extra requirement keywords
+    page_filter_extra_boilerplate: str = ""  # Comma-separated extra boilerplate keywords
+    # Page-chunked extraction of large PDFs (chunks run concurrently, results are merged)
+    chunking_enabled: bool = True
+    chunk_min_pages: int = 20  # PDFs with at least this many pages are chunked
+    chunk_pages: int = 10  # Pages per chunk
+    chunk_overlap_pages: int = 1  # Pages shared by neighbouring chunks (tables across a boundary)
+    chunk_max_parallel: int = 4  # Concurrent chunk requests per document
+    # HTML notice pages: follow circular links, or use the visible page text
+    html_follow_links: bool = True
+    html_max_bytes: int = 2 * 1024 * 1024  # Larger pages are not parsed
+    html_max_links: int = 3  # Candidate documents fetched and analyzed per page
+    html_max_text_chars: int = 20000  # Visible text sent to the model when the page links no document
+    
     model_config = ConfigDict(
         env_file = ".env",
         case_sensitive = False,
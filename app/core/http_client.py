@@ -0,0 +1,158 @@
+"""
+Shared outbound HTTP client registry.
+
+All outbound fetches (circular downloads, Education Board lookups) go through
+one pooled httpx transport with HTTP/2, keep-alive and per-host connection
+limits, instead of opening a fresh client (and TCP+TLS handshake) per call.
+
+httpx connection pools are bound to the event loop they were created on, so
+the registry keeps one transport per running loop: the application loop is
+set up at startup, and background loops get theirs lazily and must call
+`aclose_loop()` before they are closed.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+import httpx
+
+from app.core.config import settings
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that frees its per-host slot once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, semaphore: asyncio.Semaphore):
+        self._stream = stream
+        self._semaphore = semaphore
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._semaphore.release()
+
+
+class _PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """Caps the number of in-flight requests per host on top of the pool limits."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self._max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self._max_per_host)
+
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, semaphore)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class HttpClientRegistry:
+    """Hands out the shared client for the current event loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._transports: Dict[asyncio.AbstractEventLoop, httpx.AsyncBaseTransport] = {}
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _timeout() -> httpx.Timeout:
+        return httpx.Timeout(
+            settings.http_timeout_seconds,
+            connect=settings.http_connect_timeout_seconds,
+        )
+
+    @staticmethod
+    def _build_transport() -> httpx.AsyncBaseTransport:
+        transport = httpx.AsyncHTTPTransport(
+            http2=settings.http2_enabled,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+        )
+        return _PerHostLimitTransport(transport, settings.http_max_connections_per_host)
+
+    def _get_transport(self, loop: asyncio.AbstractEventLoop) -> httpx.AsyncBaseTransport:
+        transport = self._transports.get(loop)
+        if transport is None:
+            transport = self._transports[loop] = self._build_transport()
+        return transport
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared client for the running event loop.
+        Do not close it; its lifecycle is managed by the registry.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    transport=self._get_transport(loop),
+                    timeout=self._timeout(),
+                )
+                self._clients[loop] = client
+            return client
+
+    @asynccontextmanager
+    async def session(self, **kwargs) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Yield a client with its own cookie jar on top of the shared connection pool.
+        Use this for cookie-based flows (e.g. form + CAPTCHA) that must not leak
+        cookies between concurrent callers. Extra kwargs go to `httpx.AsyncClient`.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._get_transport(loop)
+        kwargs.setdefault('timeout', self._timeout())
+        # Not closed on exit: closing a client also closes its (shared) transport
+        yield httpx.AsyncClient(transport=transport, **kwargs)
+
+    async def startup(self) -> None:
+        """Create the shared client for the application event loop."""
+        self.get_client()
+
+    async def aclose_loop(self) -> None:
+        """Close the client and connection pool owned by the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+            transport = self._transports.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+        elif transport is not None:
+            await transport.aclose()
+
+    async def shutdown(self) -> None:
+        """Close the application loop's pool and forget pools of other loops."""
+        await self.aclose_loop()
+        with self._lock:
+            self._clients.clear()
+            self._transports.clear()
+
+
+http_clients = HttpClientRegistry()
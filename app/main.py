@@ -1,9 +1,11 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.core.config import settings
 from app.core.database import engine, Base, get_db, test_database_connection, check_database_exists
+from app.core.http_client import http_clients
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,6 +13,8 @@ logger = logging.getLogger(__name__)
 # Import routers from modules
 from app.modules.auth.routers import router as auth_router
 from app.modules.requirement_analyzer import analyze_router, results_router
+from app.modules.requirement_analyzer.worker import analysis_worker
+from app.modules.requirement_analyzer import preprocess
 from app.modules.student_registration.routers import router as student_router
 from app.modules.requirement_check.routers import router as requirement_check_router
 from app.modules.university_application.routers import router as application_router
@@ -27,6 +31,18 @@ try:
 except Exception as e:
     logger.error(f"Failed to create database tables: {e}")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop shared resources with the application."""
+    await http_clients.startup()
+    analysis_worker.start()
+    yield
+    analysis_worker.stop()
+    preprocess.shutdown()
+    await http_clients.shutdown()
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
@@ -36,6 +52,7 @@ app = FastAPI(
     openapi_url="/openapi.json",
     # Ensure ReDoc can access the OpenAPI spec
     servers=[{"url": "/", "description": "Default server"}],
+    lifespan=lifespan,
 )
 
 # CORS middleware
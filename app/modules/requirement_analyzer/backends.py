@@ -0,0 +1,341 @@
+"""
+Extraction backends for the requirement analyzer.
+
+A backend takes the extraction prompt (plus the fetched document, if any) and
+returns the raw model response text; parsing and validation stay in
+`services.analyze_circular`. `GeminiBackend` talks to Google Gemini, and
+`StubBackend` returns fixture-driven `AdmissionCircularData` offline, with
+configurable latency and error injection, for load-testing without network
+access or an API key.
+
+Select the backend with the EXTRACTION_BACKEND setting ("gemini" or "stub").
+"""
+import asyncio
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.modules.requirement_analyzer import llm_client, telemetry
+from app.modules.requirement_analyzer.rate_limiter import is_quota_error, llm_rate_limiter
+from app.modules.requirement_analyzer.response_schema import CIRCULAR_RESPONSE_SCHEMA
+from app.modules.requirement_analyzer.streaming import ResponseProgress
+from app.modules.requirement_analyzer.schemas import (
+    AdmissionCircularData, ApplicationPeriod, DepartmentRequirement,
+    GpaRequirement, YearRequirement
+)
+from app.modules.requirement_analyzer.upload_cache import is_missing_file_error, uploaded_files
+
+
+# Receives each chunk of a streamed response
+TextCallback = Callable[[str], Awaitable[None]]
+
+
+class ExtractionBackend(ABC):
+    """Interface for LLM extraction backends."""
+
+    # Model identifier reported for results produced by this backend
+    model_name: str = ""
+
+    @abstractmethod
+    async def generate(
+        self,
+        prompt: str,
+        document: Optional[Dict[str, Any]] = None,
+        progress: Optional[ResponseProgress] = None
+    ) -> str:
+        """
+        Run the extraction prompt and return the raw response text.
+        `document` is the file returned by `try_fetch_url`, or None for URL-only prompts.
+        If `progress` is given, the response is streamed and each chunk of text
+        is fed to it as it arrives; it is reset before every attempt, so a
+        retried request does not add to the text of the failed one.
+        """
+
+
+class GeminiBackend(ExtractionBackend):
+    """Extraction with Google Gemini (OCR on uploaded PDFs/images)."""
+
+    def __init__(self, model_name: Optional[str] = None):
+        import google.generativeai as genai
+
+        if not settings.gemini_api_key:
+            raise Exception("GEMINI_API_KEY is required for the gemini extraction backend")
+
+        genai.configure(api_key=settings.gemini_api_key)
+        self.model_name = model_name or settings.gemini_model
+        self.model = genai.GenerativeModel(self.model_name)
+
+    @staticmethod
+    def _safety_settings() -> Dict[Any, Any]:
+        from google.generativeai.types import HarmCategory, HarmBlockThreshold
+
+        return {
+            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+        }
+
+    @staticmethod
+    def _response_text(response: Any) -> Optional[str]:
+        """Extract text from the various Gemini response formats."""
+        if hasattr(response, 'text') and response.text:
+            return response.text
+        if hasattr(response, 'parts') and response.parts:
+            # Response might be in parts
+            for part in response.parts:
+                if hasattr(part, 'text') and part.text:
+                    return part.text
+        if hasattr(response, 'candidates') and response.candidates and len(response.candidates) > 0:
+            # Response might be in candidates
+            candidate = response.candidates[0]
+            if hasattr(candidate, 'content'):
+                if hasattr(candidate.content, 'parts'):
+                    for part in candidate.content.parts:
+                        if hasattr(part, 'text') and part.text:
+                            return part.text
+                elif hasattr(candidate.content, 'text'):
+                    return candidate.content.text
+        return None
+
+    @staticmethod
+    def _generation_config() -> Dict[str, Any]:
+        generation_config = {'response_mime_type': 'application/json'}
+        if settings.llm_response_schema_enabled:
+            # Constrained decoding: strict JSON in the shape of AdmissionCircularData
+            generation_config['response_schema'] = CIRCULAR_RESPONSE_SCHEMA
+        return generation_config
+
+    async def _call_model(self, contents: Any, on_text: Optional[TextCallback]) -> Any:
+        """One generate_content call (streamed if `on_text` is given and LLM_STREAMING_ENABLED is on)."""
+        if on_text is not None and settings.llm_streaming_enabled:
+            return await llm_client.stream_content(
+                self.model,
+                contents,
+                on_text,
+                generation_config=self._generation_config(),
+                safety_settings=self._safety_settings()
+            )
+        return await llm_client.generate_content(
+            self.model,
+            contents,
+            generation_config=self._generation_config(),
+            safety_settings=self._safety_settings()
+        )
+
+    async def _generate_content(
+        self,
+        contents: Any,
+        estimated_tokens: int,
+        progress: Optional[ResponseProgress] = None
+    ) -> Any:
+        """
+        Call generate_content through the process-wide rate limiter.
+        Quota rejections pause the limiter and the request queues again
+        instead of failing, up to LLM_QUOTA_MAX_RETRIES times.
+        """
+        attempt = 0
+        while True:
+            await llm_rate_limiter.acquire(estimated_tokens)
+            try:
+                if progress is not None:
+                    # Each attempt streams a new response from the start
+                    progress.reset()
+                with telemetry.stage(telemetry.STAGE_GENERATE):
+                    response = await self._call_model(contents, progress.feed if progress else None)
+            except Exception as e:
+                if is_quota_error(e) and attempt < settings.llm_quota_max_retries:
+                    attempt += 1
+                    llm_rate_limiter.penalize(settings.llm_quota_backoff_seconds * attempt)
+                    continue
+                raise
+
+            usage = getattr(response, 'usage_metadata', None)
+            telemetry.record_usage(usage)
+            await llm_rate_limiter.settle(estimated_tokens, getattr(usage, 'total_token_count', None))
+            return response
+
+    async def generate(
+        self,
+        prompt: str,
+        document: Optional[Dict[str, Any]] = None,
+        progress: Optional[ResponseProgress] = None
+    ) -> str:
+        # Rough estimate (~4 chars per token); settled with the real count afterwards
+        estimated_tokens = len(prompt) // 4 + settings.llm_estimated_output_tokens
+
+        if document is None:
+            response = await self._generate_content(prompt, estimated_tokens, progress)
+        elif document['size'] <= settings.llm_inline_max_bytes:
+            # Small files go inline with the request: no upload/delete round trips
+            data = await asyncio.to_thread(_read_file, document['path'])
+            response = await self._generate_content(
+                [prompt, {'mime_type': document['mimeType'], 'data': data}],
+                estimated_tokens + settings.llm_estimated_document_tokens,
+                progress
+            )
+        else:
+            # Large files are uploaded once per content hash and the handle is reused
+            with telemetry.stage(telemetry.STAGE_UPLOAD):
+                uploaded_file = await uploaded_files.get(document)
+            try:
+                response = await self._generate_content(
+                    [prompt, uploaded_file],
+                    estimated_tokens + settings.llm_estimated_document_tokens,
+                    progress
+                )
+            except Exception as e:
+                if not is_missing_file_error(e):
+                    raise
+                # The file expired or was deleted remotely: upload again once
+                uploaded_files.invalidate(document['sha256'])
+                with telemetry.stage(telemetry.STAGE_UPLOAD):
+                    uploaded_file = await uploaded_files.get(document)
+                response = await self._generate_content(
+                    [prompt, uploaded_file],
+                    estimated_tokens + settings.llm_estimated_document_tokens,
+                    progress
+                )
+
+        response_text = self._response_text(response)
+        if not response_text:
+            raise Exception("No response generated from Gemini - unable to extract text")
+        return response_text
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as file_handle:
+        return file_handle.read()
+
+
+class StubBackendError(Exception):
+    """Error injected by the stub backend."""
+
+
+def _default_stub_circular() -> AdmissionCircularData:
+    """Canned circular returned by the stub backend when no fixtures are configured."""
+    return AdmissionCircularData(
+        universityName="Stub University",
+        circularLink="",
+        websiteId="stub.example.edu",
+        applicationPeriod=ApplicationPeriod(start="20-11-2025", end="07-12-2025"),
+        examDate="16-01-2026",
+        generalGpaRequirements=GpaRequirement(ssc=3.0, hsc=3.0, total=7.0, with4thSubject=True),
+        yearRequirements=YearRequirement(sscYears=["2021", "2022"], hscYears=["2023", "2024"]),
+        departmentWiseRequirements=[
+            DepartmentRequirement(
+                departmentName=f"{unit} Unit",
+                minGpaSSC=3.0,
+                minGpaHSC=3.0,
+                minGpaTotal=7.0,
+                requiredSubjects=[],
+                admissionTestSubjects=[],
+                seatsTotal=100,
+            )
+            for unit in ("A", "B", "C")
+        ],
+        applicationFee="A Unit: 1320, B Unit: 1100, C Unit: 1100",
+        rawSummary="Canned circular returned by the offline stub extraction backend.",
+        requiredDocuments=[],
+    )
+
+
+class StubBackend(ExtractionBackend):
+    """
+    Offline deterministic backend.
+    Returns one of the fixture circulars (JSON files shaped like `AdmissionCircularData`),
+    picked by a hash of the input so the same URL/document always gets the same data.
+    """
+
+    model_name = "stub"
+    # Pieces a response is split into when streaming
+    STREAM_CHUNKS = 8
+
+    def __init__(
+        self,
+        fixtures_dir: Optional[str] = None,
+        latency_ms: int = 0,
+        latency_jitter_ms: int = 0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.fixtures = self._load_fixtures(fixtures_dir)
+
+    @staticmethod
+    def _load_fixtures(fixtures_dir: Optional[str]) -> List[str]:
+        """Load and validate fixture circulars, serialized as response text."""
+        fixtures = []
+        if fixtures_dir:
+            for path in sorted(glob.glob(os.path.join(fixtures_dir, '*.json'))):
+                with open(path, encoding='utf-8') as fixture_file:
+                    data = AdmissionCircularData.model_validate(json.load(fixture_file))
+                fixtures.append(data.model_dump_json())
+        if not fixtures:
+            fixtures.append(_default_stub_circular().model_dump_json())
+        return fixtures
+
+    def _draw(self) -> tuple[float, bool]:
+        """Draw latency (seconds) and whether to inject an error from the seeded RNG."""
+        with self._lock:
+            jitter = self._random.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+            fail = self._random.random() < self.error_rate
+        return max(0.0, self.latency_ms + jitter) / 1000, fail
+
+    async def generate(
+        self,
+        prompt: str,
+        document: Optional[Dict[str, Any]] = None,
+        progress: Optional[ResponseProgress] = None
+    ) -> str:
+        latency, fail = self._draw()
+        with telemetry.stage(telemetry.STAGE_GENERATE):
+            if latency:
+                await asyncio.sleep(latency)
+        if fail:
+            raise StubBackendError("Injected stub backend error")
+
+        key = document['sha256'] if document else prompt
+        index = int(hashlib.sha256(key.encode('utf-8')).hexdigest(), 16) % len(self.fixtures)
+        response_text = self.fixtures[index]
+        if progress is not None and settings.llm_streaming_enabled:
+            # Deliver the fixture in pieces, like a streamed response
+            progress.reset()
+            size = max(1, len(response_text) // self.STREAM_CHUNKS + 1)
+            for start in range(0, len(response_text), size):
+                await progress.feed(response_text[start:start + size])
+        return response_text
+
+
+_backend: Optional[ExtractionBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_extraction_backend() -> ExtractionBackend:
+    """Return the process-wide extraction backend selected by settings."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if settings.extraction_backend == "gemini":
+                _backend = GeminiBackend()
+            elif settings.extraction_backend == "stub":
+                _backend = StubBackend(
+                    fixtures_dir=settings.stub_fixtures_dir,
+                    latency_ms=settings.stub_latency_ms,
+                    latency_jitter_ms=settings.stub_latency_jitter_ms,
+                    error_rate=settings.stub_error_rate,
+                    seed=settings.stub_seed,
+                )
+            else:
+                raise Exception(f"Unknown extraction backend: {settings.extraction_backend}")
+        return _backend
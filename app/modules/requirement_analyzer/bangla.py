@@ -0,0 +1,111 @@
+"""
+Deterministic Bangla numeral and text normalization of extracted data.
+
+Circulars mix Bangla and English, and the model returns Bangla digits
+(০-৯), combining-character variants and free-form year and GPA values
+("২০২২-২০২৪", "2021/22", "GPA 3.50 (out of 5)"). Instead of spending prompt
+tokens on conversion rules, parsed output is normalized locally:
+
+- every string: Unicode NFC, Bangla digits translated to ASCII, trimmed
+- passing years: single years, lists and ranges ("2021-2023", "2021/22")
+  expanded to sorted four-digit years
+- GPA values: the first GPA-sized number (the lower bound, if it starts a
+  range); ordinals like "4th subject" are ignored
+- counts (seats, quotas, ages): the integer, thousands separators removed
+
+The normalizer applies these per field type.
+"""
+import re
+import unicodedata
+from typing import Any, List, Optional
+
+# Bangla digits (and the Arabic-Indic/Devanagari digits sometimes produced by OCR)
+_DIGITS = str.maketrans(
+    '০১২৩৪৫৬৭৮৯' '٠١٢٣٤٥٦٧٨٩' '०१२३४५६७८९',
+    '0123456789' * 3,
+)
+
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+_INTEGER = re.compile(r'\d{1,3}(?:,\d{2,3})+|\d+')
+_YEAR_RANGE = re.compile(r'((?:19|20)\d{2})\s*(?:-|–|—|to|থেকে)\s*((?:19|20)?\d{2})(?!\d)')
+_YEAR_PAIR = re.compile(r'((?:19|20)\d{2})\s*/\s*(\d{2})(?!\d)')
+_YEAR = re.compile(r'(?<!\d)((?:19|20)\d{2})(?!\d)')
+# "4th", "২য়", "৪র্থ" (য় is decomposed by NFC)
+_ORDINAL = re.compile(r'\d+(?:st|nd|rd|th)\b|\d+(?:র্থ|য\u09bc|ম)', re.IGNORECASE)
+_RANGE_END = re.compile(r'\s*(?:-|–|—|to|থেকে)\s*(\d+(?:\.\d+)?)')
+
+# Longest passing-year span expanded from a range (guards against "2000-2099")
+_MAX_YEAR_SPAN = 10
+
+
+def normalize_text(value: str) -> str:
+    """NFC-normalize a string and translate Bangla digits to ASCII."""
+    if value.isascii():
+        # Nothing to compose or translate
+        return value.strip()
+    return unicodedata.normalize('NFC', value).translate(_DIGITS).strip()
+
+
+def _full_year(start: int, end: str) -> int:
+    """Expand a two-digit year ("22" after 2021) to four digits."""
+    if len(end) == 4:
+        return int(end)
+    return start // 100 * 100 + int(end)
+
+
+def parse_years(value: Any) -> List[str]:
+    """Four-digit years mentioned in a value or list of values, ranges expanded, sorted."""
+    items = value if isinstance(value, list) else [value]
+    years = set()
+    for item in items:
+        if item is None:
+            continue
+        text = normalize_text(str(item))
+        for pattern in (_YEAR_RANGE, _YEAR_PAIR):
+            for match in pattern.finditer(text):
+                start = int(match.group(1))
+                end = _full_year(start, match.group(2))
+                if start <= end <= start + _MAX_YEAR_SPAN:
+                    years.update(range(start, end + 1))
+                else:
+                    years.update((start, end))
+            text = pattern.sub(' ', text)
+        years.update(int(year) for year in _YEAR.findall(text))
+    return [str(year) for year in sorted(years)]
+
+
+def parse_gpa(value: Any) -> Any:
+    """A GPA as a number (the lower bound of a range); other values are returned unchanged."""
+    if not isinstance(value, str):
+        return value
+    text = _ORDINAL.sub(' ', normalize_text(value))
+    for match in _NUMBER.finditer(text):
+        number = float(match.group())
+        # Years, marks and the like are larger than any GPA
+        if number > 10:
+            continue
+        range_end = _RANGE_END.match(text, match.end())
+        if range_end and float(range_end.group(1)) <= 10:
+            return min(number, float(range_end.group(1)))
+        # Later numbers are scales ("out of 5") or other qualifiers
+        return number
+    return None
+
+
+def parse_int(value: Any) -> Any:
+    """A count as an integer ("১,২০০" -> 1200); other values are returned unchanged."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if not isinstance(value, str):
+        return value
+    match = _INTEGER.search(normalize_text(value))
+    return int(match.group().replace(',', '')) if match else None
+
+
+def normalize_string(value: Any) -> Optional[Any]:
+    """`normalize_text` for strings; numbers become strings, anything else is unchanged."""
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return value
@@ -0,0 +1,93 @@
+"""
+Content-addressed blob store for fetched circular documents.
+
+Every downloaded file is stored on local disk under its SHA-256 digest,
+sharded by the first two hex characters (e.g. ``ab/ab12...``), so the same
+PDF is kept exactly once no matter how many URLs or jobs point at it.
+"""
+import hashlib
+import os
+import tempfile
+
+from app.core.config import settings
+
+
+def compute_sha256(content: bytes) -> str:
+    """Return the hex SHA-256 digest of the given bytes."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def blob_path(digest: str) -> str:
+    """Return the on-disk path for a blob digest."""
+    return os.path.join(settings.blob_store_dir, digest[:2], digest)
+
+
+def has_blob(digest: str) -> bool:
+    """Check whether a blob with this digest is already stored."""
+    return os.path.exists(blob_path(digest))
+
+
+def put_blob(content: bytes) -> str:
+    """
+    Store content in the blob store and return its SHA-256 digest.
+    Writing is skipped if a blob with the same digest already exists.
+    """
+    digest = compute_sha256(content)
+    path = blob_path(digest)
+    if os.path.exists(path):
+        return digest
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    # Write to a temp file in the same directory, then atomically rename,
+    # so concurrent writers never expose a partially written blob
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return digest
+
+
+class BlobWriter:
+    """
+    Streams content into the blob store chunk by chunk.
+    Bytes go straight to a staging file on disk while the digest is computed
+    incrementally, so a download never has to be held in memory.
+    """
+
+    def __init__(self):
+        os.makedirs(settings.blob_store_dir, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=settings.blob_store_dir, prefix='.tmp-')
+        self._file = os.fdopen(fd, 'wb')
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> str:
+        """Move the staged content to its digest path and return the digest."""
+        self._file.close()
+        digest = self._hash.hexdigest()
+        path = blob_path(digest)
+        if os.path.exists(path):
+            os.unlink(self._tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._tmp_path, path)
+        return digest
+
+    def discard(self) -> None:
+        """Drop the staged content."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
@@ -0,0 +1,141 @@
+"""
+Page-chunked extraction for large circulars.
+
+A 40-80 page circular in one request is slow and its JSON is sometimes
+truncated. Large PDFs are split into page ranges (with a small overlap so
+tables crossing a boundary are seen whole at least once); each range is
+extracted separately and concurrently, and the partial results are merged
+deterministically:
+
+- scalar fields: first non-empty value in page order
+- nested objects (applicationPeriod, generalGpaRequirements, ...): merged field by field
+- lists of strings: union, in first-seen order
+- departments: concatenated in page order, duplicates (same normalized
+  name, e.g. from the overlap page) merged field by field
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.modules.requirement_analyzer.preprocess import format_pages, page_subset_document
+
+# Free-text fields where every chunk may add something; joined instead of first-wins
+_JOINED_FIELDS = {'rawSummary', 'additionalNotes', 'specialConditions'}
+_DEPARTMENTS_FIELD = 'departmentWiseRequirements'
+
+
+def should_chunk(prepared: Dict[str, Any]) -> bool:
+    """Chunk only PDFs whose page layout is known and that are long enough."""
+    pages_total = prepared.get('pagesTotal')
+    return bool(settings.chunking_enabled and pages_total and pages_total >= settings.chunk_min_pages)
+
+
+def page_ranges(pages_total: int) -> List[Tuple[int, int]]:
+    """0-based [start, stop) page ranges of CHUNK_PAGES pages overlapping by CHUNK_OVERLAP_PAGES."""
+    size = max(1, settings.chunk_pages)
+    step = max(1, size - max(0, settings.chunk_overlap_pages))
+    ranges = []
+    start = 0
+    while start < pages_total:
+        stop = min(start + size, pages_total)
+        ranges.append((start, stop))
+        if stop == pages_total:
+            break
+        start += step
+    return ranges
+
+
+async def build_chunks(document: Dict[str, Any], prepared: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Split a prepared PDF into chunks. Each chunk carries the text of its text
+    pages and, if it has scanned pages, a sub-PDF of those pages for OCR.
+    Pages dropped by the relevance filter are left out.
+    """
+    pages = prepared['pages']
+    text_pages = set(prepared['textPages'] or [])
+    dropped = set(prepared['droppedPages'] or [])
+    chunks = []
+    for start, stop in page_ranges(prepared['pagesTotal']):
+        kept = [index for index in range(start, stop) if index not in dropped]
+        if not kept:
+            continue
+        with_text = [index for index in kept if index in text_pages]
+        scanned = [index for index in kept if index not in text_pages]
+        text = format_pages(pages, with_text) if with_text else None
+        subset = await page_subset_document(document['path'], scanned) if scanned else None
+        chunks.append({
+            'firstPage': start + 1,
+            'lastPage': stop,
+            'text': text,
+            'document': subset,
+            'payloadBytes': (len(text.encode('utf-8')) if text else 0) + (subset['size'] if subset else 0),
+        })
+    return chunks
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _department_key(department: Dict[str, Any]) -> Optional[str]:
+    name = department.get('departmentName')
+    if not isinstance(name, str) or not name.strip():
+        return None
+    return re.sub(r'[\W_]+', ' ', name).strip().casefold()
+
+
+def _merge_values(field: str, current: Any, incoming: Any) -> Any:
+    """Merge one field of two partial results (`current` comes from earlier pages)."""
+    if _is_empty(incoming):
+        return current
+    if _is_empty(current):
+        return incoming
+    if isinstance(current, dict) and isinstance(incoming, dict):
+        return _merge_objects(current, incoming)
+    if isinstance(current, list) and isinstance(incoming, list):
+        merged = list(current)
+        merged.extend(item for item in incoming if item not in current)
+        return merged
+    if field in _JOINED_FIELDS and isinstance(current, str) and isinstance(incoming, str):
+        if incoming in current:
+            return current
+        return f"{current} {incoming}"
+    return current
+
+
+def _merge_objects(current: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(current)
+    for field, value in incoming.items():
+        merged[field] = _merge_values(field, merged.get(field), value)
+    return merged
+
+
+def merge_chunk_data(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge parsed chunk results (in page order) into one circular dict."""
+    merged: Dict[str, Any] = {}
+    departments: List[Dict[str, Any]] = []
+    department_index: Dict[str, int] = {}
+
+    for part in parts:
+        for field, value in part.items():
+            if field == _DEPARTMENTS_FIELD:
+                continue
+            merged[field] = _merge_values(field, merged.get(field), value)
+
+        chunk_departments = part.get(_DEPARTMENTS_FIELD)
+        if not isinstance(chunk_departments, list):
+            continue
+        for department in chunk_departments:
+            if not isinstance(department, dict):
+                continue
+            key = _department_key(department)
+            if key is not None and key in department_index:
+                position = department_index[key]
+                departments[position] = _merge_objects(departments[position], department)
+                continue
+            if key is not None:
+                department_index[key] = len(departments)
+            departments.append(department)
+
+    merged[_DEPARTMENTS_FIELD] = departments
+    return merged
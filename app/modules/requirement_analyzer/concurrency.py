@@ -0,0 +1,243 @@
+"""
+Adaptive concurrency control for LLM extractions.
+
+`AdaptiveLimiter` is an AIMD limiter shared by every job in the process:
+after each window of completed extractions it raises the limit by one slot
+while p95 latency and error rate stay healthy (and the limit was actually
+reached), and cuts it multiplicatively on unhealthy windows. Overload signals
+(HTTP 429/503, quota errors, timeouts) cut the limit immediately.
+
+Only real backend calls are sampled: extraction cache hits never take a
+slot. The latency baseline is a slow moving average of window p95s, so one
+fast window (or a burst of short documents) does not make every later
+window look unhealthy.
+
+Downloads are bounded separately by `get_fetch_semaphore()`: a job's URLs
+fetch before they queue for an extraction slot, and without a bound a large
+job would exhaust the shared HTTP connection pool.
+
+The limiter lives on the analysis worker loop; `stats()` may be read from
+any thread.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+
+OUTCOME_OK = "ok"
+OUTCOME_ERROR = "error"
+OUTCOME_OVERLOAD = "overload"
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Check whether an error means the upstream is overloaded or rate limiting us."""
+    if isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)):
+        return True
+    try:
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.TooManyRequests,
+        )):
+            return True
+    except ImportError:
+        pass
+    # By status only: messages (validation errors, quoted model output) can mention "quota" or "429"
+    status = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    return status in (429, 503)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter with FIFO waiters."""
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        window_size: int = 20,
+        decrease_factor: float = 0.7,
+        max_error_rate: float = 0.1,
+        latency_tolerance: float = 2.0,
+        overload_cooldown_seconds: float = 5.0,
+        baseline_smoothing: float = 0.1,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.window_size = window_size
+        self.decrease_factor = decrease_factor
+        self.max_error_rate = max_error_rate
+        self.latency_tolerance = latency_tolerance
+        self.overload_cooldown_seconds = overload_cooldown_seconds
+        self.baseline_smoothing = baseline_smoothing
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._samples: Deque[Tuple[float, bool]] = deque()
+        self._window_saturated = False
+        self._last_decrease = 0.0
+
+        # Observability
+        self.baseline_p95: Optional[float] = None
+        self.last_p95: Optional[float] = None
+        self.last_error_rate: Optional[float] = None
+        self.completed = 0
+        self.failed = 0
+        self.overloads = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    async def acquire(self) -> None:
+        """Wait for a free slot (first come, first served)."""
+        if self.in_flight < self.capacity and not self._waiters:
+            self._take_slot()
+            return
+
+        self._window_saturated = True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted just before cancellation: hand it back
+                self.in_flight -= 1
+                self._wake_waiters()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _take_slot(self) -> None:
+        self.in_flight += 1
+        if self.in_flight >= self.capacity:
+            self._window_saturated = True
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._take_slot()
+            waiter.set_result(None)
+
+    def release(self, latency_seconds: float, outcome: str) -> None:
+        """Free a slot and feed the outcome of the extraction into the controller."""
+        self.in_flight -= 1
+        self.completed += 1
+        if outcome != OUTCOME_OK:
+            self.failed += 1
+        self._record(latency_seconds, outcome)
+        self._wake_waiters()
+
+    def _record(self, latency_seconds: float, outcome: str) -> None:
+        if outcome == OUTCOME_OVERLOAD:
+            self.overloads += 1
+            now = time.monotonic()
+            # One multiplicative decrease per cooldown, not one per failed request
+            if now - self._last_decrease >= self.overload_cooldown_seconds:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
+            self._samples.clear()
+            self._window_saturated = False
+            return
+
+        self._samples.append((latency_seconds, outcome != OUTCOME_OK))
+        if len(self._samples) < self.window_size:
+            return
+
+        latencies = sorted(latency for latency, _ in self._samples)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        error_rate = sum(1 for _, failed in self._samples if failed) / len(self._samples)
+        self.last_p95 = p95
+        self.last_error_rate = error_rate
+
+        # Baseline is a slow EWMA of window p95s (in both directions)
+        if self.baseline_p95 is None:
+            self.baseline_p95 = p95
+        else:
+            self.baseline_p95 += (p95 - self.baseline_p95) * self.baseline_smoothing
+
+        healthy = (
+            error_rate <= self.max_error_rate
+            and p95 <= self.baseline_p95 * self.latency_tolerance
+        )
+        if not healthy:
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        elif self._window_saturated:
+            # Only grow when the current limit was actually the bottleneck
+            self.limit = min(self.max_limit, self.limit + 1)
+
+        self._samples.clear()
+        self._window_saturated = self.in_flight >= self.capacity
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of one extraction and record its outcome."""
+        await self.acquire()
+        start = time.monotonic()
+        outcome = OUTCOME_OK
+        try:
+            yield
+        except Exception as e:
+            outcome = OUTCOME_OVERLOAD if is_overload_error(e) else OUTCOME_ERROR
+            raise
+        finally:
+            self.release(time.monotonic() - start, outcome)
+
+    def stats(self) -> dict:
+        """Current limit, utilization and controller state."""
+        capacity = self.capacity
+        return {
+            'limit': capacity,
+            'limit_exact': round(self.limit, 2),
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'in_flight': self.in_flight,
+            'waiting': len(self._waiters),
+            'utilization': round(self.in_flight / capacity, 3),
+            'last_p95_ms': int(self.last_p95 * 1000) if self.last_p95 is not None else None,
+            'baseline_p95_ms': int(self.baseline_p95 * 1000) if self.baseline_p95 is not None else None,
+            'last_error_rate': self.last_error_rate,
+            'completed': self.completed,
+            'failed': self.failed,
+            'overloads': self.overloads,
+        }
+
+
+# Process-wide bound on in-flight circular downloads across all jobs, created
+# on the loop that first uses it (an asyncio.Semaphore binds to one loop)
+_fetch_semaphore: Optional[asyncio.Semaphore] = None
+_fetch_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_fetch_semaphore() -> asyncio.Semaphore:
+    """The download semaphore of the running event loop."""
+    global _fetch_semaphore, _fetch_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _fetch_semaphore is None or _fetch_semaphore_loop is not loop:
+        _fetch_semaphore = asyncio.Semaphore(settings.fetch_max_concurrency)
+        _fetch_semaphore_loop = loop
+    return _fetch_semaphore
+
+
+# Process-wide limiter for in-flight extractions across all jobs
+analysis_limiter = AdaptiveLimiter(
+    initial_limit=settings.analysis_initial_concurrency,
+    min_limit=settings.analysis_min_concurrency,
+    max_limit=settings.analysis_max_concurrency,
+    window_size=settings.analysis_concurrency_window,
+)
@@ -0,0 +1,195 @@
+"""
+Extraction cache for LLM results.
+
+Parsed extractions are keyed by (content hash, prompt version, model name) and
+kept in the `extraction_cache` Postgres table, with a small in-process LRU in
+front of it. Re-running a job or re-submitting the same URLs then reuses the
+parsed JSON instead of repeating the Gemini call. Bump the prompt version when
+a prompt changes so stale entries stop matching.
+
+Rows beyond EXTRACTION_CACHE_MAX_ROWS are evicted least recently used first,
+in batches and at most once per EXTRACTION_CACHE_EVICT_INTERVAL_SECONDS, not
+on every write. Lookups and writes use blocking sessions; async callers run
+them with `asyncio.to_thread`.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.modules.requirement_analyzer.models import ExtractionCacheEntry
+from app.modules.requirement_analyzer.schemas import AdmissionCircularData
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+# Rows deleted per eviction run (the rest go in the next run)
+_EVICT_BATCH = 1000
+
+
+class ExtractionCache:
+    """Two-level (memory LRU + Postgres) cache of parsed extractions."""
+
+    def __init__(self, max_memory_entries: int, max_rows: int):
+        self.max_memory_entries = max_memory_entries
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[CacheKey, Tuple[dict, Optional[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_eviction = 0.0
+
+    def _remember(self, key: CacheKey, data: dict, raw_response: Optional[str]) -> None:
+        with self._lock:
+            self._memory[key] = (data, raw_response)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, content_hash: str, prompt_version: str, model_name: str) -> Optional[Tuple[AdmissionCircularData, Optional[str]]]:
+        """Return the cached (data, raw_response) for the key, or None on a miss."""
+        key = (content_hash, prompt_version, model_name)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+
+        if cached is None:
+            db = SessionLocal()
+            try:
+                entry = db.query(ExtractionCacheEntry).filter(
+                    ExtractionCacheEntry.content_hash == content_hash,
+                    ExtractionCacheEntry.prompt_version == prompt_version,
+                    ExtractionCacheEntry.model_name == model_name
+                ).first()
+                if entry is None:
+                    return None
+                entry.hit_count += 1
+                entry.last_hit_at = datetime.now(timezone.utc)
+                db.commit()
+                cached = (entry.data, entry.raw_response)
+            except Exception as e:
+                logger.warning(f"Extraction cache lookup failed: {e}")
+                return None
+            finally:
+                db.close()
+            self._remember(key, *cached)
+
+        data, raw_response = cached
+        return AdmissionCircularData(**data), raw_response
+
+    def _eviction_due(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_eviction:
+                return False
+            self._next_eviction = now + settings.extraction_cache_evict_interval_seconds
+            return True
+
+    def _evict(self, db: Session) -> None:
+        """Delete up to _EVICT_BATCH least recently used rows beyond the size bound."""
+        # last_hit_at of the oldest row that may stay (an index scan of max_rows entries)
+        cutoff = db.query(ExtractionCacheEntry.last_hit_at).order_by(
+            ExtractionCacheEntry.last_hit_at.desc()
+        ).offset(self.max_rows).limit(1).scalar()
+        if cutoff is None:
+            return
+        stale_ids = select(ExtractionCacheEntry.id).where(
+            ExtractionCacheEntry.last_hit_at <= cutoff
+        ).order_by(ExtractionCacheEntry.last_hit_at).limit(_EVICT_BATCH)
+        db.query(ExtractionCacheEntry).filter(
+            ExtractionCacheEntry.id.in_(stale_ids.scalar_subquery())
+        ).delete(synchronize_session=False)
+
+    def put(self, content_hash: str, prompt_version: str, model_name: str,
+            data: AdmissionCircularData, raw_response: Optional[str]) -> None:
+        """Store a parsed extraction (and periodically evict the least recently used rows)."""
+        key = (content_hash, prompt_version, model_name)
+        data_dict = data.model_dump()
+        self._remember(key, data_dict, raw_response)
+
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            statement = insert(ExtractionCacheEntry).values(
+                content_hash=content_hash,
+                prompt_version=prompt_version,
+                model_name=model_name,
+                data=data_dict,
+                raw_response=raw_response,
+                hit_count=0,
+                last_hit_at=now,
+            ).on_conflict_do_update(
+                constraint='uq_extraction_cache_key',
+                set_={'data': data_dict, 'raw_response': raw_response, 'last_hit_at': now},
+            )
+            db.execute(statement)
+
+            # Size-bounded eviction, batched and not on every write
+            if self._eviction_due():
+                self._evict(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Extraction cache write failed: {e}")
+        finally:
+            db.close()
+
+    def invalidate(self, content_hash: Optional[str] = None, prompt_version: Optional[str] = None,
+                   model_name: Optional[str] = None) -> int:
+        """
+        Remove cached extractions matching all given filters (all entries if none given).
+        Returns the number of database rows deleted.
+        """
+        def matches(key: CacheKey) -> bool:
+            return ((content_hash is None or key[0] == content_hash)
+                    and (prompt_version is None or key[1] == prompt_version)
+                    and (model_name is None or key[2] == model_name))
+
+        with self._lock:
+            for key in [key for key in self._memory if matches(key)]:
+                del self._memory[key]
+
+        db = SessionLocal()
+        try:
+            query = db.query(ExtractionCacheEntry)
+            if content_hash is not None:
+                query = query.filter(ExtractionCacheEntry.content_hash == content_hash)
+            if prompt_version is not None:
+                query = query.filter(ExtractionCacheEntry.prompt_version == prompt_version)
+            if model_name is not None:
+                query = query.filter(ExtractionCacheEntry.model_name == model_name)
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        """Return cache size information."""
+        db = SessionLocal()
+        try:
+            rows = db.query(ExtractionCacheEntry).count()
+        finally:
+            db.close()
+        with self._lock:
+            memory_entries = len(self._memory)
+        return {
+            'memory_entries': memory_entries,
+            'max_memory_entries': self.max_memory_entries,
+            'rows': rows,
+            'max_rows': self.max_rows,
+        }
+
+
+extraction_cache = ExtractionCache(
+    max_memory_entries=settings.extraction_cache_memory_entries,
+    max_rows=settings.extraction_cache_max_rows,
+)
@@ -0,0 +1,101 @@
+"""
+Circular links and visible text of HTML notice pages.
+
+Many circular URLs point at a university notice page rather than the PDF
+itself. The page is parsed (BeautifulSoup + lxml, in a worker thread) and its
+PDF/image anchors are scored with admission keywords in the link text, title
+and file name. Candidate documents are then fetched and analyzed like a direct
+download. If the page links no document, its visible text is sent to the
+model as a small text input instead of a URL-only (knowledge-based) prompt.
+"""
+import re
+from typing import Any, Dict, List
+from urllib.parse import unquote, urldefrag, urljoin
+
+from app.core.config import settings
+
+LINK_KEYWORDS = (
+    # English
+    'admission', 'circular', 'notice', 'prospectus', 'unit', 'undergraduate',
+    'honours', 'honors', 'bachelor', 'eligib', 'requirement', 'apply', 'application',
+    # Bangla
+    'ভর্তি', 'বিজ্ঞপ্তি', 'নোটিশ', 'সার্কুলার', 'ইউনিট', 'আবেদন', 'স্নাতক',
+)
+
+_DOCUMENT_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+# Elements whose text is never shown to a reader
+_HIDDEN_TAGS = ['script', 'style', 'noscript', 'template', 'svg', 'head']
+
+
+def _is_document_link(href: str) -> bool:
+    path = href.split('?', 1)[0].lower()
+    return path.endswith(_DOCUMENT_EXTENSIONS)
+
+
+def _keyword_hits(text: str) -> int:
+    text = text.casefold()
+    return sum(1 for keyword in LINK_KEYWORDS if keyword in text)
+
+
+def find_candidate_links(html: str, base_url: str) -> List[str]:
+    """
+    Absolute URLs of the PDF/image links on a page that look like admission
+    circulars, best match first (at most HTML_MAX_LINKS).
+
+    A link needs at least one keyword hit in its text, title or file name, unless it
+    is the only document linked from the page.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'lxml')
+    base = soup.find('base', href=True)
+    if base:
+        base_url = urljoin(base_url, base['href'])
+
+    scored: Dict[str, int] = {}
+    order: List[str] = []
+    for anchor in soup.find_all('a', href=True):
+        href = anchor['href'].strip()
+        if not href or href.startswith(('mailto:', 'tel:', 'javascript:')):
+            continue
+        link, _ = urldefrag(urljoin(base_url, href))
+        if not link.startswith(('http://', 'https://')) or not _is_document_link(link):
+            continue
+        # File name only: the directory often names the notice page itself
+        filename = unquote(link.split('?', 1)[0].rsplit('/', 1)[-1])
+        label = ' '.join([anchor.get_text(' ', strip=True), anchor.get('title', ''), filename])
+        hits = _keyword_hits(label)
+        if link not in scored:
+            order.append(link)
+            scored[link] = hits
+        else:
+            scored[link] = max(scored[link], hits)
+
+    if len(order) == 1:
+        return order
+    candidates = [link for link in order if scored[link] > 0]
+    # Stable sort keeps page order among links with the same score
+    candidates.sort(key=lambda link: scored[link], reverse=True)
+    return candidates[:settings.html_max_links]
+
+
+def visible_text(html: str) -> str:
+    """Readable text of a page (scripts, styles and markup removed), at most HTML_MAX_TEXT_CHARS."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'lxml')
+    for element in soup(_HIDDEN_TAGS):
+        element.decompose()
+    text = soup.get_text('\n', strip=True)
+    text = re.sub(r'[ \t\xa0]+', ' ', text)
+    text = re.sub(r'\n\s*\n+', '\n', text)
+    return text[:settings.html_max_text_chars]
+
+
+def parse_page(page: Dict[str, Any]) -> Dict[str, Any]:
+    """Candidate circular links and visible text of a page fetched by `try_fetch_url`."""
+    return {
+        'links': find_candidate_links(page['html'], page['finalUrl']),
+        'text': visible_text(page['html']),
+    }
@@ -0,0 +1,88 @@
+"""
+Non-blocking wrappers around the synchronous google-generativeai calls.
+
+`genai.upload_file`, `GenerativeModel.generate_content` and `genai.delete_file`
+block on network I/O. They run in a dedicated, bounded thread pool so the job
+event loop keeps driving other URLs while an extraction is in flight, and N
+concurrency slots really mean N concurrent extractions.
+
+Streaming generation iterates the response in the same pool and hands each
+text chunk back to the event loop as it arrives.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+
+
+# Shared by every job in the process; bounds the number of blocking SDK calls
+_executor = ThreadPoolExecutor(
+    max_workers=settings.llm_max_workers,
+    thread_name_prefix="gemini",
+)
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking call in the LLM thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+async def upload_file(**kwargs) -> Any:
+    """Non-blocking `genai.upload_file`."""
+    import google.generativeai as genai
+    return await run_blocking(genai.upload_file, **kwargs)
+
+
+async def generate_content(model: Any, contents: Any, **kwargs) -> Any:
+    """Non-blocking `model.generate_content` on a `genai.GenerativeModel`."""
+    return await run_blocking(model.generate_content, contents, **kwargs)
+
+
+_STREAM_END = object()
+
+
+async def stream_content(
+    model: Any,
+    contents: Any,
+    on_text: Callable[[str], Awaitable[None]],
+    **kwargs
+) -> Any:
+    """
+    Streaming `model.generate_content`: every text chunk is passed to `on_text`
+    on the event loop while the stream is read in the LLM thread pool.
+    Returns the complete response (text and usage metadata) once the stream ends.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def consume() -> Any:
+        try:
+            response = model.generate_content(contents, stream=True, **kwargs)
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. only a finish reason)
+                    continue
+                if text:
+                    loop.call_soon_threadsafe(queue.put_nowait, text)
+            return response
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+
+    future = loop.run_in_executor(_executor, consume)
+    while True:
+        text = await queue.get()
+        if text is _STREAM_END:
+            break
+        await on_text(text)
+    return await future
+
+
+async def delete_file(name: str) -> None:
+    """Non-blocking `genai.delete_file`."""
+    import google.generativeai as genai
+    await run_blocking(genai.delete_file, name)
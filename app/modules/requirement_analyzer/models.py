@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Enum, Integer, ForeignKey, Text, Float, Boolean
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy import Column, String, DateTime, Enum, Integer, ForeignKey, Text, Float, Boolean, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -47,8 +47,22 @@ class AnalysisResult(Base):
     processing_time_ms = Column(Integer, nullable=True)  # Time taken to process in milliseconds
     file_size_bytes = Column(Integer, nullable=True)  # File size if applicable
     file_mime_type = Column(String, nullable=True)  # MIME type of the file
+    detected_mime_type = Column(String, nullable=True)  # Type sniffed from the file's first bytes (None if not recognized)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the fetched file
+    reused_from_result_id = Column(UUID(as_uuid=True), nullable=True)  # Source result if circular data was reused
+    attempt_count = Column(Integer, default=0, nullable=False)  # Analysis attempts made (including retries)
+    last_error_class = Column(String, nullable=True)  # "transient" or "permanent"
+    extraction_input = Column(String, nullable=True)  # What the model got: text, mixed, file, image, html, links, url or cache
+    llm_payload_bytes = Column(Integer, nullable=True)  # Bytes sent to the model (text + uploaded file)
+    pages_total = Column(Integer, nullable=True)  # Pages in the fetched PDF
+    pages_dropped = Column(Integer, nullable=True)  # Pages left out by the relevance filter
+    stage_timings = Column(JSONB, nullable=True)  # Milliseconds per stage: fetch, preprocess, upload, generate, parse, persist
+    input_tokens = Column(Integer, nullable=True)  # Prompt tokens reported by the model
+    output_tokens = Column(Integer, nullable=True)  # Response tokens reported by the model
+    model_name = Column(String, nullable=True)  # Model that produced (or cached) the extraction
+    cache_hit = Column(Boolean, nullable=True)  # Served from the extraction cache or an identical earlier file
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False, index=True)
     
     # Relationships
     job = relationship("AnalysisJob", back_populates="results")
@@ -123,6 +137,10 @@ class AdmissionCircular(Base):
     # Raw Data (for debugging/backup)
     raw_response = Column(Text, nullable=True)  # Store raw JSON response from Gemini
     
+    # Extraction that produced the data (identical files are only reused for the same prompt and model)
+    prompt_version = Column(String, nullable=True)
+    model_name = Column(String, nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -174,3 +192,54 @@ class DepartmentRequirement(Base):
     # Relationships
     circular = relationship("AdmissionCircular", back_populates="department_requirements")
 
+
+
+class UrlValidator(Base):
+    """HTTP cache validators from the last successful fetch of a circular URL."""
+    __tablename__ = "url_validators"
+
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)  # ETag response header
+    last_modified = Column(String, nullable=True)  # Last-Modified response header
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the file served with these validators
+    mime_type = Column(String, nullable=True)  # MIME type of that file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class UrlFailure(Base):
+    """Recent failed fetches of a circular URL (negative cache, see url_failures)."""
+    __tablename__ = "url_failures"
+
+    url = Column(String, primary_key=True)  # Normalized URL
+    failure_class = Column(String, nullable=False)  # not_found, http_error, timeout, connection, unsupported, too_large, error
+    status_code = Column(Integer, nullable=True)  # HTTP status of the last failure, if any
+    failure_count = Column(Integer, default=0, nullable=False)  # Consecutive failures (doubles the TTL)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # The URL is fetched again after this
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class ExtractionCacheEntry(Base):
+    """Parsed LLM extraction keyed by document hash, prompt version and model."""
+    __tablename__ = "extraction_cache"
+    __table_args__ = (
+        UniqueConstraint('content_hash', 'prompt_version', 'model_name', name='uq_extraction_cache_key'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    content_hash = Column(String(64), nullable=False, index=True)  # SHA-256 of the document (or URL for URL-only prompts)
+    prompt_version = Column(String, nullable=False)
+    model_name = Column(String, nullable=False)
+    data = Column(JSONB, nullable=False)  # Parsed AdmissionCircularData
+    raw_response = Column(Text, nullable=True)  # Raw model response
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_hit_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)  # LRU eviction order
+
+
+class LlmRateUsage(Base):
+    """LLM requests and tokens used per minute, shared by all API workers."""
+    __tablename__ = "llm_rate_usage"
+
+    window_start = Column(DateTime(timezone=True), primary_key=True)  # Start of the minute
+    requests = Column(Integer, default=0, nullable=False)
+    tokens = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,99 @@
+"""
+Normalizer for extracted circular data.
+
+Model output often has nested objects missing or null and lists set to null
+or to a scalar. `normalize_circular` fills in the nested objects and lists
+the schema requires, drops stray items (non-objects in the department list,
+nested values in string lists) and applies the Bangla numeral/text
+normalization per field type (see `bangla`): strings are NFC-normalized with
+ASCII digits, GPA values and counts are parsed from strings, and passing
+years are expanded into four-digit year lists.
+"""
+from typing import Any, Dict, List
+
+from app.modules.requirement_analyzer.bangla import normalize_string, parse_gpa, parse_int, parse_years
+from app.modules.requirement_analyzer.schemas import AdmissionCircularData
+
+# Bump when normalization changes: cached and reused extractions are stored
+# normalized, so the version is part of their key (see `extraction_key`)
+NORMALIZER_VERSION = "norm-v1"
+
+# Field types of AdmissionCircularData
+_CIRCULAR_STRINGS = (
+    'universityName', 'websiteId', 'examDate', 'examTime', 'examVenue', 'examDuration',
+    'applicationFee', 'rawSummary', 'nationalityRequirement', 'genderRequirement',
+    'contactEmail', 'contactPhone', 'contactAddress', 'quotaOther', 'additionalNotes',
+)
+_CIRCULAR_INTS = ('ageLimitMin', 'ageLimitMax', 'quotaFreedomFighter', 'quotaTribal')
+_PERIOD_STRINGS = ('start', 'end')
+_GPA_FIELDS = ('ssc', 'hsc', 'total')
+_YEAR_FIELDS = ('sscYears', 'hscYears')
+
+# Field types of DepartmentRequirement
+_DEPARTMENT_STRINGS = ('departmentName', 'departmentCode', 'specialConditions', 'admissionTestFormat')
+_DEPARTMENT_GPAS = ('minGpaSSC', 'minGpaHSC', 'minGpaTotal')
+_DEPARTMENT_INTS = ('seatsTotal', 'seatsQuotaFreedomFighter', 'seatsQuotaTribal', 'seatsQuotaOther')
+_DEPARTMENT_LISTS = ('requiredSubjects', 'admissionTestSubjects')
+
+
+def _object(value: Any) -> Dict[str, Any]:
+    """A nested object (null or non-object -> {})."""
+    return value if isinstance(value, dict) else {}
+
+
+def _string_list(value: Any) -> List[Any]:
+    """A list of strings (null or non-list -> []); numbers become strings, other items are dropped."""
+    if not isinstance(value, list):
+        return []
+    return [
+        normalize_string(item) for item in value
+        if isinstance(item, (str, int, float)) and not isinstance(item, bool)
+    ]
+
+
+def _normalize_fields(value: Dict[str, Any], strings=(), gpas=(), ints=()) -> None:
+    """Normalize the present fields of an object in place by type."""
+    for name in strings:
+        if name in value:
+            value[name] = normalize_string(value[name])
+    for name in gpas:
+        if name in value:
+            value[name] = parse_gpa(value[name])
+    for name in ints:
+        if name in value:
+            value[name] = parse_int(value[name])
+
+
+def _normalize_department(department: Dict[str, Any]) -> Dict[str, Any]:
+    _normalize_fields(department, _DEPARTMENT_STRINGS, _DEPARTMENT_GPAS, _DEPARTMENT_INTS)
+    for name in _DEPARTMENT_LISTS:
+        department[name] = _string_list(department.get(name))
+    return department
+
+
+def normalize_circular(data: Dict[str, Any], circular_link: str) -> AdmissionCircularData:
+    """
+    Normalize and validate parsed model output into `AdmissionCircularData`.
+    `data` is modified in place; `circularLink` is always set to the analyzed URL.
+    """
+    data['circularLink'] = circular_link
+    _normalize_fields(data, _CIRCULAR_STRINGS, ints=_CIRCULAR_INTS)
+
+    # Nested objects the schema requires
+    data['applicationPeriod'] = _object(data.get('applicationPeriod'))
+    _normalize_fields(data['applicationPeriod'], _PERIOD_STRINGS)
+    data['generalGpaRequirements'] = _object(data.get('generalGpaRequirements'))
+    _normalize_fields(data['generalGpaRequirements'], gpas=_GPA_FIELDS)
+    years = data['yearRequirements'] = _object(data.get('yearRequirements'))
+    for name in _YEAR_FIELDS:
+        # A single string ("2021-2023") is expanded as well
+        years[name] = parse_years(years.get(name))
+
+    # Lists (stray scalars in the department list are dropped)
+    departments = data.get('departmentWiseRequirements')
+    data['departmentWiseRequirements'] = [
+        _normalize_department(department) for department in departments if isinstance(department, dict)
+    ] if isinstance(departments, list) else []
+    data['requiredDocuments'] = _string_list(data.get('requiredDocuments'))
+
+    return AdmissionCircularData(**data)
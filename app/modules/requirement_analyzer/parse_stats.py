@@ -0,0 +1,50 @@
+"""
+Parse outcome counters for model responses.
+
+Every extraction response is counted per (model, prompt version) as
+`strict` (valid JSON as returned), `repaired` (only the tolerant parser could
+read it) or `failed` (unreadable, the result fails). With schema-constrained
+output, `repaired` and `failed` should stay near zero; a rise after a model
+or prompt change shows up here before it shows up as failed results.
+"""
+import threading
+from typing import Dict, Tuple
+
+PARSE_STRICT = "strict"
+PARSE_REPAIRED = "repaired"
+PARSE_FAILED = "failed"
+
+
+class ParseStats:
+    """In-process parse outcome counts by model and prompt version."""
+
+    def __init__(self):
+        self._counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, prompt_version: str, outcome: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(
+                (model_name, prompt_version),
+                {PARSE_STRICT: 0, PARSE_REPAIRED: 0, PARSE_FAILED: 0},
+            )
+            counts[outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = []
+            for (model_name, prompt_version), counts in sorted(self._counts.items()):
+                total = sum(counts.values())
+                entries.append({
+                    'model_name': model_name,
+                    'prompt_version': prompt_version,
+                    'strict': counts[PARSE_STRICT],
+                    'repaired': counts[PARSE_REPAIRED],
+                    'failed': counts[PARSE_FAILED],
+                    'failure_rate': round(counts[PARSE_FAILED] / total, 4) if total else 0.0,
+                })
+        return {'entries': entries}
+
+
+# Shared by every job in the process
+parse_stats = ParseStats()
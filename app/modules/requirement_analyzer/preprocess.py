@@ -0,0 +1,246 @@
+"""
+Local pre-processing of fetched documents before extraction.
+
+Many circulars are born-digital PDFs with a text layer. Their text is
+extracted locally (pypdf, in a process pool so the event loop is not blocked)
+and sent to the model instead of the binary. Pages without usable text
+(scans) are cut into a smaller PDF that is still uploaded for OCR. Documents
+that are mostly scans, and anything pypdf cannot read, go to the model
+unchanged.
+
+Image circulars (often multi-megabyte phone photos) are downscaled to an
+OCR-sufficient resolution, converted to grayscale and recompressed (Pillow,
+in the same process pool).
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.modules.requirement_analyzer.blob_store import blob_path, put_blob
+from app.modules.requirement_analyzer.relevance import select_dropped_pages
+
+logger = logging.getLogger(__name__)
+
+# Extraction input kinds recorded on AnalysisResult.extraction_input
+INPUT_TEXT = "text"  # Text layer only
+INPUT_MIXED = "mixed"  # Text layer plus a sub-PDF of the scanned pages
+INPUT_FILE = "file"  # Original file
+INPUT_IMAGE = "image"  # Downscaled, recompressed image
+INPUT_HTML = "html"  # Visible text of an HTML page that links no circular file
+INPUT_LINKS = "links"  # Several circular files linked from an HTML page
+INPUT_URL = "url"  # No document, inferred from the URL
+INPUT_CACHE = "cache"  # Served from the extraction cache
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Process pool for CPU-bound document work, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned, not forked: the parent runs several threads (worker loop, LLM pool)
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.preprocess_max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+async def run_in_process(func, *args) -> Any:
+    """Run a CPU-bound function in the pre-processing process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+def shutdown() -> None:
+    """Stop the pre-processing worker processes."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _usable_text(text: str) -> bool:
+    """A page has a usable text layer if it has enough characters and few undecodable glyphs."""
+    stripped = text.strip()
+    if len(stripped) < settings.pdf_text_min_chars_per_page:
+        return False
+    bad = stripped.count('\ufffd') + stripped.count('(cid:')
+    return bad / len(stripped) < 0.05
+
+
+def extract_text_layer(path: str) -> Dict[str, Any]:
+    """
+    Read the text layer of every page of a PDF (runs in a worker process).
+    Returns the page texts, which pages have usable text, and which pages the
+    relevance filter drops.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    pages = []
+    text_pages = []
+    for index, page in enumerate(reader.pages):
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            text = ""
+        pages.append(text)
+        if _usable_text(text):
+            text_pages.append(index)
+    dropped_pages = select_dropped_pages(pages, text_pages) if settings.page_filter_enabled else []
+    return {'pages': pages, 'textPages': text_pages, 'droppedPages': dropped_pages}
+
+
+def write_page_subset(path: str, page_indices: List[int]) -> bytes:
+    """Build a PDF containing only the given pages of `path` (runs in a worker process)."""
+    from pypdf import PdfReader, PdfWriter
+
+    reader = PdfReader(path)
+    writer = PdfWriter()
+    for index in page_indices:
+        writer.add_page(reader.pages[index])
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def compress_image(path: str) -> bytes:
+    """
+    Downscale an image so its longest side is at most IMAGE_MAX_DIMENSION,
+    convert it to grayscale and re-encode it as JPEG (runs in a worker process).
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as image:
+        # Phone photos carry their rotation in EXIF
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('L')
+        image.thumbnail((settings.image_max_dimension, settings.image_max_dimension), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=settings.image_jpeg_quality, optimize=True)
+    return output.getvalue()
+
+
+async def prepare_image(document: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Downscaled grayscale copy of an image document, or None if it would not be smaller."""
+    try:
+        compressed = await run_in_process(compress_image, document['path'])
+    except Exception as e:
+        logger.warning(f"Image pre-processing failed for {document['sha256']}: {e}")
+        return None
+    if len(compressed) >= document['size']:
+        return None
+
+    digest = await asyncio.to_thread(put_blob, compressed)
+    return {
+        'path': blob_path(digest),
+        'mimeType': 'image/jpeg',
+        'size': len(compressed),
+        'sha256': digest,
+    }
+
+
+def format_pages(pages: List[str], indices: List[int]) -> str:
+    """Page texts joined with page markers (1-based page numbers)."""
+    return "\n\n".join(f"--- Page {index + 1} ---\n{pages[index].strip()}" for index in indices)
+
+
+async def page_subset_document(path: str, page_indices: List[int]) -> Dict[str, Any]:
+    """Store a PDF of the given pages of `path` in the blob store and return it as a document dict."""
+    subset = await run_in_process(write_page_subset, path, page_indices)
+    digest = await asyncio.to_thread(put_blob, subset)
+    return {
+        'path': blob_path(digest),
+        'mimeType': 'application/pdf',
+        'size': len(subset),
+        'sha256': digest,
+        'scannedPages': [index + 1 for index in page_indices],
+    }
+
+
+async def prepare_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decide what to send to the model for a fetched document.
+
+    Returns a dict with `input` (one of the INPUT_* kinds), `text` (page text
+    to include in the prompt, or None), `document` (the file to upload, or
+    None), `payloadBytes` (text bytes plus uploaded file size), and the page
+    layout: `pagesTotal`, `pages` (text per page), `textPages` (indices of
+    pages whose text is used) and `droppedPages` (indices left out by the
+    relevance filter), all None if the text layer could not be read.
+    """
+    prepared = {
+        'input': INPUT_FILE,
+        'text': None,
+        'document': document,
+        'payloadBytes': document['size'],
+        'pagesTotal': None,
+        'pages': None,
+        'textPages': None,
+        'droppedPages': None,
+    }
+    if document['mimeType'].startswith('image/') and settings.image_preprocess_enabled:
+        image = await prepare_image(document)
+        if image is not None:
+            prepared.update(input=INPUT_IMAGE, document=image, payloadBytes=image['size'])
+        return prepared
+    if document['mimeType'] != 'application/pdf':
+        return prepared
+    if not (settings.pdf_text_layer_enabled or settings.page_filter_enabled):
+        return prepared
+
+    try:
+        layer = await run_in_process(extract_text_layer, document['path'])
+    except Exception as e:
+        logger.warning(f"PDF text extraction failed for {document['sha256']}: {e}")
+        return prepared
+
+    pages = layer['pages']
+    dropped = set(layer['droppedPages'])
+    kept_pages = [index for index in range(len(pages)) if index not in dropped]
+    text_pages = []
+    if settings.pdf_text_layer_enabled:
+        text_pages = [index for index in layer['textPages'] if index not in dropped]
+    prepared.update(pagesTotal=len(pages), pages=pages, textPages=[], droppedPages=sorted(dropped))
+
+    if not kept_pages or len(text_pages) / len(kept_pages) < settings.pdf_text_min_coverage:
+        # Mostly scanned: OCR the whole file, or just the kept pages if some were dropped
+        if dropped:
+            try:
+                subset = await page_subset_document(document['path'], kept_pages)
+                prepared.update(document=subset, payloadBytes=subset['size'])
+            except Exception as e:
+                logger.warning(f"Could not drop filtered pages from {document['sha256']}: {e}")
+        return prepared
+
+    text = format_pages(pages, text_pages)
+    text_bytes = len(text.encode('utf-8'))
+    has_text = set(text_pages)
+    scanned_pages = [index for index in kept_pages if index not in has_text]
+    if not scanned_pages:
+        prepared.update(input=INPUT_TEXT, text=text, document=None, payloadBytes=text_bytes, textPages=text_pages)
+        return prepared
+
+    try:
+        subset = await page_subset_document(document['path'], scanned_pages)
+    except Exception as e:
+        logger.warning(f"Could not split scanned pages from {document['sha256']}: {e}")
+        return prepared
+
+    prepared.update(
+        input=INPUT_MIXED,
+        text=text,
+        document=subset,
+        payloadBytes=text_bytes + subset['size'],
+        textPages=text_pages,
+    )
+    return prepared
@@ -1,23 +1,35 @@
 import asyncio
-from typing import List
+from typing import Any, Dict, List, Optional
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from app.modules.requirement_analyzer.models import (
     AnalysisJob, AnalysisResult, JobStatus, ResultStatus,
-    AdmissionCircular, DepartmentRequirement
+    AdmissionCircular, DepartmentRequirement, UrlValidator
 )
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.modules.requirement_analyzer.services import analyze_circular
+from app.modules.requirement_analyzer.services import analyze_circular, extraction_key, try_fetch_url
+from app.modules.requirement_analyzer.chunking import merge_chunk_data
+from app.modules.requirement_analyzer.concurrency import get_fetch_semaphore
+from app.modules.requirement_analyzer.html_pages import parse_page
+from app.modules.requirement_analyzer.normalizer import normalize_circular
+from app.modules.requirement_analyzer.preprocess import INPUT_LINKS
+from app.modules.requirement_analyzer.retry import ErrorClass, RetryBudget, backoff_delay, classify_error
+from app.modules.requirement_analyzer.singleflight import SingleFlight
+from app.modules.requirement_analyzer import telemetry
+from app.modules.requirement_analyzer.url_failures import (
+    DEAD_FAILURES, clear_url_failure, get_url_failure, known_failure_error, record_url_failure
+)
+from app.modules.requirement_analyzer.urls import normalize_url
 from app.modules.requirement_analyzer.schemas import AdmissionCircularData
+from app.modules.requirement_analyzer.schemas import DepartmentRequirement as DepartmentRequirementData
+from app.modules.requirement_analyzer.results_router import circular_to_pydantic
 import uuid
 
 
-def save_circular_data(db: Session, result_id: uuid.UUID, data: AdmissionCircularData, raw_response: str = None) -> None:
-    """
-    Save admission circular data in structured format to the database.
-    """
-    # Create or update AdmissionCircular record
-    circular = AdmissionCircular(
-        result_id=result_id,
+def _circular_columns(data: AdmissionCircularData) -> Dict[str, Any]:
+    """AdmissionCircular column values for circular data (everything but the departments)."""
+    return dict(
         university_name=data.universityName,
         circular_link=data.circularLink,
         website_id=data.websiteId,
@@ -52,8 +64,59 @@ def save_circular_data(db: Session, result_id: uuid.UUID, data: AdmissionCircula
         quota_other=data.quotaOther,
         # Additional Notes
         additional_notes=data.additionalNotes,
+    )
+
+
+def _department_row(circular_id: uuid.UUID, dept_req: DepartmentRequirementData) -> DepartmentRequirement:
+    return DepartmentRequirement(
+        circular_id=circular_id,
+        department_name=dept_req.departmentName,
+        department_code=dept_req.departmentCode,
+        min_gpa_ssc=dept_req.minGpaSSC,
+        min_gpa_hsc=dept_req.minGpaHSC,
+        min_gpa_total=dept_req.minGpaTotal,
+        required_subjects=dept_req.requiredSubjects,
+        special_conditions=dept_req.specialConditions,
+        seats_total=dept_req.seatsTotal,
+        seats_quota_freedom_fighter=dept_req.seatsQuotaFreedomFighter,
+        seats_quota_tribal=dept_req.seatsQuotaTribal,
+        seats_quota_other=dept_req.seatsQuotaOther,
+        admission_test_subjects=dept_req.admissionTestSubjects,
+        admission_test_format=dept_req.admissionTestFormat,
+    )
+
+
+def discard_partial_circular(db: Session, result_id: uuid.UUID) -> None:
+    """Delete the partial circular saved for a result while its response was streaming."""
+    circular = db.query(AdmissionCircular).filter(AdmissionCircular.result_id == result_id).first()
+    if circular:
+        db.delete(circular)
+        db.flush()
+
+
+def save_circular_data(
+    db: Session,
+    result_id: uuid.UUID,
+    data: AdmissionCircularData,
+    raw_response: str = None,
+    prompt_version: Optional[str] = None,
+    model_name: Optional[str] = None
+) -> None:
+    """
+    Save admission circular data in structured format to the database,
+    with the prompt version and model of the extraction that produced it.
+    """
+    # Replaces the partial circular saved during streaming, if any
+    discard_partial_circular(db, result_id)
+    
+    # Create AdmissionCircular record
+    circular = AdmissionCircular(
+        result_id=result_id,
+        **_circular_columns(data),
         # Raw Response
         raw_response=raw_response,
+        prompt_version=prompt_version,
+        model_name=model_name,
     )
     db.add(circular)
     db.flush()  # Flush to get the circular ID
@@ -61,35 +124,306 @@ def save_circular_data(db: Session, result_id: uuid.UUID, data: AdmissionCircula
     # Save department requirements
     if data.departmentWiseRequirements:
         for dept_req in data.departmentWiseRequirements:
-            dept = DepartmentRequirement(
-                circular_id=circular.id,
-                department_name=dept_req.departmentName,
-                department_code=dept_req.departmentCode,
-                min_gpa_ssc=dept_req.minGpaSSC,
-                min_gpa_hsc=dept_req.minGpaHSC,
-                min_gpa_total=dept_req.minGpaTotal,
-                required_subjects=dept_req.requiredSubjects,
-                special_conditions=dept_req.specialConditions,
-                seats_total=dept_req.seatsTotal,
-                seats_quota_freedom_fighter=dept_req.seatsQuotaFreedomFighter,
-                seats_quota_tribal=dept_req.seatsQuotaTribal,
-                seats_quota_other=dept_req.seatsQuotaOther,
-                admission_test_subjects=dept_req.admissionTestSubjects,
-                admission_test_format=dept_req.admissionTestFormat,
+            db.add(_department_row(circular.id, dept_req))
+    
+    db.commit()
+
+
+class PartialCircularWriter:
+    """
+    Saves the completed part of a streamed extraction as the result's
+    circular while the result is still processing, so GET /analyze/{job_id}
+    shows partial data. Top-level fields are updated in place and departments
+    are added as they complete; `save_circular_data` replaces it at the end.
+    
+    Each save runs in its own short-lived session: a failed save is rolled
+    back without touching the session of the URL's processing task.
+    """
+
+    def __init__(self, result_id: uuid.UUID, url: str):
+        self.result_id = result_id
+        self.url = url
+        self._circular_id: Optional[uuid.UUID] = None
+        self._departments: List[DepartmentRequirementData] = []
+
+    async def save(self, partial: Dict[str, Any]) -> None:
+        """Progress callback for `analyze_circular`."""
+        # Required names may not have arrived yet
+        partial = dict(partial)
+        for field in ('universityName', 'websiteId'):
+            if not isinstance(partial.get(field), str):
+                partial[field] = ""
+        data = normalize_circular(partial, self.url)
+        
+        db = SessionLocal()
+        try:
+            if self._circular_id is None:
+                # Left over from an earlier attempt of this result
+                discard_partial_circular(db, self.result_id)
+                circular = AdmissionCircular(result_id=self.result_id, **_circular_columns(data))
+                db.add(circular)
+                db.flush()
+                self._circular_id = circular.id
+            else:
+                db.query(AdmissionCircular).filter(
+                    AdmissionCircular.id == self._circular_id
+                ).update(_circular_columns(data), synchronize_session=False)
+            
+            departments = data.departmentWiseRequirements
+            if departments[:len(self._departments)] != self._departments:
+                # Earlier departments changed (merged page chunks): rewrite them
+                db.query(DepartmentRequirement).filter(
+                    DepartmentRequirement.circular_id == self._circular_id
+                ).delete(synchronize_session=False)
+                self._departments = []
+            for dept_req in departments[len(self._departments):]:
+                db.add(_department_row(self._circular_id, dept_req))
+            self._departments = list(departments)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._circular_id = None
+            self._departments = []
+            raise
+        finally:
+            db.close()
+
+
+def find_reusable_circular(
+    db: Session,
+    content_hash: str,
+    prompt_version: str,
+    model_name: str,
+    result_id: uuid.UUID
+) -> Optional[AdmissionCircular]:
+    """
+    Find the circular of the most recent completed result whose fetched file
+    has the same SHA-256 digest and was extracted with the same prompt version
+    and model, so it can be reused without calling the LLM. A prompt or model
+    change makes earlier circulars stale, like entries of the extraction cache.
+    """
+    return db.query(AdmissionCircular).join(
+        AnalysisResult, AdmissionCircular.result_id == AnalysisResult.id
+    ).filter(
+        AnalysisResult.content_hash == content_hash,
+        AdmissionCircular.prompt_version == prompt_version,
+        AdmissionCircular.model_name == model_name,
+        AnalysisResult.status == ResultStatus.COMPLETED,
+        AnalysisResult.id != result_id
+    ).order_by(AnalysisResult.updated_at.desc()).first()
+
+
+def get_url_validators(db: Session, url: str) -> Optional[dict]:
+    """Load the saved HTTP validators for a URL in the shape `try_fetch_url` expects."""
+    validator = db.query(UrlValidator).filter(UrlValidator.url == url).first()
+    if not validator or not validator.content_hash:
+        return None
+    return {
+        'etag': validator.etag,
+        'lastModified': validator.last_modified,
+        'sha256': validator.content_hash,
+        'mimeType': validator.mime_type,
+    }
+
+
+def save_url_validators(db: Session, url: str, direct_file: dict) -> None:
+    """Save the ETag/Last-Modified validators from a successful fetch."""
+    validator = db.query(UrlValidator).filter(UrlValidator.url == url).first()
+    if not direct_file.get('etag') and not direct_file.get('lastModified'):
+        # Server sent no validators, nothing to revalidate against next time
+        if validator:
+            db.delete(validator)
+        return
+    if not validator:
+        validator = UrlValidator(url=url)
+        db.add(validator)
+    validator.etag = direct_file.get('etag')
+    validator.last_modified = direct_file.get('lastModified')
+    validator.content_hash = direct_file['sha256']
+    validator.mime_type = direct_file['mimeType']
+
+
+# Downloads + extractions in flight, keyed by normalized URL (shared by all jobs)
+inflight_analyses = SingleFlight()
+
+
+async def fetch_url(
+    url: str,
+    validators: Optional[Dict[str, Any]] = None,
+    accept_html: bool = False,
+    failure: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """`try_fetch_url` holding a slot of the process-wide download limit."""
+    async with get_fetch_semaphore():
+        return await try_fetch_url(url, validators, accept_html, failure)
+
+
+async def fetch_linked_documents(page: Dict[str, Any]) -> tuple[List[Dict[str, Any]], str]:
+    """
+    Fetch the candidate circular files linked from an HTML page concurrently.
+    Returns the documents that could be downloaded (identical files once, each
+    with its `url`) and the visible text of the page.
+    """
+    parsed = await asyncio.to_thread(parse_page, page)
+    fetched = await asyncio.gather(*[fetch_url(link) for link in parsed['links']])
+    
+    documents = []
+    seen = set()
+    for link, document in zip(parsed['links'], fetched):
+        if not document or document['sha256'] in seen:
+            continue
+        seen.add(document['sha256'])
+        document['url'] = link
+        documents.append(document)
+    return documents, parsed['text']
+
+
+async def analyze_linked_documents(
+    url: str,
+    documents: List[Dict[str, Any]],
+    result_id: uuid.UUID,
+    metrics: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Analyze several circular files linked from one page (e.g. one per unit)
+    concurrently and merge them into one circular, in link order.
+    """
+    async def analyze(document: Dict[str, Any]) -> tuple[AdmissionCircularData, str, Dict[str, Any]]:
+        metrics = {}
+        data, raw_response = await analyze_circular(url, document, metrics)
+        return data, raw_response, metrics
+    
+    outcomes = await asyncio.gather(*[analyze(document) for document in documents], return_exceptions=True)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+    
+    data = normalize_circular(merge_chunk_data([item.model_dump() for item, _, _ in outcomes]), url)
+    raw_response = "\n\n".join(
+        f"--- {document['url']} ---\n{raw}" for document, (_, raw, _) in zip(documents, outcomes)
+    )
+    metrics.update(
+        input=INPUT_LINKS,
+        payloadBytes=sum(item.get('payloadBytes') or 0 for _, _, item in outcomes),
+        modelName=outcomes[0][2].get('modelName'),
+        cacheHit=all(item.get('cacheHit') for _, _, item in outcomes),
+    )
+    return {
+        'data': data,
+        'raw_response': raw_response,
+        'document': None,
+        'reused_from_result_id': None,
+        'result_id': result_id,
+        'metrics': metrics,
+    }
+
+
+async def analyze_url(
+    db: Session,
+    url: str,
+    result_id: uuid.UUID,
+    metrics: Optional[Dict[str, Any]] = None,
+    check_known_failures: bool = True
+) -> Dict[str, Any]:
+    """
+    One analysis attempt for a URL: fetch the document, reuse an earlier
+    circular for identical bytes, otherwise run the LLM extraction.
+    
+    If the URL is an HTML page, the circular files it links are analyzed
+    instead (several are merged), or its visible text if it links none.
+    
+    A URL whose fetch failed recently (negative cache) is not fetched again:
+    a dead one raises right away, any other goes to the URL-only extraction.
+    Retries pass `check_known_failures=False`: the failure was recorded by
+    this result's own earlier attempt, so the URL is fetched again.
+    
+    Returns a dict with the parsed `data`, `raw_response`, the fetched
+    `document` (or None), `reused_from_result_id`, the `result_id`
+    that produced it and extraction `metrics` (filled into `metrics` if given,
+    so stage timings of a failed attempt are kept too).
+    """
+    # Stage timings and token counts of this attempt are recorded into its metrics
+    if metrics is None:
+        metrics = {}
+    telemetry.bind(metrics)
+    
+    # Known failing URL: fail fast if it is dead, otherwise skip the download
+    url_key = normalize_url(url)
+    known_failure = get_url_failure(db, url_key) if check_known_failures else None
+    if known_failure and known_failure.failure_class in DEAD_FAILURES:
+        raise known_failure_error(known_failure)
+    
+    # Attempt direct download of the URL (conditional if we have validators)
+    direct_file = None
+    if not known_failure:
+        failure = {}
+        validators = get_url_validators(db, url)
+        # No connection is held while waiting on the network
+        db.commit()
+        with telemetry.stage(telemetry.STAGE_FETCH):
+            direct_file = await fetch_url(
+                url, validators, accept_html=settings.html_follow_links, failure=failure
             )
-            db.add(dept)
+        if direct_file:
+            clear_url_failure(db, url_key)
+        else:
+            record_url_failure(db, url_key, failure)
+        db.commit()
+    
+    page_text = None
+    if direct_file and 'html' in direct_file:
+        # Notice page: follow its circular links, or fall back to its visible text
+        with telemetry.stage(telemetry.STAGE_FETCH):
+            documents, page_text = await fetch_linked_documents(direct_file)
+        if len(documents) > 1:
+            return await analyze_linked_documents(url, documents, result_id, metrics)
+        direct_file = documents[0] if documents else None
+    elif direct_file:
+        save_url_validators(db, url, direct_file)
     
+    source = None
+    if direct_file:
+        # Same bytes as an earlier completed result (or 304 Not Modified) extracted
+        # with the current prompt and model: reuse its circular data
+        content_hash, prompt_version, model_name = extraction_key(url, direct_file)
+        source = find_reusable_circular(db, content_hash, prompt_version, model_name, result_id)
+    
+    if source:
+        metrics.update(cacheHit=True, modelName=model_name, promptVersion=prompt_version)
+        return {
+            'data': circular_to_pydantic(source),
+            'raw_response': source.raw_response,
+            'document': direct_file,
+            'reused_from_result_id': source.result_id,
+            'result_id': result_id,
+            'metrics': metrics,
+        }
+    
+    # Analyze the URL, saving the completed part of the streamed response as it arrives
     db.commit()
+    on_progress = PartialCircularWriter(result_id, url).save if settings.llm_streaming_enabled else None
+    data, raw_response = await analyze_circular(url, direct_file, metrics, page_text, on_progress)
+    return {
+        'data': data,
+        'raw_response': raw_response,
+        'document': direct_file,
+        'reused_from_result_id': None,
+        'result_id': result_id,
+        'metrics': metrics,
+    }
 
 
 async def process_single_url(
     db: Session,
     job_id: uuid.UUID,
     url: str,
-    result_id: uuid.UUID
+    result_id: uuid.UUID,
+    retry_budget: Optional[RetryBudget] = None
 ) -> None:
     """
     Process a single URL and save the result to the database.
+    Transient errors are retried with backoff while the per-URL attempt
+    limit and the job's retry budget allow it.
     """
     import time
     from datetime import datetime
@@ -101,31 +435,109 @@ async def process_single_url(
     
     start_time = time.time()
     
+    # Update status to processing
+    result.status = ResultStatus.PROCESSING
+    db.commit()
+    
+    while True:
+        result.attempt_count = (result.attempt_count or 0) + 1
+        attempt_metrics = {}
+        try:
+            # Analyze the URL, or wait for the same URL already in flight in any job
+            outcome, shared = await inflight_analyses.do(
+                normalize_url(url),
+                lambda: analyze_url(db, url, result_id, attempt_metrics, result.attempt_count == 1)
+            )
+            
+            # Every requester gets its own copy of the parsed data
+            data = outcome['data'].model_copy(deep=True)
+            data.circularLink = url
+            raw_response = outcome['raw_response']
+            
+            document = outcome['document']
+            if document:
+                result.content_hash = document['sha256']
+                result.file_size_bytes = document['size']
+                result.file_mime_type = document['mimeType']
+                result.detected_mime_type = document.get('detectedType')
+            result.reused_from_result_id = outcome['result_id'] if shared else outcome['reused_from_result_id']
+            
+            # What was sent to the model (only the result that ran the extraction records it)
+            metrics = {} if shared else outcome['metrics']
+            result.extraction_input = metrics.get('input')
+            result.llm_payload_bytes = metrics.get('payloadBytes')
+            result.pages_total = metrics.get('pagesTotal')
+            result.pages_dropped = metrics.get('pagesDropped')
+            result.model_name = metrics.get('modelName')
+            result.cache_hit = metrics.get('cacheHit')
+            result.input_tokens = metrics.get('inputTokens')
+            result.output_tokens = metrics.get('outputTokens')
+            
+            # Calculate processing time
+            processing_time_ms = int((time.time() - start_time) * 1000)
+            
+            # Save the structured data
+            persist_start = time.perf_counter()
+            extraction = outcome['metrics']
+            save_circular_data(
+                db, result_id, data, raw_response,
+                extraction.get('promptVersion'), extraction.get('modelName')
+            )
+            telemetry.add_timing(metrics, telemetry.STAGE_PERSIST, (time.perf_counter() - persist_start) * 1000)
+            result.stage_timings = metrics.get('timings')
+            
+            # Update result status and metadata
+            result.status = ResultStatus.COMPLETED
+            result.error = None
+            result.processing_time_ms = processing_time_ms
+            db.commit()
+            return
+            
+        except Exception as e:
+            if isinstance(e, SQLAlchemyError) or not db.is_active:
+                # The session is unusable until rolled back (it is this URL's own,
+                # so no other URL loses its changes; this also expires the result,
+                # so keep the attempt count made in memory)
+                attempt_count = result.attempt_count
+                db.rollback()
+                result.attempt_count = attempt_count
+            
+            error_class = classify_error(e)
+            result.error = str(e)
+            result.last_error_class = error_class.value
+            
+            if (error_class == ErrorClass.TRANSIENT
+                    and result.attempt_count < settings.retry_max_attempts
+                    and (retry_budget is None or retry_budget.try_spend())):
+                db.commit()
+                await asyncio.sleep(backoff_delay(result.attempt_count))
+                continue
+            
+            # Save error (partial data from a streamed response is dropped)
+            discard_partial_circular(db, result_id)
+            result.stage_timings = attempt_metrics.get('timings')
+            result.status = ResultStatus.FAILED
+            result.processing_time_ms = int((time.time() - start_time) * 1000)
+            db.commit()
+            return
+
+
+async def process_single_url_background(
+    job_id: uuid.UUID,
+    url: str,
+    result_id: uuid.UUID,
+    retry_budget: Optional[RetryBudget] = None
+) -> None:
+    """
+    Process a single URL of a job in its own database session, so a failed
+    URL rolls back only its own changes. The session commits before every
+    network wait, so idle URLs do not hold pooled connections.
+    """
+    db = SessionLocal(expire_on_commit=False)
     try:
-        # Update status to processing
-        result.status = ResultStatus.PROCESSING
-        db.commit()
-        
-        # Analyze the URL
-        data, raw_response = await analyze_circular(url)
-        
-        # Calculate processing time
-        processing_time_ms = int((time.time() - start_time) * 1000)
-        
-        # Save the structured data
-        save_circular_data(db, result_id, data, raw_response)
-        
-        # Update result status and metadata
-        result.status = ResultStatus.COMPLETED
-        result.processing_time_ms = processing_time_ms
-        db.commit()
-        
-    except Exception as e:
-        # Save error
-        result.status = ResultStatus.FAILED
-        result.error = str(e)
-        result.processing_time_ms = int((time.time() - start_time) * 1000)
-        db.commit()
+        await process_single_url(db, job_id, url, result_id, retry_budget)
+    finally:
+        db.close()
 
 
 async def process_job(db: Session, job_id: uuid.UUID) -> None:
@@ -147,15 +559,15 @@ async def process_job(db: Session, job_id: uuid.UUID) -> None:
         AnalysisResult.status == ResultStatus.PENDING
     ).all()
     
-    # Process URLs concurrently (limit to 5 concurrent requests)
-    semaphore = asyncio.Semaphore(5)
+    # Retries of transient failures are shared across the whole job
+    retry_budget = RetryBudget.for_job(len(results))
     
-    async def process_with_semaphore(result: AnalysisResult):
-        async with semaphore:
-            await process_single_url(db, job_id, result.url, result.id)
+    # Process URLs concurrently, each in its own session; downloads (fetch
+    # semaphore) and extractions (adaptive limiter) are bounded process-wide, not per job
+    tasks = [process_single_url_background(job_id, result.url, result.id, retry_budget) for result in results]
     
-    # Create tasks
-    tasks = [process_with_semaphore(result) for result in results]
+    # End the read transaction so the job holds no connection while its URLs run
+    db.commit()
     
     # Wait for all tasks to complete
     await asyncio.gather(*tasks)
@@ -180,7 +592,7 @@ async def process_job(db: Session, job_id: uuid.UUID) -> None:
 async def process_job_background(job_id: uuid.UUID) -> None:
     """
     Background task to process a job.
-    This should be called in a background task/thread.
+    This is scheduled on the analysis worker loop.
     Creates its own database session.
     """
     db = SessionLocal()
@@ -0,0 +1,238 @@
+"""
+Process-wide rate limiter for LLM quota.
+
+Gemini quota is enforced per minute on both requests and tokens, across all
+jobs. `LlmRateLimiter` keeps a requests-per-minute and a tokens-per-minute
+token bucket shared by every job in the process; callers queue in FIFO order
+(asyncio.Lock is fair) until both buckets can cover the request, instead of
+firing and failing with quota errors.
+
+Token usage is estimated up front and settled with the real count from the
+response. With LLM_RATE_LIMIT_BACKEND=postgres, workers additionally reserve
+capacity in a shared per-minute counter row guarded by a Postgres advisory
+lock, so several API processes stay within one quota.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key for the shared LLM quota counter
+_ADVISORY_LOCK_KEY = 0x4C4C4D51  # "LLMQ"
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """Check whether an error is an LLM quota / rate limit rejection (HTTP 429)."""
+    try:
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+            return True
+    except ImportError:
+        pass
+    # By status only: messages (validation errors, quoted model output) can mention "quota" or "429"
+    status = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    return status == 429
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `capacity` per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (requests larger than capacity wait for a full bucket)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        """Give back (or, if negative, take) tokens after the real usage is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self) -> None:
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class PostgresRateCoordinator:
+    """Reserves LLM capacity in a per-minute counter row shared by all workers."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    def _try_reserve(self, tokens: int) -> float:
+        """Reserve one request in the current minute. Returns 0 on success, else seconds to wait."""
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': _ADVISORY_LOCK_KEY})
+            now = datetime.now(timezone.utc)
+            window_start = now.replace(second=0, microsecond=0)
+            row = db.execute(
+                text("SELECT requests, tokens FROM llm_rate_usage WHERE window_start = :window_start"),
+                {'window_start': window_start}
+            ).fetchone()
+            requests_used, tokens_used = (row.requests, row.tokens) if row else (0, 0)
+
+            fits = (
+                requests_used + 1 <= self.requests_per_minute
+                and (tokens_used == 0 or tokens_used + tokens <= self.tokens_per_minute)
+            )
+            if not fits:
+                db.commit()
+                return 60.0 - now.second - now.microsecond / 1_000_000
+
+            db.execute(
+                text("""
+                    INSERT INTO llm_rate_usage (window_start, requests, tokens)
+                    VALUES (:window_start, 1, :tokens)
+                    ON CONFLICT (window_start) DO UPDATE
+                    SET requests = llm_rate_usage.requests + 1,
+                        tokens = llm_rate_usage.tokens + :tokens
+                """),
+                {'window_start': window_start, 'tokens': tokens}
+            )
+            # Old windows are useless once the minute is over
+            db.execute(
+                text("DELETE FROM llm_rate_usage WHERE window_start < :window_start"),
+                {'window_start': window_start}
+            )
+            db.commit()
+            return 0.0
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _adjust(self, token_delta: int) -> None:
+        db = SessionLocal()
+        try:
+            window_start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+            db.execute(
+                text("UPDATE llm_rate_usage SET tokens = GREATEST(tokens + :delta, 0) WHERE window_start = :window_start"),
+                {'delta': token_delta, 'window_start': window_start}
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def reserve(self, tokens: int) -> None:
+        while True:
+            wait = await asyncio.to_thread(self._try_reserve, tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def adjust(self, token_delta: int) -> None:
+        try:
+            await asyncio.to_thread(self._adjust, token_delta)
+        except Exception as e:
+            logger.warning(f"Failed to adjust shared LLM token usage: {e}")
+
+
+class LlmRateLimiter:
+    """Fair requests-per-minute and tokens-per-minute limiter for LLM calls."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int,
+                 coordinator: Optional[PostgresRateCoordinator] = None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.coordinator = coordinator
+        self._lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self.waiting = 0
+        self.granted = 0
+        self.quota_errors = 0
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """Wait (in FIFO order) until one request of `estimated_tokens` fits both buckets."""
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    wait = max(
+                        self._blocked_until - time.monotonic(),
+                        self.requests.wait_time(1),
+                        self.tokens.wait_time(estimated_tokens),
+                    )
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                self.requests.consume(1)
+                self.tokens.consume(estimated_tokens)
+                if self.coordinator is not None:
+                    await self.coordinator.reserve(estimated_tokens)
+                self.granted += 1
+        finally:
+            self.waiting -= 1
+
+    async def settle(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token bucket once the real token usage of a request is known."""
+        if actual_tokens is None:
+            return
+        self.tokens.refund(estimated_tokens - actual_tokens)
+        if self.coordinator is not None:
+            await self.coordinator.adjust(actual_tokens - estimated_tokens)
+
+    def penalize(self, seconds: float) -> None:
+        """Pause all callers after a quota rejection and empty the buckets."""
+        self.quota_errors += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self.requests.drain()
+        self.tokens.drain()
+
+    def stats(self) -> dict:
+        return {
+            'requests_per_minute': int(self.requests.capacity),
+            'tokens_per_minute': int(self.tokens.capacity),
+            'requests_available': round(max(self.requests.tokens, 0.0), 2),
+            'tokens_available': int(max(self.tokens.tokens, 0.0)),
+            'blocked_for_seconds': round(max(self._blocked_until - time.monotonic(), 0.0), 2),
+            'waiting': self.waiting,
+            'granted': self.granted,
+            'quota_errors': self.quota_errors,
+            'backend': 'postgres' if self.coordinator is not None else 'local',
+        }
+
+
+def _build_rate_limiter() -> LlmRateLimiter:
+    coordinator = None
+    if settings.llm_rate_limit_backend == "postgres":
+        coordinator = PostgresRateCoordinator(
+            settings.llm_requests_per_minute,
+            settings.llm_tokens_per_minute,
+        )
+    return LlmRateLimiter(
+        settings.llm_requests_per_minute,
+        settings.llm_tokens_per_minute,
+        coordinator=coordinator,
+    )
+
+
+# Shared by every job in the process
+llm_rate_limiter = _build_rate_limiter()
@@ -0,0 +1,77 @@
+"""
+Relevance-based page filtering for circular PDFs.
+
+Each page with a text layer is scored with cheap keyword matching in Bangla
+and English: hits on admission-requirement terms (GPA, passing year, unit,
+seats, ...) against hits on boilerplate terms (mobile payment instructions,
+maps, signature blocks). Pages with too few requirement hits that look like
+boilerplate are dropped before extraction, so the model gets fewer input
+tokens. Scanned pages (no text to score) and the first page are always kept.
+
+Extra keywords can be added with PAGE_FILTER_EXTRA_KEYWORDS and
+PAGE_FILTER_EXTRA_BOILERPLATE (comma-separated).
+"""
+import re
+from typing import List, Tuple
+
+from app.core.config import settings
+
+RELEVANT_KEYWORDS = (
+    # English
+    'gpa', 'ssc', 'hsc', ' unit', 'seat', 'admission', 'eligib', 'requirement',
+    'passing year', 'minimum', 'department', 'faculty', 'subject', 'quota', 'exam',
+    'application', 'apply', 'deadline', 'merit',
+    # Bangla
+    'জিপিএ', 'পাসের বছর', 'উত্তীর্ণ', 'আবেদন', 'ইউনিট', 'আসন', 'ভর্তি', 'যোগ্যতা',
+    'পরীক্ষা', 'বিভাগ', 'অনুষদ', 'বিষয়', 'কোটা', 'ন্যূনতম', 'এসএসসি', 'এইচএসসি',
+    'মাধ্যমিক', 'সময়সূচি',
+)
+
+BOILERPLATE_KEYWORDS = (
+    # Mobile / bank payment instructions
+    'bkash', 'rocket', 'nagad', 'teletalk', 'transaction id', 'payment', 'pin number',
+    'বিকাশ', 'রকেট', 'নগদ', 'টেলিটক', 'পেমেন্ট', 'লেনদেন', 'এসএমএস',
+    # Maps and directions
+    'মানচিত্র', 'ম্যাপ',
+    # Signature / attestation blocks
+    'signature', 'registrar', 'স্বাক্ষর', 'রেজিস্ট্রার',
+)
+
+# Short English boilerplate terms, matched as whole words only
+# ("signed" must not match "assigned", "map" must not match "mapping")
+BOILERPLATE_WORDS = tuple(
+    re.compile(pattern) for pattern in (r'\bsms\b', r'\bmaps?\b', r'\broutes?\b', r'\bsigned\b')
+)
+
+
+def _extra(value: str) -> Tuple[str, ...]:
+    return tuple(keyword.strip().casefold() for keyword in value.split(',') if keyword.strip())
+
+
+def score_page(text: str) -> Tuple[int, int]:
+    """Return (requirement keyword hits, boilerplate keyword hits) for a page."""
+    text = text.casefold()
+    relevant = RELEVANT_KEYWORDS + _extra(settings.page_filter_extra_keywords)
+    boilerplate = BOILERPLATE_KEYWORDS + _extra(settings.page_filter_extra_boilerplate)
+    return (
+        sum(1 for keyword in relevant if keyword in text),
+        sum(1 for keyword in boilerplate if keyword in text)
+        + sum(1 for pattern in BOILERPLATE_WORDS if pattern.search(text)),
+    )
+
+
+def select_dropped_pages(pages: List[str], text_pages: List[int]) -> List[int]:
+    """
+    Indices of pages to leave out of extraction: text pages (other than the
+    first page) with fewer than PAGE_FILTER_MIN_HITS requirement hits that
+    have boilerplate hits, at least as many as requirement hits. Pages with
+    no hits at all (e.g. the continuation of a GPA/seat table) are kept.
+    """
+    dropped = []
+    for index in text_pages:
+        if index == 0:
+            continue
+        relevant, boilerplate = score_page(pages[index])
+        if relevant < settings.page_filter_min_hits and boilerplate > 0 and boilerplate >= relevant:
+            dropped.append(index)
+    return dropped
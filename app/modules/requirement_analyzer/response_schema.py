@@ -0,0 +1,77 @@
+"""
+Gemini response schema derived from `AdmissionCircularData`.
+
+With a `response_schema` in the generation config, Gemini constrains its
+output to JSON of that shape (no fences, comments or trailing commas, and
+the right types per field), so the tolerant parser is only a fallback.
+
+Gemini accepts a subset of OpenAPI 3.0 schemas: no `$ref`/`$defs`, no
+`anyOf`, no defaults or titles, and optional values are expressed with
+`nullable`. The pydantic JSON schema is converted to that subset once at
+import time.
+"""
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+from app.modules.requirement_analyzer.schemas import AdmissionCircularData
+
+# Filled in locally from the analyzed URL, never asked from the model
+_LOCAL_FIELDS = {'circularLink'}
+
+_TYPES = {
+    'string': 'STRING',
+    'number': 'NUMBER',
+    'integer': 'INTEGER',
+    'boolean': 'BOOLEAN',
+    'array': 'ARRAY',
+    'object': 'OBJECT',
+}
+
+
+def _convert(node: Dict[str, Any], definitions: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert one JSON schema node (resolving references) to the Gemini schema subset."""
+    if '$ref' in node:
+        return _convert(definitions[node['$ref'].rsplit('/', 1)[-1]], definitions)
+
+    if 'anyOf' in node:
+        # Optional[X] is anyOf [X, null]
+        options = [option for option in node['anyOf'] if option.get('type') != 'null']
+        if len(options) != 1:
+            raise Exception(f"Unsupported union in response schema: {node}")
+        converted = _convert(options[0], definitions)
+        if len(options) < len(node['anyOf']):
+            converted['nullable'] = True
+        return converted
+
+    schema_type = node.get('type')
+    if schema_type not in _TYPES:
+        raise Exception(f"Unsupported type in response schema: {node}")
+    converted: Dict[str, Any] = {'type': _TYPES[schema_type]}
+    if schema_type == 'array':
+        converted['items'] = _convert(node['items'], definitions)
+    elif schema_type == 'object':
+        properties = {
+            name: _convert(value, definitions)
+            for name, value in node.get('properties', {}).items()
+            if name not in _LOCAL_FIELDS
+        }
+        converted['properties'] = properties
+        required = [name for name in node.get('required', []) if name in properties]
+        if required:
+            converted['required'] = required
+    if 'enum' in node:
+        converted['enum'] = node['enum']
+    if 'description' in node:
+        converted['description'] = node['description']
+    return converted
+
+
+def gemini_schema(model: type[BaseModel]) -> Dict[str, Any]:
+    """Gemini `response_schema` for a pydantic model."""
+    schema = model.model_json_schema()
+    return _convert(schema, schema.get('$defs', {}))
+
+
+# Schema of the extraction output, sent with every Gemini request
+CIRCULAR_RESPONSE_SCHEMA = gemini_schema(AdmissionCircularData)
@@ -0,0 +1,96 @@
+"""
+Retry policy for URL analysis.
+
+Errors are classified as transient (timeouts, 5xx, rate limiting, connection
+drops, malformed model output) or permanent (bad requests, validation errors,
+anything unknown). Transient failures are retried with exponential backoff and
+full jitter, bounded by a per-URL attempt limit and a per-job retry budget so
+a bad batch cannot retry forever.
+"""
+import enum
+import json
+import random
+
+import httpx
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.modules.requirement_analyzer.backends import StubBackendError
+from app.modules.requirement_analyzer.concurrency import is_overload_error
+
+
+class ErrorClass(str, enum.Enum):
+    TRANSIENT = "transient"
+    PERMANENT = "permanent"
+
+
+# Message fragments of errors raised by our own parsing of model output;
+# the model is non-deterministic, so a new generation can succeed
+_TRANSIENT_MESSAGES = (
+    "Failed to parse JSON",
+    "Could not find JSON object",
+    "No response generated",
+    "No response from AI",
+)
+
+
+def classify_error(error: BaseException) -> ErrorClass:
+    """Classify an analysis error as transient (worth retrying) or permanent."""
+    if is_overload_error(error):
+        return ErrorClass.TRANSIENT
+    if isinstance(error, (httpx.TransportError, ConnectionError, json.JSONDecodeError)):
+        return ErrorClass.TRANSIENT
+
+    try:
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (
+            google_exceptions.InternalServerError,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.GatewayTimeout,
+            google_exceptions.Aborted,
+            google_exceptions.Unknown,
+        )):
+            return ErrorClass.TRANSIENT
+        if isinstance(error, google_exceptions.GoogleAPICallError):
+            return ErrorClass.PERMANENT
+    except ImportError:
+        pass
+
+    if isinstance(error, OperationalError):
+        return ErrorClass.TRANSIENT
+
+    if isinstance(error, StubBackendError):
+        return ErrorClass.TRANSIENT
+
+    status = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+    if isinstance(status, int) and status >= 500:
+        return ErrorClass.TRANSIENT
+
+    message = str(error)
+    if any(fragment in message for fragment in _TRANSIENT_MESSAGES):
+        return ErrorClass.TRANSIENT
+
+    return ErrorClass.PERMANENT
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given (1-based) failed attempt."""
+    ceiling = min(settings.retry_max_delay_seconds, settings.retry_base_delay_seconds * (2 ** (attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """Total number of retries all URLs of one job may spend together."""
+
+    def __init__(self, total: int):
+        self.remaining = total
+
+    @classmethod
+    def for_job(cls, urls_count: int) -> "RetryBudget":
+        return cls(max(settings.retry_job_budget_min, int(urls_count * settings.retry_job_budget_ratio)))
+
+    def try_spend(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
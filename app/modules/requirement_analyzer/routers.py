@@ -1,22 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import Optional
 from uuid import UUID
-import uuid
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 from app.core.database import get_db
+from app.modules.auth.dependencies import get_current_admin_user
+from app.modules.auth.models import User
 from app.modules.requirement_analyzer.models import AnalysisJob, AnalysisResult, JobStatus, ResultStatus, AdmissionCircular
 from app.modules.requirement_analyzer.schemas import (
     AnalyzeRequest, AnalyzeResponse, JobStatusResponse, ResultResponse,
     AdmissionCircularData, GpaRequirement, YearRequirement, ApplicationPeriod,
-    DepartmentRequirement
+    DepartmentRequirement, ExtractionCacheStatsResponse, ExtractionCacheInvalidateResponse,
+    ConcurrencyStatsResponse, RateLimitStatsResponse, UploadedFilesStatsResponse, ParseStatsResponse,
+    StageTimingsResponse
 )
 from app.modules.requirement_analyzer.processor import process_job_background
-
-# Thread pool for background tasks
-executor = ThreadPoolExecutor(max_workers=5)
+from app.modules.requirement_analyzer.extraction_cache import extraction_cache
+from app.modules.requirement_analyzer.concurrency import analysis_limiter
+from app.modules.requirement_analyzer.parse_stats import parse_stats
+from app.modules.requirement_analyzer.telemetry import stage_percentiles
+from app.modules.requirement_analyzer.rate_limiter import llm_rate_limiter
+from app.modules.requirement_analyzer.upload_cache import uploaded_files
+from app.modules.requirement_analyzer.worker import analysis_worker
 
 router = APIRouter(tags=["Requirement Analyzer"])
 
@@ -82,16 +88,6 @@ def circular_to_pydantic(circular: AdmissionCircular) -> AdmissionCircularData:
     )
 
 
-def run_async_task(coro):
-    """Helper to run async function in thread pool"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def create_analysis_job(
     request: AnalyzeRequest,
@@ -136,8 +132,8 @@ async def create_analysis_job(
     
     db.commit()
     
-    # Start background processing in thread pool
-    executor.submit(run_async_task, process_job_background(job.id))
+    # Start background processing on the analysis worker loop
+    analysis_worker.submit(process_job_background(job.id))
     
     return AnalyzeResponse(
         job_id=job.id,
@@ -154,6 +150,8 @@ async def get_job_status(
 ):
     """
     Get the status and results of an analysis job.
+    Results still processing are listed under `in_progress`, with the
+    partial circular extracted so far (if any).
     """
     job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
     if not job:
@@ -164,14 +162,15 @@ async def get_job_status(
         joinedload(AnalysisResult.circular).joinedload(AdmissionCircular.department_requirements)
     ).filter(AnalysisResult.job_id == job_id).all()
     
-    # Separate successful and failed results
+    # Separate successful, failed and in-progress results
     successful_results = []
     error_results = []
+    in_progress_results = []
     
     for result in results:
         # Load structured data from database (already loaded via joinedload)
         data_model = None
-        if result.status == ResultStatus.COMPLETED and result.circular:
+        if result.status in (ResultStatus.COMPLETED, ResultStatus.PROCESSING) and result.circular:
             data_model = circular_to_pydantic(result.circular)
         
         result_response = ResultResponse(
@@ -189,6 +188,8 @@ async def get_job_status(
             successful_results.append(result_response)
         elif result.status == ResultStatus.FAILED:
             error_results.append(result_response)
+        elif result.status == ResultStatus.PROCESSING:
+            in_progress_results.append(result_response)
     
     return JobStatusResponse(
         job_id=job.id,
@@ -197,6 +198,82 @@ async def get_job_status(
         created_at=job.created_at,
         completed_at=job.completed_at,
         results=successful_results,
-        errors=error_results
+        errors=error_results,
+        in_progress=in_progress_results
     )
 
+
+@router.get("/admin/extraction-cache", response_model=ExtractionCacheStatsResponse)
+async def get_extraction_cache_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Get the size of the extraction cache (in-process LRU and database table).
+    """
+    return ExtractionCacheStatsResponse(**extraction_cache.stats())
+
+
+@router.delete("/admin/extraction-cache", response_model=ExtractionCacheInvalidateResponse)
+async def invalidate_extraction_cache(
+    content_hash: Optional[str] = Query(None, description="Only entries for this document SHA-256"),
+    prompt_version: Optional[str] = Query(None, description="Only entries for this prompt version"),
+    model_name: Optional[str] = Query(None, description="Only entries for this model"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Invalidate cached extractions matching all given filters.
+    With no filters, the whole cache is cleared.
+    """
+    deleted = extraction_cache.invalidate(
+        content_hash=content_hash,
+        prompt_version=prompt_version,
+        model_name=model_name,
+    )
+    return ExtractionCacheInvalidateResponse(deleted=deleted)
+
+
+@router.get("/admin/concurrency", response_model=ConcurrencyStatsResponse)
+async def get_concurrency_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Get the adaptive concurrency limiter state: current limit, in-flight
+    extractions, utilization and the latency/error signals driving it.
+    """
+    return ConcurrencyStatsResponse(**analysis_limiter.stats())
+
+
+@router.get("/admin/rate-limit", response_model=RateLimitStatsResponse)
+async def get_rate_limit_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Get the process-wide LLM rate limiter state (request/token buckets and queue).
+    """
+    return RateLimitStatsResponse(**llm_rate_limiter.stats())
+
+
+@router.get("/admin/uploaded-files", response_model=UploadedFilesStatsResponse)
+async def get_uploaded_files_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Get the reusable Gemini file uploads: handles kept, reuse hits and uploads made.
+    """
+    return UploadedFilesStatsResponse(**uploaded_files.stats())
+
+
+@router.get("/admin/parse-stats", response_model=ParseStatsResponse)
+async def get_parse_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    Get model response parse outcomes per model and prompt version:
+    strict JSON, repaired by the tolerant parser, or failed.
+    """
+    return ParseStatsResponse(**parse_stats.stats())
+
+
+@router.get("/admin/stage-timings", response_model=StageTimingsResponse)
+async def get_stage_timings(
+    hours: float = Query(24, gt=0, le=24 * 30, description="Time window in hours"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Get p50/p95 milliseconds per pipeline stage (fetch, preprocess, upload,
+    generate, parse, persist) and token/cache totals for results finished in
+    the last `hours`.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return StageTimingsResponse(**stage_percentiles(db, since))
@@ -104,6 +104,7 @@ class JobStatusResponse(BaseModel):
     completed_at: Optional[datetime] = None
     results: List[ResultResponse] = []
     errors: List[ResultResponse] = []
+    in_progress: List[ResultResponse] = []  # Processing results, with partial data while streaming
 
 
 class ResultsListResponse(BaseModel):
@@ -112,3 +113,80 @@ class ResultsListResponse(BaseModel):
     page: int
     page_size: int
 
+
+
+class ExtractionCacheStatsResponse(BaseModel):
+    memory_entries: int
+    max_memory_entries: int
+    rows: int
+    max_rows: int
+
+
+class ExtractionCacheInvalidateResponse(BaseModel):
+    deleted: int
+
+
+class ConcurrencyStatsResponse(BaseModel):
+    limit: int
+    limit_exact: float
+    min_limit: int
+    max_limit: int
+    in_flight: int
+    waiting: int
+    utilization: float
+    last_p95_ms: Optional[int] = None
+    baseline_p95_ms: Optional[int] = None
+    last_error_rate: Optional[float] = None
+    completed: int
+    failed: int
+    overloads: int
+
+
+class RateLimitStatsResponse(BaseModel):
+    requests_per_minute: int
+    tokens_per_minute: int
+    requests_available: float
+    tokens_available: int
+    blocked_for_seconds: float
+    waiting: int
+    granted: int
+    quota_errors: int
+    backend: str
+
+
+class UploadedFilesStatsResponse(BaseModel):
+    entries: int
+    max_entries: int
+    hits: int
+    uploads: int
+
+
+class ParseStatsEntry(BaseModel):
+    model_name: str
+    prompt_version: str
+    strict: int
+    repaired: int
+    failed: int
+    failure_rate: float
+
+
+class ParseStatsResponse(BaseModel):
+    entries: List[ParseStatsEntry]
+
+
+class StageTiming(BaseModel):
+    stage: str
+    count: int
+    p50_ms: float
+    p95_ms: float
+
+
+class StageTimingsResponse(BaseModel):
+    since: datetime
+    results: int
+    cache_hits: int
+    input_tokens: int
+    output_tokens: int
+    total_p50_ms: Optional[float] = None
+    total_p95_ms: Optional[float] = None
+    stages: List[StageTiming]
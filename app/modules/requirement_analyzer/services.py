@@ -1,57 +1,405 @@
-import google.generativeai as genai
-import httpx
-import base64
+import asyncio
 import json
-import re
-from typing import Optional, Dict, Any
+import os
+import httpx
+from typing import Optional, Dict, Any, List, Tuple
 from app.modules.requirement_analyzer.schemas import AdmissionCircularData
+from app.modules.requirement_analyzer.backends import ExtractionBackend, get_extraction_backend
+from app.modules.requirement_analyzer.chunking import build_chunks, merge_chunk_data, should_chunk
+from app.modules.requirement_analyzer.concurrency import analysis_limiter
+from app.modules.requirement_analyzer.blob_store import BlobWriter, blob_path, compute_sha256, has_blob
+from app.modules.requirement_analyzer.extraction_cache import extraction_cache
+from app.modules.requirement_analyzer.normalizer import NORMALIZER_VERSION, normalize_circular
+from app.modules.requirement_analyzer.parse_stats import PARSE_FAILED, PARSE_REPAIRED, PARSE_STRICT, parse_stats
+from app.modules.requirement_analyzer.sniffing import read_head, resolve_mime_type, sniff_mime_type
+from app.modules.requirement_analyzer.preprocess import INPUT_CACHE, INPUT_HTML, INPUT_URL, prepare_document
+from app.modules.requirement_analyzer.streaming import ProgressCallback, ResponseProgress
+from app.modules.requirement_analyzer import telemetry
+from app.modules.requirement_analyzer.url_failures import (
+    FETCH_CONNECTION, FETCH_ERROR, FETCH_HTTP_ERROR, FETCH_NOT_FOUND, FETCH_TIMEOUT, FETCH_TOO_LARGE, FETCH_UNSUPPORTED
+)
+from app.modules.requirement_analyzer.tolerant_json import JsonParseError, parse_tolerant_json
 from app.core.config import settings
+from app.core.http_client import http_clients
+
+
+# Bump when a prompt changes so cached extractions for the old prompt stop matching
+FILE_PROMPT_VERSION = "file-v2"
+URL_PROMPT_VERSION = "url-v2"
+# Appended to the file prompt version while the matching pre-processing stage is on
+TEXT_LAYER_VERSION = "text-v1"
+PAGE_FILTER_VERSION = "filter-v1"
+IMAGE_PREPROCESS_VERSION = "image-v1"
+# Appended to the file prompt version for the visible text of an HTML page
+PAGE_TEXT_VERSION = "page-v1"
+# Appended to every prompt version while Gemini gets the response schema
+RESPONSE_SCHEMA_VERSION = "schema-v1"
 
 
-# Configure Gemini API
-genai.configure(api_key=settings.gemini_api_key)
+def _file_prompt_version(document: Dict[str, Any]) -> str:
+    version = FILE_PROMPT_VERSION
+    if document['mimeType'] == 'application/pdf':
+        if settings.pdf_text_layer_enabled:
+            version += f"+{TEXT_LAYER_VERSION}"
+        if settings.page_filter_enabled:
+            version += f"+{PAGE_FILTER_VERSION}"
+    elif document['mimeType'].startswith('image/') and settings.image_preprocess_enabled:
+        version += f"+{IMAGE_PREPROCESS_VERSION}"
+    return version
 
 
-async def try_fetch_url(url: str) -> Optional[Dict[str, str]]:
+def _fetch_failed(failure: Optional[Dict[str, Any]], reason: str, status_code: Optional[int] = None) -> None:
+    """Report why a fetch failed into the caller's `failure` dict (if given)."""
+    if failure is not None:
+        failure.update(reason=reason, statusCode=status_code)
+    return None
+
+
+async def try_fetch_url(
+    url: str,
+    validators: Optional[Dict[str, Any]] = None,
+    accept_html: bool = False,
+    failure: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
     """
     Attempts to fetch a URL directly.
-    If successful and the content is a PDF or Image, returns the base64 data and mimeType.
-    Returns None if fetch fails or content is not a supported file type.
+    If successful and the content is a PDF or Image, the body is streamed into the
+    blob store and the blob path, mimeType, size in bytes and SHA-256 digest are returned.
+    Returns None if fetch fails, content is not a supported file type, or the
+    file is larger than DOWNLOAD_MAX_BYTES (checked against Content-Length
+    before the body is read, and while streaming).
+    
+    The type is sniffed from the first bytes of the body (`detectedType`, None
+    if not recognized), so PDFs served as application/octet-stream or text/html
+    are still accepted; `mimeType` is the type the content is handled as.
+    
+    With `accept_html`, an HTML page (up to HTML_MAX_BYTES) is returned as
+    `{'mimeType': 'text/html', 'html': ..., 'finalUrl': ...}` instead of None,
+    `finalUrl` being the URL after redirects (the base for relative links).
+    
+    `validators` are the ETag/Last-Modified values and content hash saved from the
+    last successful fetch of this URL. They are sent as If-None-Match/If-Modified-Since;
+    on 304 the file is served from the blob store and `notModified` is set.
+    The returned `etag`/`lastModified` should be saved for the next fetch.
+    
+    When None is returned, the `failure` dict (if given) gets the `reason`
+    (one of the url_failures FETCH_* classes) and the HTTP `statusCode`, if any.
     """
+    headers = {}
+    if validators and validators.get('sha256') and has_blob(validators['sha256']):
+        # Only revalidate if we still have the bytes the validators refer to
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('lastModified'):
+            headers['If-Modified-Since'] = validators['lastModified']
+    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
+        client = http_clients.get_client()
+        async with client.stream('GET', url, headers=headers) as response:
+            if response.status_code == 304 and headers:
+                return {
+                    'path': blob_path(validators['sha256']),
+                    'mimeType': validators['mimeType'],
+                    'size': os.path.getsize(blob_path(validators['sha256'])),
+                    'sha256': validators['sha256'],
+                    'etag': response.headers.get('etag') or validators.get('etag'),
+                    'lastModified': response.headers.get('last-modified') or validators.get('lastModified'),
+                    'notModified': True,
+                }
+            
+            if response.status_code in (404, 410):
+                return _fetch_failed(failure, FETCH_NOT_FOUND, response.status_code)
             if response.status_code != 200:
-                return None
+                return _fetch_failed(failure, FETCH_HTTP_ERROR, response.status_code)
             
-            content_type = response.headers.get('content-type', '').lower()
+            # Media type without parameters (e.g. "; charset=binary")
+            content_type = response.headers.get('content-type', '').split(';')[0].strip().lower()
             
-            # Only proceed if it is a PDF or Image
-            if 'application/pdf' in content_type or content_type.startswith('image/'):
-                content = response.content
-                base64_data = base64.b64encode(content).decode('utf-8')
+            # Refuse oversized files before reading the body
+            content_length = response.headers.get('content-length', '')
+            if content_length.isdigit() and int(content_length) > settings.download_max_bytes:
+                return _fetch_failed(failure, FETCH_TOO_LARGE)
+            
+            # Decide by the first bytes, not (only) by the declared type
+            chunks = response.aiter_bytes(settings.download_chunk_bytes)
+            head = await read_head(chunks)
+            if not head:
+                # Empty body, whatever the declared type
+                return _fetch_failed(failure, FETCH_UNSUPPORTED)
+            detected_type = sniff_mime_type(head)
+            mime_type = resolve_mime_type(content_type, detected_type)
+            
+            if mime_type == 'text/html':
+                if not accept_html:
+                    return _fetch_failed(failure, FETCH_UNSUPPORTED)
+                body = bytearray(head)
+                async for chunk in chunks:
+                    body.extend(chunk)
+                    if len(body) > settings.html_max_bytes:
+                        return _fetch_failed(failure, FETCH_TOO_LARGE)
                 return {
-                    'data': base64_data,
-                    'mimeType': content_type
+                    'mimeType': 'text/html',
+                    'detectedType': detected_type,
+                    'html': body.decode(response.encoding or 'utf-8', errors='replace'),
+                    'finalUrl': str(response.url),
                 }
-            return None
+            
+            # Only proceed if it is a PDF or Image
+            if mime_type is None:
+                return _fetch_failed(failure, FETCH_UNSUPPORTED)
+            writer = BlobWriter()
+            try:
+                writer.write(head)
+                async for chunk in chunks:
+                    writer.write(chunk)
+                    if writer.size > settings.download_max_bytes:
+                        # Early abort: no Content-Length, or the server lied about it
+                        writer.discard()
+                        return _fetch_failed(failure, FETCH_TOO_LARGE)
+                digest = writer.commit()
+            except BaseException:
+                writer.discard()
+                raise
+            return {
+                'path': blob_path(digest),
+                'mimeType': mime_type,
+                'detectedType': detected_type,
+                'size': writer.size,
+                'sha256': digest,
+                'etag': response.headers.get('etag'),
+                'lastModified': response.headers.get('last-modified'),
+                'notModified': False,
+            }
+    # Ignore errors, fallback to search (the caller may record why).
+    # Only errors of the remote count as timeouts/connection failures:
+    # PoolTimeout means our own connection pool is exhausted
+    except httpx.ReadTimeout:
+        return _fetch_failed(failure, FETCH_TIMEOUT)
+    except (httpx.ConnectError, httpx.ConnectTimeout):
+        return _fetch_failed(failure, FETCH_CONNECTION)
     except Exception:
-        # Ignore errors, fallback to search
-        return None
+        return _fetch_failed(failure, FETCH_ERROR)
 
 
-async def analyze_circular(url: str) -> tuple[AdmissionCircularData, str]:
+def extraction_key(
+    url: str,
+    direct_file: Optional[Dict[str, Any]] = None,
+    page_text: Optional[str] = None
+) -> Tuple[str, str, str]:
+    """
+    The (content hash, prompt version, model name) an extraction of this
+    input is cached under: the document hash, else the hash of the page text,
+    else the hash of the URL. The prompt version includes the normalizer
+    version, since the cached data is stored normalized.
+    """
+    if direct_file:
+        content_hash, prompt_version = direct_file['sha256'], _file_prompt_version(direct_file)
+    elif page_text:
+        content_hash = compute_sha256(page_text.encode('utf-8'))
+        prompt_version = f"{FILE_PROMPT_VERSION}+{PAGE_TEXT_VERSION}"
+    else:
+        content_hash, prompt_version = compute_sha256(url.encode('utf-8')), URL_PROMPT_VERSION
+    if settings.llm_response_schema_enabled:
+        prompt_version += f"+{RESPONSE_SCHEMA_VERSION}"
+    prompt_version += f"+{NORMALIZER_VERSION}"
+    return content_hash, prompt_version, get_extraction_backend().model_name
+
+
+async def analyze_circular(
+    url: str,
+    direct_file: Optional[Dict[str, Any]] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+    page_text: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None
+) -> tuple[AdmissionCircularData, str]:
     """
     Analyze a university admission circular from a URL.
-    Uses Gemini Flash for OCR capabilities on PDFs/images.
+    Uses the configured extraction backend (Gemini Flash OCR on PDFs/images by default).
+    
+    `direct_file` is the document already downloaded by `try_fetch_url`.
+    Without a document, `page_text` (the visible text of an HTML page that
+    links no circular file) is extracted from; if it is None too, the circular
+    is inferred from the URL alone.
+    
+    Results are cached by (document hash, prompt version, model name);
+    page-text and URL-only prompts use the hash of the text or the URL instead.
+    A cache miss holds a slot of the process-wide adaptive limiter while the
+    backend extracts.
+    
+    If `metrics` is given, it is filled with what was sent to the model:
+    `input` (text / mixed / file / image / html / url / cache), `payloadBytes`, `pagesTotal`,
+    `pagesDropped` (by the relevance filter), `modelName`, `promptVersion` and `cacheHit`.
+    
+    If `on_progress` is given, the response is streamed and the completed part
+    of the circular (a partial dict) is passed to it while it is generated.
     """
-    # Use gemini-1.5-flash for OCR and document understanding (supports file uploads)
-    model = genai.GenerativeModel('gemini-2.5-flash')
+    if metrics is None:
+        metrics = {}
     
-    # PRE-PROCESSING: Attempt direct download of URL
-    direct_file = await try_fetch_url(url)
+    # Gemini (or the offline stub) selected by settings
+    backend = get_extraction_backend()
     
-    if direct_file:
+    cache_key = extraction_key(url, direct_file, page_text)
+    content_hash, prompt_version, _ = cache_key
+    
+    metrics.update(modelName=backend.model_name, promptVersion=prompt_version)
+    # The cache uses blocking database sessions
+    cached = await asyncio.to_thread(extraction_cache.get, *cache_key)
+    if cached:
+        data, raw_response = cached
+        data.circularLink = url
+        metrics.update(input=INPUT_CACHE, payloadBytes=0, cacheHit=True)
+        return data, raw_response
+    
+    metrics.update(cacheHit=False)
+    
+    # Only real extractions hold a slot of the process-wide adaptive limiter:
+    # cache hits would feed millisecond latencies into its baseline
+    async with analysis_limiter.slot():
+        data, raw_response = await _extract_circular(
+            backend, url, direct_file, prompt_version, metrics, page_text, on_progress
+        )
+    await asyncio.to_thread(extraction_cache.put, *cache_key, data, raw_response)
+    return data, raw_response
+
+
+def _parse_response_json(response_text: str, model_name: str, prompt_version: str) -> Dict[str, Any]:
+    """Parse the model response into a dict, counting the outcome per model and prompt version."""
+    outcome = PARSE_FAILED
+    try:
+        with telemetry.stage(telemetry.STAGE_PARSE):
+            data, repaired = _decode_response_json(response_text)
+        outcome = PARSE_REPAIRED if repaired else PARSE_STRICT
+        return data
+    finally:
+        parse_stats.record(model_name, prompt_version, outcome)
+
+
+def _decode_response_json(response_text: str) -> tuple[Dict[str, Any], bool]:
+    """
+    Decode the model response as strict JSON (schema-constrained output), or
+    with the tolerant parser (fenced, malformed or truncated JSON) as a fallback.
+    Returns the dict and whether the tolerant parser was needed.
+    """
+    repaired = False
+    try:
+        data = json.loads(response_text)
+    except ValueError:
+        repaired = True
+        try:
+            data = parse_tolerant_json(response_text)
+        except JsonParseError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to parse JSON from response: {e}\nFirst 1000 chars: {response_text[:1000]}")
+    
+    # Ensure data is a dict, not a list
+    if isinstance(data, list):
+        data = next((item for item in data if isinstance(item, dict)), None)
+        if data is None:
+            raise Exception(f"Failed to parse JSON from response: no object in list: {response_text[:500]}")
+    
+    if not isinstance(data, dict):
+        raise Exception(f"Expected dict but got {type(data)}: {str(data)[:200]}")
+    return data, repaired
+
+
+def _text_layer_section(prepared: Dict[str, Any]) -> str:
+    """Prompt section carrying the text extracted locally from the PDF."""
+    if prepared['document']:
+        pages = ", ".join(str(page) for page in prepared['document']['scannedPages'])
+        source = (
+            f"The text of the circular was extracted from its PDF text layer and is given below. "
+            f"Pages {pages} are scanned and are attached as a PDF: run OCR on them and combine both sources."
+        )
+    else:
+        source = "The text of the circular was extracted from its PDF text layer and is given below (no file is attached)."
+    return f"""
+        DOCUMENT TEXT:
+        {source}
+        
+        {prepared['text']}
+        """
+
+
+def _page_text_section(page_text: str) -> str:
+    """Prompt section carrying the visible text of an HTML circular page."""
+    return f"""
+        DOCUMENT TEXT:
+        The circular was published as a web page. Its visible text is given below (no file is attached).
+        
+        {page_text}
+        """
+
+
+async def _extract_chunks(
+    backend: ExtractionBackend,
+    prompt: str,
+    prompt_version: str,
+    direct_file: Dict[str, Any],
+    prepared: Dict[str, Any],
+    metrics: Dict[str, Any],
+    on_progress: Optional[ProgressCallback] = None
+) -> tuple[Dict[str, Any], str]:
+    """Extract each page range of a large PDF concurrently and merge the partial results."""
+    with telemetry.stage(telemetry.STAGE_PREPROCESS):
+        chunks = await build_chunks(direct_file, prepared)
+    semaphore = asyncio.Semaphore(settings.chunk_max_parallel)
+    
+    # Completed part of each chunk's streamed response, reported merged in page order
+    partials: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+    
+    def chunk_progress(position: int) -> Optional[ResponseProgress]:
+        if on_progress is None:
+            return None
+        
+        async def report(data: Dict[str, Any]) -> None:
+            partials[position] = data
+            await on_progress(merge_chunk_data([part for part in partials if part]))
+        return ResponseProgress(report)
+    
+    async def extract(position: int, chunk: Dict[str, Any]) -> str:
+        chunk_prompt = prompt + f"""
+        PARTIAL DOCUMENT:
+        This request covers only pages {chunk['firstPage']}-{chunk['lastPage']} of a {prepared['pagesTotal']}-page circular.
+        Extract only information that appears on these pages; use null or empty lists for everything else.
+        """
+        if chunk['text']:
+            chunk_prompt += _text_layer_section(chunk)
+        async with semaphore:
+            return await backend.generate(chunk_prompt, chunk['document'], chunk_progress(position))
+    
+    responses = await asyncio.gather(
+        *[extract(position, chunk) for position, chunk in enumerate(chunks)],
+        return_exceptions=True
+    )
+    for response in responses:
+        if isinstance(response, BaseException):
+            raise response
+    
+    metrics.update(chunks=len(chunks), payloadBytes=sum(chunk['payloadBytes'] for chunk in chunks))
+    parts = [_parse_response_json(response, backend.model_name, prompt_version) for response in responses]
+    raw_response = "\n\n".join(
+        f"--- Pages {chunk['firstPage']}-{chunk['lastPage']} ---\n{response}"
+        for chunk, response in zip(chunks, responses)
+    )
+    return merge_chunk_data(parts), raw_response
+
+
+async def _extract_circular(
+    backend: ExtractionBackend,
+    url: str,
+    direct_file: Optional[Dict[str, Any]],
+    prompt_version: str,
+    metrics: Dict[str, Any],
+    page_text: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None
+) -> tuple[AdmissionCircularData, str]:
+    """Run the extraction prompt through the backend and parse the response."""
+    # Stream the response and report its completed part as it arrives
+    progress = ResponseProgress(on_progress) if on_progress else None
+    
+    if direct_file or page_text:
         # CASE 2: File Analysis (Direct Analysis with OCR)
         prompt = """
         You are an expert at extracting structured data from university admission circulars.
@@ -75,16 +423,15 @@ async def analyze_circular(url: str) -> tuple[AdmissionCircularData, str]:
           * Subject requirements
         
         LANGUAGE & FORMATTING RULES:
-        1. The content may be in **Bangla** or **English**.
-        2. **Convert ALL Bangla numerals (০-৯) to English numbers (0-9)** for all GPA, Year, Fee, Age, and numeric fields.
-        3. Extract department names in their original language (Bangla or English).
-        4. Extract 'SSC', 'HSC', and 'Total' GPA requirements from tables and text.
-        5. Identify 'Allowed Passing Years' (e.g., SSC 2021/22, HSC 2023/24) - look for phrases like "পাসের বছর", "Passing Year", etc.
-        6. Extract exam dates, times, and venues if mentioned.
-        7. Extract contact information (email, phone, address) if available.
-        8. Extract quota information (freedom fighter, tribal, etc.) if mentioned.
-        9. Extract required documents list if provided.
-        10. Extract age limits if specified.
+        1. The content may be in **Bangla** or **English**. Numbers may be copied as written (Bangla digits are fine).
+        2. Extract department names in their original language (Bangla or English).
+        3. Extract 'SSC', 'HSC', and 'Total' GPA requirements from tables and text.
+        4. Identify 'Allowed Passing Years' (e.g., SSC 2021/22, HSC 2023/24) - look for phrases like "পাসের বছর", "Passing Year", etc.
+        5. Extract exam dates, times, and venues if mentioned.
+        6. Extract contact information (email, phone, address) if available.
+        7. Extract quota information (freedom fighter, tribal, etc.) if mentioned.
+        8. Extract required documents list if provided.
+        9. Extract age limits if specified.
         
         EXTRACTION REQUIREMENTS (CRITICAL - READ CAREFULLY):
         - Extract EVERY field that exists in the document. NULL values should ONLY be used when information is completely absent.
@@ -92,7 +439,7 @@ async def analyze_circular(url: str) -> tuple[AdmissionCircularData, str]:
         - For dates: Extract ALL dates mentioned (application start, end, exam dates). Format: "DD-MM-YYYY" or "YYYY-MM-DD".
         - For fees: Extract the exact amount. If different fees for different units, mention in the fee string (e.g., "A Unit: 1320, B Unit: 1100").
         - For GPA: Extract EXACT numbers from tables. If ranges are given, use the minimum requirement.
-        - For years: Extract ALL mentioned years. Look for phrases like "SSC 2021, 2022, 2023" or "HSC 2023, 2024".
+        - For years: Extract the allowed years as written (a range like "2021-2023" is fine).
         - For exam information: Extract date, time, venue, and duration if ANY of these are mentioned.
         - For contact info: Extract email addresses (look for @), phone numbers, and addresses.
         - For quotas: Extract numbers for freedom fighter quota, tribal quota, etc. if mentioned.
@@ -164,214 +511,42 @@ async def analyze_circular(url: str) -> tuple[AdmissionCircularData, str]:
         }
         """
         
-        # Create the file part using inline data (base64)
-        from google.generativeai.types import HarmCategory, HarmBlockThreshold
-        import tempfile
-        import os
-        
-        # Save to temporary file and upload (Gemini API requires file path)
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf' if 'pdf' in direct_file['mimeType'] else '.jpg') as tmp_file:
-            tmp_file.write(base64.b64decode(direct_file['data']))
-            tmp_path = tmp_file.name
+        if not direct_file:
+            # HTML page without a circular file: extract from its visible text
+            prompt += _page_text_section(page_text)
+            metrics.update(input=INPUT_HTML, payloadBytes=len(page_text.encode('utf-8')))
+            response_text = await backend.generate(prompt, None, progress)
+            data = _parse_response_json(response_text, backend.model_name, prompt_version)
+            return normalize_circular(data, url), response_text
+        
+        # Send the PDF text layer instead of the binary where possible
+        with telemetry.stage(telemetry.STAGE_PREPROCESS):
+            prepared = await prepare_document(direct_file)
+        metrics.update(
+            input=prepared['input'],
+            payloadBytes=prepared['payloadBytes'],
+            pagesTotal=prepared['pagesTotal'],
+            pagesDropped=len(prepared['droppedPages']) if prepared['droppedPages'] is not None else None,
+        )
         
-        try:
-            # Upload file to Gemini
-            uploaded_file = genai.upload_file(
-                path=tmp_path,
-                mime_type=direct_file['mimeType']
+        if should_chunk(prepared):
+            # Large circular: extract page ranges concurrently and merge them
+            data, raw_response = await _extract_chunks(
+                backend, prompt, prompt_version, direct_file, prepared, metrics, on_progress
             )
-            
-            response = model.generate_content(
-                [prompt, uploaded_file],
-                generation_config={
-                    'response_mime_type': 'application/json',
-                },
-                safety_settings={
-                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                }
-            )
-        finally:
-            # Clean up temporary file and uploaded file
-            try:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
-                if 'uploaded_file' in locals():
-                    genai.delete_file(uploaded_file.name)
-            except:
-                pass
+            return normalize_circular(data, url), raw_response
         
-        # Handle response - extract text from various response formats
-        response_text = None
+        if prepared['text']:
+            prompt += _text_layer_section(prepared)
         
-        # Try different ways to get the response text
-        if hasattr(response, 'text') and response.text:
-            response_text = response.text
-        elif hasattr(response, 'parts') and response.parts:
-            # Response might be in parts
-            for part in response.parts:
-                if hasattr(part, 'text') and part.text:
-                    response_text = part.text
-                    break
-        elif hasattr(response, 'candidates') and response.candidates and len(response.candidates) > 0:
-            # Response might be in candidates
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'content'):
-                if hasattr(candidate.content, 'parts'):
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            response_text = part.text
-                            break
-                elif hasattr(candidate.content, 'text'):
-                    response_text = candidate.content.text
-        
-        if not response_text:
-            # Last resort: try to convert to string
-            try:
-                response_text = str(response)
-            except:
-                raise Exception("No response generated from Gemini - unable to extract text")
+        # Run extraction on the downloaded file (OCR), the text layer, or both
+        response_text = await backend.generate(prompt, prepared['document'], progress)
         
         raw_response = response_text
         
-        # Clean and parse JSON response
-        json_str = response_text.strip()
-        
-        # Remove markdown code blocks if present
-        if json_str.startswith('```'):
-            # Remove opening and closing code blocks
-            json_str = re.sub(r'^```(?:json)?\s*', '', json_str, flags=re.MULTILINE)
-            json_str = re.sub(r'\s*```\s*$', '', json_str, flags=re.MULTILINE)
-            json_str = json_str.strip()
-        
-        # Try to extract JSON object from text
-        json_match = re.search(r'\{[\s\S]*\}', json_str)
-        if json_match:
-            json_str = json_match.group(0)
-        
-        # Parse JSON with better error handling and repair
-        def repair_json(json_string):
-            """Try to repair common JSON issues from OCR"""
-            # Remove trailing commas before closing brackets/braces
-            json_string = re.sub(r',(\s*[}\]])', r'\1', json_string)
-            # Remove duplicate commas
-            json_string = re.sub(r'([,{[])\s*,', r'\1', json_string)
-            # Fix unclosed strings (try to close them)
-            json_string = re.sub(r':\s*"([^"]*?)(?:\n|$)', r': "\1"', json_string)
-            # Fix single quotes to double quotes (but be careful with apostrophes)
-            json_string = re.sub(r"'([^']*?)':", r'"\1":', json_string)
-            json_string = re.sub(r":\s*'([^']*?)'", r': "\1"', json_string)
-            return json_string
-        
-        try:
-            data = json.loads(json_str)
-        except json.JSONDecodeError as e:
-            # Try to repair JSON
-            repaired_json = repair_json(json_str)
-            try:
-                data = json.loads(repaired_json)
-            except json.JSONDecodeError:
-                # Try one more time with more aggressive repair
-                # Extract just the JSON object part
-                json_match = re.search(r'\{[\s\S]{0,50000}\}', json_str)  # Limit to 50k chars
-                if json_match:
-                    try:
-                        data = json.loads(json_match.group(0))
-                    except json.JSONDecodeError:
-                        error_msg = f"JSON parse error at position {e.pos}: {str(e)}"
-                        if len(json_str) > 1000:
-                            error_msg += f"\nFirst 1000 chars: {json_str[:1000]}"
-                        else:
-                            error_msg += f"\nFull response: {json_str}"
-                        raise Exception(f"Failed to parse JSON from response after repair attempts. {error_msg}")
-                else:
-                    raise Exception(f"Could not find JSON object in response: {json_str[:500]}")
-        
-        # Ensure data is a dict, not a list
-        if isinstance(data, list):
-            if len(data) > 0:
-                data = data[0]
-            else:
-                raise Exception("Response is an empty list")
-        
-        if not isinstance(data, dict):
-            raise Exception(f"Expected dict but got {type(data)}: {str(data)[:200]}")
-        
-        # Ensure URL is set
-        data['circularLink'] = url
+        data = _parse_response_json(response_text, backend.model_name, prompt_version)
         
-        # Validate and clean the data before creating Pydantic model
-        # Handle nested structures that might be None or missing
-        
-        # Ensure applicationPeriod exists and is a dict
-        if 'applicationPeriod' not in data or not isinstance(data.get('applicationPeriod'), dict):
-            data['applicationPeriod'] = {'start': None, 'end': None}
-        else:
-            # Ensure nested fields exist
-            if 'start' not in data['applicationPeriod']:
-                data['applicationPeriod']['start'] = None
-            if 'end' not in data['applicationPeriod']:
-                data['applicationPeriod']['end'] = None
-        
-        # Ensure generalGpaRequirements exists and is a dict
-        if 'generalGpaRequirements' not in data or not isinstance(data.get('generalGpaRequirements'), dict):
-            data['generalGpaRequirements'] = {'ssc': None, 'hsc': None, 'total': None, 'with4thSubject': None}
-        else:
-            # Ensure all fields exist
-            gpa_req = data['generalGpaRequirements']
-            if 'ssc' not in gpa_req:
-                gpa_req['ssc'] = None
-            if 'hsc' not in gpa_req:
-                gpa_req['hsc'] = None
-            if 'total' not in gpa_req:
-                gpa_req['total'] = None
-            if 'with4thSubject' not in gpa_req:
-                gpa_req['with4thSubject'] = None
-        
-        # Ensure yearRequirements exists and is a dict with lists (not None)
-        if 'yearRequirements' not in data or not isinstance(data.get('yearRequirements'), dict):
-            data['yearRequirements'] = {'sscYears': [], 'hscYears': []}
-        else:
-            # Ensure sscYears and hscYears are lists, not None
-            year_req = data['yearRequirements']
-            if 'sscYears' not in year_req or year_req.get('sscYears') is None:
-                year_req['sscYears'] = []
-            elif not isinstance(year_req['sscYears'], list):
-                year_req['sscYears'] = []
-            
-            if 'hscYears' not in year_req or year_req.get('hscYears') is None:
-                year_req['hscYears'] = []
-            elif not isinstance(year_req['hscYears'], list):
-                year_req['hscYears'] = []
-        
-        # Ensure departmentWiseRequirements is a list
-        if 'departmentWiseRequirements' not in data or not isinstance(data.get('departmentWiseRequirements'), list):
-            data['departmentWiseRequirements'] = []
-        else:
-            # Clean each department requirement
-            for dept in data['departmentWiseRequirements']:
-                if not isinstance(dept, dict):
-                    continue
-                # Ensure requiredSubjects is a list, not None
-                if 'requiredSubjects' not in dept or dept.get('requiredSubjects') is None:
-                    dept['requiredSubjects'] = []
-                elif not isinstance(dept['requiredSubjects'], list):
-                    dept['requiredSubjects'] = []
-                # Ensure admissionTestSubjects is a list, not None
-                if 'admissionTestSubjects' not in dept or dept.get('admissionTestSubjects') is None:
-                    dept['admissionTestSubjects'] = []
-                elif not isinstance(dept['admissionTestSubjects'], list):
-                    dept['admissionTestSubjects'] = []
-        
-        # Ensure requiredDocuments is a list, not None
-        if 'requiredDocuments' not in data or data.get('requiredDocuments') is None:
-            data['requiredDocuments'] = []
-        elif not isinstance(data['requiredDocuments'], list):
-            data['requiredDocuments'] = []
-        
-        return AdmissionCircularData(**data), raw_response
+        return normalize_circular(data, url), raw_response
     
     else:
         # CASE 1: URL Analysis (URL provided and failed/skipped direct download)
@@ -391,7 +566,6 @@ async def analyze_circular(url: str) -> tuple[AdmissionCircularData, str]:
         
         LANGUAGE HANDLING:
         - Content may be in **Bangla** or **English**.
-        - **Convert ALL Bangla numerals (০,১,২...) to English numbers (0,1,2...)** for GPA and Year fields.
         - You can output string fields (like 'departmentName' or 'rawSummary') in English or Bangla (whichever is found), but English is preferred for keys/structure.
 
         OUTPUT FORMAT:
@@ -442,179 +616,15 @@ async def analyze_circular(url: str) -> tuple[AdmissionCircularData, str]:
         }}
 
         * Use null for missing numeric values.
-        * Ensure all numbers are actual JavaScript numbers, not strings.
         """
         
-        # Use model for URL-based analysis
-        from google.generativeai.types import HarmCategory, HarmBlockThreshold
-        
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                'response_mime_type': 'application/json',
-            },
-            safety_settings={
-                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-            }
-        )
-        
-        # Handle response - extract text from various response formats
-        response_text = None
-        
-        # Try different ways to get the response text
-        if hasattr(response, 'text') and response.text:
-            response_text = response.text
-        elif hasattr(response, 'parts') and response.parts:
-            for part in response.parts:
-                if hasattr(part, 'text') and part.text:
-                    response_text = part.text
-                    break
-        elif hasattr(response, 'candidates') and response.candidates and len(response.candidates) > 0:
-            candidate = response.candidates[0]
-            if hasattr(candidate, 'content'):
-                if hasattr(candidate.content, 'parts'):
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            response_text = part.text
-                            break
-                elif hasattr(candidate.content, 'text'):
-                    response_text = candidate.content.text
-        
-        if not response_text:
-            raise Exception("No response from AI")
+        # Run URL-based analysis (no document)
+        metrics.update(input=INPUT_URL, payloadBytes=0)
+        response_text = await backend.generate(prompt, None, progress)
         
         raw_response = response_text
         
-        # Clean and parse JSON response (same logic as file processing)
-        json_str = response_text.strip()
-        
-        # Remove markdown code blocks if present
-        if json_str.startswith('```'):
-            json_str = re.sub(r'^```(?:json)?\s*', '', json_str, flags=re.MULTILINE)
-            json_str = re.sub(r'\s*```\s*$', '', json_str, flags=re.MULTILINE)
-            json_str = json_str.strip()
-        
-        # Try to extract JSON object from text
-        json_match = re.search(r'\{[\s\S]*\}', json_str)
-        if json_match:
-            json_str = json_match.group(0)
-        
-        # Parse JSON with better error handling and repair (same as file processing)
-        def repair_json(json_string):
-            """Try to repair common JSON issues from OCR"""
-            # Remove trailing commas before closing brackets/braces
-            json_string = re.sub(r',(\s*[}\]])', r'\1', json_string)
-            # Remove duplicate commas
-            json_string = re.sub(r'([,{[])\s*,', r'\1', json_string)
-            # Fix unclosed strings (try to close them)
-            json_string = re.sub(r':\s*"([^"]*?)(?:\n|$)', r': "\1"', json_string)
-            # Fix single quotes to double quotes (but be careful with apostrophes)
-            json_string = re.sub(r"'([^']*?)':", r'"\1":', json_string)
-            json_string = re.sub(r":\s*'([^']*?)'", r': "\1"', json_string)
-            return json_string
-        
-        try:
-            data = json.loads(json_str)
-        except json.JSONDecodeError as e:
-            # Try to repair JSON
-            repaired_json = repair_json(json_str)
-            try:
-                data = json.loads(repaired_json)
-            except json.JSONDecodeError:
-                # Try one more time with more aggressive repair
-                json_match = re.search(r'\{[\s\S]{0,50000}\}', json_str)  # Limit to 50k chars
-                if json_match:
-                    try:
-                        data = json.loads(json_match.group(0))
-                    except json.JSONDecodeError:
-                        error_msg = f"JSON parse error at position {e.pos}: {str(e)}"
-                        if len(json_str) > 1000:
-                            error_msg += f"\nFirst 1000 chars: {json_str[:1000]}"
-                        else:
-                            error_msg += f"\nFull response: {json_str}"
-                        raise Exception(f"Failed to parse JSON from response after repair attempts. {error_msg}")
-                else:
-                    raise Exception(f"Could not find JSON object in response: {json_str[:500]}")
-        
-        # Ensure data is a dict, not a list
-        if isinstance(data, list):
-            if len(data) > 0:
-                data = data[0]
-            else:
-                raise Exception("Response is an empty list")
-        
-        if not isinstance(data, dict):
-            raise Exception(f"Expected dict but got {type(data)}: {str(data)[:200]}")
-        
-        # Ensure URL is set
-        data['circularLink'] = url
-        
-        # Validate and clean the data before creating Pydantic model
-        # Handle nested structures that might be None or missing (same as file processing)
-        
-        # Ensure applicationPeriod exists and is a dict
-        if 'applicationPeriod' not in data or not isinstance(data.get('applicationPeriod'), dict):
-            data['applicationPeriod'] = {'start': None, 'end': None}
-        else:
-            if 'start' not in data['applicationPeriod']:
-                data['applicationPeriod']['start'] = None
-            if 'end' not in data['applicationPeriod']:
-                data['applicationPeriod']['end'] = None
-        
-        # Ensure generalGpaRequirements exists and is a dict
-        if 'generalGpaRequirements' not in data or not isinstance(data.get('generalGpaRequirements'), dict):
-            data['generalGpaRequirements'] = {'ssc': None, 'hsc': None, 'total': None, 'with4thSubject': None}
-        else:
-            gpa_req = data['generalGpaRequirements']
-            if 'ssc' not in gpa_req:
-                gpa_req['ssc'] = None
-            if 'hsc' not in gpa_req:
-                gpa_req['hsc'] = None
-            if 'total' not in gpa_req:
-                gpa_req['total'] = None
-            if 'with4thSubject' not in gpa_req:
-                gpa_req['with4thSubject'] = None
-        
-        # Ensure yearRequirements exists and is a dict with lists (not None)
-        if 'yearRequirements' not in data or not isinstance(data.get('yearRequirements'), dict):
-            data['yearRequirements'] = {'sscYears': [], 'hscYears': []}
-        else:
-            year_req = data['yearRequirements']
-            if 'sscYears' not in year_req or year_req.get('sscYears') is None:
-                year_req['sscYears'] = []
-            elif not isinstance(year_req['sscYears'], list):
-                year_req['sscYears'] = []
-            
-            if 'hscYears' not in year_req or year_req.get('hscYears') is None:
-                year_req['hscYears'] = []
-            elif not isinstance(year_req['hscYears'], list):
-                year_req['hscYears'] = []
-        
-        # Ensure departmentWiseRequirements is a list
-        if 'departmentWiseRequirements' not in data or not isinstance(data.get('departmentWiseRequirements'), list):
-            data['departmentWiseRequirements'] = []
-        else:
-            # Clean each department requirement
-            for dept in data['departmentWiseRequirements']:
-                if not isinstance(dept, dict):
-                    continue
-                if 'requiredSubjects' not in dept or dept.get('requiredSubjects') is None:
-                    dept['requiredSubjects'] = []
-                elif not isinstance(dept['requiredSubjects'], list):
-                    dept['requiredSubjects'] = []
-                if 'admissionTestSubjects' not in dept or dept.get('admissionTestSubjects') is None:
-                    dept['admissionTestSubjects'] = []
-                elif not isinstance(dept['admissionTestSubjects'], list):
-                    dept['admissionTestSubjects'] = []
-        
-        # Ensure requiredDocuments is a list, not None
-        if 'requiredDocuments' not in data or data.get('requiredDocuments') is None:
-            data['requiredDocuments'] = []
-        elif not isinstance(data['requiredDocuments'], list):
-            data['requiredDocuments'] = []
+        data = _parse_response_json(response_text, backend.model_name, prompt_version)
         
-        return AdmissionCircularData(**data), raw_response
+        return normalize_circular(data, url), raw_response
 
@@ -0,0 +1,51 @@
+"""
+Single-flight coalescing of concurrent work.
+
+While a call for a key is in flight, later callers for the same key wait on
+the first call's future instead of repeating the work. Used to run each
+normalized circular URL's download and extraction once, even when several
+jobs (or one job listing the URL twice) are processing it at the same time.
+
+All callers must run on the same event loop (the analysis worker loop).
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by string."""
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run `fn` for `key`, or wait for the call already in flight.
+        Returns (value, shared) where `shared` is True if the value came from
+        another caller's call. Exceptions are propagated to every waiter.
+        """
+        future = self._flights.get(key)
+        if future is not None:
+            # Shield so a cancelled waiter does not cancel the leader's result
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark exceptions as retrieved when nobody else was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._flights[key] = future
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value, False
+        finally:
+            del self._flights[key]
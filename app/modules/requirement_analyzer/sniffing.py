@@ -0,0 +1,69 @@
+"""
+Content type sniffing for fetched circular URLs.
+
+University sites often mislabel files: PDFs come back as
+`application/octet-stream` or `text/html`, and error pages come back as
+`application/pdf`. `try_fetch_url` reads the first bytes of the body and
+decides by magic bytes (PDF, PNG, JPEG, GIF, WebP, TIFF, HTML markup),
+falling back to the declared Content-Type only for images and HTML pages
+whose bytes are not recognized. A PDF must start with its magic bytes.
+"""
+from typing import AsyncIterator, Optional
+
+# Bytes read before deciding (PDF headers may follow a little junk)
+SNIFF_BYTES = 1024
+
+_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'II*\x00', 'image/tiff'),
+    (b'MM\x00*', 'image/tiff'),
+)
+
+_HTML_MARKERS = (b'<!doctype html', b'<html', b'<head', b'<body', b'<script', b'<meta')
+
+HTML_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """Media type recognized from the first bytes of a body, or None."""
+    if b'%PDF-' in head[:SNIFF_BYTES]:
+        return 'application/pdf'
+    for signature, mime_type in _SIGNATURES:
+        if head.startswith(signature):
+            return mime_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    start = head.lstrip(b'\xef\xbb\xbf \t\r\n').lower()
+    if start.startswith(_HTML_MARKERS):
+        return 'text/html'
+    return None
+
+
+def resolve_mime_type(declared: str, detected: Optional[str]) -> Optional[str]:
+    """
+    The type to handle a body as: the sniffed type if the bytes were
+    recognized, otherwise the declared type if it is an image or HTML page.
+    A PDF is only accepted with its `%PDF-` header (an empty or junk body
+    declared as application/pdf is not a document). None means the content
+    is not supported.
+    """
+    if detected is not None:
+        return detected
+    if declared.startswith('image/'):
+        return declared
+    if declared in HTML_TYPES:
+        return 'text/html'
+    return None
+
+
+async def read_head(chunks: AsyncIterator[bytes]) -> bytes:
+    """Read from a body iterator until SNIFF_BYTES are buffered (or the body ends)."""
+    head = b''
+    async for chunk in chunks:
+        head += chunk
+        if len(head) >= SNIFF_BYTES:
+            break
+    return head
@@ -0,0 +1,80 @@
+"""
+Incremental parsing of streamed extraction responses.
+
+A streamed response is a growing prefix of the final JSON. The tolerant
+parser already reads truncated JSON and drops an incomplete trailing element
+of an array, so re-parsing the accumulated text yields everything completed
+so far:
+
+- top-level fields: all but the last key (its value may still be streaming)
+- departmentWiseRequirements: every element whose closing brace has arrived
+
+Parsing runs at most every LLM_STREAM_PROGRESS_SECONDS (in a worker thread)
+and the completed part is handed to a callback, which persists it so
+`GET /analyze/{job_id}` can show partial data long before generation ends.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.modules.requirement_analyzer.tolerant_json import parse_tolerant_json
+
+logger = logging.getLogger(__name__)
+
+_DEPARTMENTS_FIELD = 'departmentWiseRequirements'
+
+# Receives the completed part of a response (a partial circular dict)
+ProgressCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def completed_fields(text: str) -> Optional[Dict[str, Any]]:
+    """The completed part of a (possibly truncated) JSON object response, or None if there is none yet."""
+    try:
+        data = parse_tolerant_json(text)
+    except Exception:
+        return None
+    if isinstance(data, list):
+        data = next((item for item in data if isinstance(item, dict)), None)
+    if not isinstance(data, dict) or not data:
+        return None
+
+    last = next(reversed(data))
+    if last != _DEPARTMENTS_FIELD:
+        # Its value may be cut off mid-string or mid-object
+        del data[last]
+    return data or None
+
+
+class ResponseProgress:
+    """Accumulates a streamed response and reports its completed part as it grows."""
+
+    def __init__(self, on_progress: ProgressCallback):
+        self.on_progress = on_progress
+        self._chunks: List[str] = []
+        self._reported_at = 0.0
+
+    def reset(self) -> None:
+        """Start over with a new response (a retried request streams from the beginning)."""
+        self._chunks = []
+
+    async def feed(self, text: str) -> None:
+        """Add a chunk of streamed text."""
+        self._chunks.append(text)
+        now = time.monotonic()
+        if now - self._reported_at < settings.llm_stream_progress_seconds:
+            return
+        self._reported_at = now
+
+        response_text = ''.join(self._chunks)
+        self._chunks = [response_text]
+
+        data = await asyncio.to_thread(completed_fields, response_text)
+        if data is None:
+            return
+        try:
+            await self.on_progress(data)
+        except Exception as e:
+            # Partial results are best effort; the final result is saved regardless
+            logger.warning(f"Failed to report extraction progress: {e}")
@@ -0,0 +1,110 @@
+"""
+Per-stage timing and token telemetry for analysis results.
+
+Each analysis attempt binds its metrics dict to the current context
+(`bind`); code along the pipeline records into it without the dict being
+passed through every call:
+
+- `stage(name)` adds the elapsed milliseconds of a block to
+  `metrics['timings'][name]` (fetch, preprocess, upload, generate, parse,
+  persist). Concurrent calls of one stage (page chunks, linked documents)
+  add up, so a stage can exceed the wall-clock time of the attempt.
+- `record_usage(usage)` adds a Gemini response's prompt and output token
+  counts to `metrics['inputTokens']` / `metrics['outputTokens']`.
+
+The values end up on `AnalysisResult` (stage_timings, input_tokens,
+output_tokens); `stage_percentiles` aggregates them per stage over a window.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+STAGE_FETCH = "fetch"
+STAGE_PREPROCESS = "preprocess"
+STAGE_UPLOAD = "upload"
+STAGE_GENERATE = "generate"
+STAGE_PARSE = "parse"
+STAGE_PERSIST = "persist"
+
+_current: ContextVar[Optional[Dict[str, Any]]] = ContextVar('analysis_metrics', default=None)
+
+
+def bind(metrics: Dict[str, Any]) -> None:
+    """Record telemetry of the current task (and tasks it starts) into `metrics`."""
+    _current.set(metrics)
+
+
+def add_timing(metrics: Dict[str, Any], name: str, elapsed_ms: float) -> None:
+    timings = metrics.setdefault('timings', {})
+    timings[name] = round(timings.get(name, 0) + elapsed_ms, 1)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a block as pipeline stage `name` (no-op outside a bound analysis)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current.get()
+        if metrics is not None:
+            add_timing(metrics, name, (time.perf_counter() - start) * 1000)
+
+
+def record_usage(usage: Any) -> None:
+    """Add the token counts of a model response's usage metadata."""
+    metrics = _current.get()
+    if metrics is None or usage is None:
+        return
+    for key, attribute in (('inputTokens', 'prompt_token_count'), ('outputTokens', 'candidates_token_count')):
+        count = getattr(usage, attribute, None)
+        if count is not None:
+            metrics[key] = metrics.get(key, 0) + count
+
+
+def stage_percentiles(db: Session, since: datetime) -> Dict[str, Any]:
+    """p50/p95 per stage and token/cache totals of results finished since `since`."""
+    stages = db.execute(
+        text("""
+            SELECT timing.key AS stage,
+                   count(*) AS count,
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY timing.value::float) AS p50_ms,
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY timing.value::float) AS p95_ms
+            FROM analysis_results, jsonb_each_text(analysis_results.stage_timings) AS timing
+            WHERE analysis_results.updated_at >= :since
+              AND analysis_results.stage_timings IS NOT NULL
+            GROUP BY timing.key
+            ORDER BY timing.key
+        """),
+        {'since': since},
+    ).mappings().all()
+
+    totals = db.execute(
+        text("""
+            SELECT count(*) AS results,
+                   count(*) FILTER (WHERE cache_hit) AS cache_hits,
+                   coalesce(sum(input_tokens), 0) AS input_tokens,
+                   coalesce(sum(output_tokens), 0) AS output_tokens,
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY processing_time_ms) AS p50_ms,
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY processing_time_ms) AS p95_ms
+            FROM analysis_results
+            WHERE updated_at >= :since AND status IN ('COMPLETED', 'FAILED')
+        """),
+        {'since': since},
+    ).mappings().one()
+
+    return {
+        'since': since,
+        'results': totals['results'],
+        'cache_hits': totals['cache_hits'],
+        'input_tokens': totals['input_tokens'],
+        'output_tokens': totals['output_tokens'],
+        'total_p50_ms': totals['p50_ms'],
+        'total_p95_ms': totals['p95_ms'],
+        'stages': [dict(row) for row in stages],
+    }
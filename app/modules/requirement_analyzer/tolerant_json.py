@@ -0,0 +1,352 @@
+"""
+Fault-tolerant JSON decoder for LLM responses.
+
+Model output is usually JSON, but not always valid JSON: it may be wrapped in
+markdown fences or prose, use single quotes or bare keys, carry trailing or
+doubled commas, contain raw newlines or stray quotes inside strings, or be cut
+off mid-object when the response is truncated. `parse_tolerant_json` decodes
+in up to three tiers:
+
+1. The C JSON decoder (non-strict, so raw newlines inside strings are
+   accepted), starting at the first '{' or '[' (fences and prose around the
+   JSON are skipped).
+2. If it fails on damage a whole-text rewrite can fix (trailing/doubled
+   commas, single quotes, stray quotes inside strings), that rewrite is
+   applied and the text decoded again. Each rewrite is picked by where the
+   decoder failed and applied at most once, and comma and quote rewrites are
+   skipped if a double-quoted string contains what they would change, so
+   the common damage is handled at C speed without altering string values.
+3. Otherwise one left-to-right pass over the original text, in which each
+   object or array is first offered to the C decoder, so the undamaged parts
+   of a damaged response still decode at C speed.
+
+On truncation, everything parsed so far is kept: open strings and containers
+are closed, a key without a value is dropped, and an unfinished object or
+array at the end of a list is discarded (so a half-written department does not
+fail validation of the whole circular).
+"""
+import json
+import re
+from typing import Any, Callable, List, Optional
+
+# Whitespace, comments and stray markdown fence backticks between tokens
+_WHITESPACE = re.compile(r'(?:[ \t\r\n`]+|//[^\n]*|/\*[\s\S]*?(?:\*/|$))*')
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_BARE_WORD = re.compile(r'[A-Za-z_$][\w$\-]*')
+_BARE_KEY = re.compile(r'[^\s:,{}\[\]"\']+')
+_BARE_VALUE = re.compile(r'[^,}\]\n]*')
+# Quoted string with no escapes, newlines or stray quotes, followed by a delimiter
+_SIMPLE_STRING = {
+    '"': re.compile(r'"([^"\\\n]*)"(?=[ \t\r\n]*(?:[,}\]:]|$))'),
+    "'": re.compile(r"'([^'\\\n]*)'(?=[ \t\r\n]*(?:[,}\]:]|$))"),
+}
+_STRING_RUN = {
+    '"': re.compile(r'[^"\\\n]+'),
+    "'": re.compile(r"[^'\\\n]+"),
+}
+# After a raw newline inside a string: does the next line start a new key or close a container?
+_STRING_BREAK = re.compile(r'\s*(?:["\'][^"\'\n]*["\']\s*:|[}\]])')
+
+_LITERALS = {
+    'true': True, 'True': True,
+    'false': False, 'False': False,
+    'null': None, 'None': None, 'NaN': None, 'undefined': None,
+}
+_ESCAPES = {
+    '"': '"', "'": "'", '\\': '\\', '/': '/',
+    'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t',
+}
+_VALUE_END = ',}]:'
+_DECODER = json.JSONDecoder(strict=False)
+_MAX_FAST_PATH_FAILURES = 8
+
+# Whole-text repairs of damage between strings (see `_decode_repaired`)
+_QUOTED_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_TRAILING_COMMA = re.compile(r',(?=\s*[,}\]])')  # Also the first of a doubled comma
+_LEADING_COMMA = re.compile(r'([\[{])\s*,')
+# A quote with a non-delimiter on both sides (`"MCQ and "Written" parts"`)
+_STRAY_QUOTE = re.compile(
+    r'"(?![ \t\r\n]*(?:[,}\]:]|\Z))(?:(?<=[^\s:,\[{"\\]")|(?<=[^\s:,\[{"\\][ \t]"))'
+)
+
+
+class JsonParseError(ValueError):
+    """Raised when no JSON value can be recovered from the text."""
+
+
+class _Parser:
+    def __init__(self, text: str, pos: int):
+        self.text = text
+        self.pos = pos
+        self.length = len(text)
+        self.truncated = False
+        self.fast_path_failures = 0
+
+    def skip_whitespace(self) -> None:
+        self.pos = _WHITESPACE.match(self.text, self.pos).end()
+
+    def at_end(self) -> bool:
+        if self.pos >= self.length:
+            self.truncated = True
+            return True
+        return False
+
+    def parse_value(self) -> Any:
+        self.skip_whitespace()
+        if self.at_end():
+            return None
+        char = self.text[self.pos]
+        if char == '{' or char == '[':
+            # Undamaged sub-trees (most departments, usually) decode at C speed.
+            # A failed attempt costs O(position) (the error computes its line number),
+            # so stop trying once the damage looks systematic.
+            if self.fast_path_failures < _MAX_FAST_PATH_FAILURES:
+                try:
+                    value, self.pos = _DECODER.raw_decode(self.text, self.pos)
+                    return value
+                except ValueError:
+                    self.fast_path_failures += 1
+            return self.parse_object() if char == '{' else self.parse_array()
+        if char == '"' or char == "'":
+            return self.parse_string()
+        if char in '-+.' or char.isdigit():
+            return self.parse_number()
+        return self.parse_bare_value()
+
+    def parse_object(self) -> dict:
+        self.pos += 1
+        obj = {}
+        while True:
+            self.skip_whitespace()
+            if self.at_end():
+                return obj
+            char = self.text[self.pos]
+            if char == '}' or char == ']':
+                # "]" here is a mismatched closer; treat it as the end of the object
+                self.pos += 1
+                return obj
+            if char == ',':
+                # Leading, trailing or doubled comma
+                self.pos += 1
+                continue
+
+            key = self.parse_key()
+            self.skip_whitespace()
+            if self.at_end():
+                return obj
+            if self.text[self.pos] in ':=':
+                self.pos += 1
+                self.skip_whitespace()
+                if self.at_end():
+                    return obj
+            elif self.text[self.pos] in ',}':
+                # Key without a value
+                continue
+
+            obj[key] = self.parse_value()
+
+    def parse_key(self) -> str:
+        char = self.text[self.pos]
+        if char == '"' or char == "'":
+            return self.parse_string()
+        match = _BARE_KEY.match(self.text, self.pos)
+        if match is None:
+            # Unexpected character: skip it so the pass always makes progress
+            self.pos += 1
+            return char
+        self.pos = match.end()
+        return match.group(0)
+
+    def parse_array(self) -> List[Any]:
+        self.pos += 1
+        items: List[Any] = []
+        while True:
+            self.skip_whitespace()
+            if self.at_end():
+                return items
+            char = self.text[self.pos]
+            if char == ']' or char == '}':
+                self.pos += 1
+                return items
+            if char == ',':
+                self.pos += 1
+                continue
+
+            was_truncated = self.truncated
+            item = self.parse_value()
+            if self.truncated and not was_truncated and isinstance(item, (dict, list)):
+                # Cut off inside this element: drop the incomplete trailing element
+                return items
+            items.append(item)
+
+    def parse_string(self) -> str:
+        text, length = self.text, self.length
+        quote = text[self.pos]
+        simple = _SIMPLE_STRING[quote].match(text, self.pos)
+        if simple is not None:
+            self.pos = simple.end()
+            return simple.group(1)
+        run = _STRING_RUN[quote]
+        self.pos += 1
+        parts: List[str] = []
+        while True:
+            match = run.match(text, self.pos)
+            if match is not None:
+                parts.append(match.group(0))
+                self.pos = match.end()
+            if self.pos >= length:
+                self.truncated = True
+                return ''.join(parts)
+
+            char = text[self.pos]
+            if char == quote:
+                self.pos += 1
+                # A quote followed by anything but a delimiter is a stray quote inside the string
+                following = self._next_significant()
+                if following is None or following in _VALUE_END:
+                    return ''.join(parts)
+                parts.append(char)
+            elif char == '\\':
+                if self.pos + 1 >= length:
+                    self.pos += 1
+                    continue
+                escape = text[self.pos + 1]
+                if escape == 'u' and self.pos + 6 <= length:
+                    try:
+                        parts.append(chr(int(text[self.pos + 2:self.pos + 6], 16)))
+                        self.pos += 6
+                        continue
+                    except ValueError:
+                        pass
+                parts.append(_ESCAPES.get(escape, escape))
+                self.pos += 2
+            elif char == '\n':
+                # Raw newline: the string was probably never closed if a new key follows
+                if _STRING_BREAK.match(text, self.pos + 1):
+                    self.pos += 1
+                    return ''.join(parts).rstrip()
+                parts.append(char)
+                self.pos += 1
+            else:
+                # The other quote character
+                parts.append(char)
+                self.pos += 1
+
+    def _next_significant(self) -> Optional[str]:
+        text, i = self.text, self.pos
+        while i < self.length and text[i] in ' \t\r\n':
+            i += 1
+        return text[i] if i < self.length else None
+
+    def parse_number(self) -> Any:
+        match = _NUMBER.match(self.text, self.pos)
+        if match is None:
+            return self.parse_bare_value()
+        self.pos = match.end()
+        literal = match.group(0)
+        if self.pos >= self.length:
+            self.truncated = True
+        try:
+            if any(char in literal for char in '.eE'):
+                return float(literal)
+            return int(literal)
+        except ValueError:
+            return None
+
+    def parse_bare_value(self) -> Any:
+        word = _BARE_WORD.match(self.text, self.pos)
+        if word is not None and word.group(0) in _LITERALS:
+            self.pos = word.end()
+            return _LITERALS[word.group(0)]
+        # Unquoted text up to the next delimiter (e.g. N/A): keep it as a string
+        match = _BARE_VALUE.match(self.text, self.pos)
+        self.pos = max(match.end(), self.pos + 1)
+        if self.pos >= self.length:
+            self.truncated = True
+        value = match.group(0).strip()
+        return value or None
+
+
+def _find_start(text: str) -> int:
+    """Index of the first '{' or '[' (skips fences and any prose before the JSON)."""
+    brace = text.find('{')
+    bracket = text.find('[')
+    if brace < 0:
+        return bracket
+    if bracket < 0:
+        return brace
+    return min(brace, bracket)
+
+
+def _quoted_strings(text: str) -> str:
+    """The double-quoted strings of the text, concatenated."""
+    return ''.join(_QUOTED_STRING.findall(text))
+
+
+def _repair_commas(text: str) -> Optional[str]:
+    strings = _quoted_strings(text)
+    if _TRAILING_COMMA.search(strings) or _LEADING_COMMA.search(strings):
+        # The rewrite would change a string value
+        return None
+    return _LEADING_COMMA.sub(r'\1', _TRAILING_COMMA.sub('', text))
+
+
+def _repair_single_quotes(text: str) -> Optional[str]:
+    if "\\'" in text or "'" in _quoted_strings(text):
+        # An apostrophe in a string value, or an escaped quote, would be rewritten too
+        return None
+    return text.replace("'", '"')
+
+
+def _repair_stray_quotes(text: str) -> str:
+    return _STRAY_QUOTE.sub(r'\\"', text)
+
+
+def _choose_repair(error: json.JSONDecodeError) -> Optional[Callable[[str], Optional[str]]]:
+    """The whole-text repair for the damage the decoder stopped at, if any."""
+    if error.pos >= len(error.doc) or error.msg.startswith('Unterminated string'):
+        # Truncated: only the single pass can keep what was parsed so far
+        return None
+    char = error.doc[error.pos]
+    if char == "'":
+        return _repair_single_quotes
+    if char in ',}]':
+        return _repair_commas
+    if error.msg.startswith("Expecting ',' delimiter"):
+        return _repair_stray_quotes
+    return None
+
+
+def _decode_repaired(text: str, start: int) -> Any:
+    """
+    Decode with the C decoder, applying whole-text repairs for the damage it
+    stops at. Raises ValueError if the text still does not decode.
+    """
+    applied = set()
+    while True:
+        try:
+            return _DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError as e:
+            repair = _choose_repair(e)
+            if repair is None or repair in applied:
+                raise
+            applied.add(repair)
+            # Prose before the JSON is left out of the repair
+            repaired = repair(text[start:])
+            if repaired is None:
+                raise
+            text, start = repaired, 0
+
+
+def parse_tolerant_json(text: str) -> Any:
+    """
+    Parse possibly malformed JSON from an LLM response.
+    Raises JsonParseError if the text contains no JSON object or array.
+    """
+    start = _find_start(text)
+    if start < 0:
+        raise JsonParseError(f"Could not find JSON object in response: {text[:500]}")
+    try:
+        return _decode_repaired(text, start)
+    except ValueError:
+        return _Parser(text, start).parse_value()
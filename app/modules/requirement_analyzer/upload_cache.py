@@ -0,0 +1,94 @@
+"""
+Reuse of Gemini file uploads by content hash.
+
+Files uploaded with `genai.upload_file` stay available for 48 hours. Instead
+of uploading before and deleting after every extraction, handles are kept by
+the document's SHA-256 and reused when the same content is analyzed again
+within LLM_FILE_REUSE_SECONDS (a margin below the service-side expiry).
+Concurrent requests for the same content share one upload. The least
+recently used handles beyond LLM_UPLOADED_FILES_MAX are deleted remotely.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from app.core.config import settings
+from app.modules.requirement_analyzer import llm_client
+from app.modules.requirement_analyzer.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def is_missing_file_error(error: BaseException) -> bool:
+    """Check whether an error means an uploaded file no longer exists (expired or deleted)."""
+    try:
+        from google.api_core import exceptions as google_exceptions
+        if isinstance(error, (google_exceptions.NotFound, google_exceptions.PermissionDenied)):
+            return True
+    except ImportError:
+        pass
+    return False
+
+
+class UploadedFileCache:
+    """Uploaded file handles by content hash, with expiry and LRU eviction."""
+
+    def __init__(self, reuse_seconds: float, max_entries: int):
+        self.reuse_seconds = reuse_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._uploads = SingleFlight()
+        self.hits = 0
+        self.uploads = 0
+
+    async def get(self, document: Dict[str, Any]) -> Any:
+        """Return an uploaded file handle for the document, uploading it if needed."""
+        digest = document['sha256']
+        entry = self._entries.get(digest)
+        if entry is not None:
+            handle, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return handle
+            del self._entries[digest]
+
+        handle, _ = await self._uploads.do(digest, lambda: self._upload(document))
+        return handle
+
+    async def _upload(self, document: Dict[str, Any]) -> Any:
+        # Upload straight from the blob store file handle (no in-memory copy)
+        with open(document['path'], 'rb') as file_handle:
+            handle = await llm_client.upload_file(path=file_handle, mime_type=document['mimeType'])
+        self.uploads += 1
+        self._entries[document['sha256']] = (handle, time.monotonic() + self.reuse_seconds)
+        await self._evict()
+        return handle
+
+    async def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            _, (handle, _) = self._entries.popitem(last=False)
+            try:
+                await llm_client.delete_file(handle.name)
+            except Exception as e:
+                logger.debug(f"Failed to delete uploaded file {handle.name}: {e}")
+
+    def invalidate(self, digest: str) -> None:
+        """Forget a handle (e.g. the service reported the file missing)."""
+        self._entries.pop(digest, None)
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'uploads': self.uploads,
+        }
+
+
+# Shared by every job in the process
+uploaded_files = UploadedFileCache(
+    settings.llm_file_reuse_seconds,
+    settings.llm_uploaded_files_max,
+)
@@ -0,0 +1,83 @@
+"""
+Negative cache of circular URLs whose direct fetch failed.
+
+A failed `try_fetch_url` of a job's URL is recorded per normalized URL with
+its failure class and a TTL that doubles with each consecutive failure
+(URL_FAILURE_TTL_SECONDS up to URL_FAILURE_MAX_TTL_SECONDS), if the failure
+says something about the remote resource. While an entry is live, later jobs
+do not fetch the URL again:
+
+- dead URLs (404/410, connect/DNS errors, read timeouts) fail fast, instead
+  of waiting out another timeout and sending the bare URL to the model
+- non-documents and oversized files skip the download and go straight to
+  the URL-only extraction
+
+Other HTTP errors (5xx, 403 from bot filters) and local or unexplained errors
+(an exhausted connection pool, a full disk) are not cached. A successful
+fetch deletes the entry, resetting the backoff.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.modules.requirement_analyzer.models import UrlFailure
+
+# Failure classes reported by try_fetch_url
+FETCH_NOT_FOUND = "not_found"  # 404 / 410
+FETCH_HTTP_ERROR = "http_error"  # Any other non-200 status
+FETCH_TIMEOUT = "timeout"  # The server accepted the connection but did not answer in time
+FETCH_CONNECTION = "connection"  # DNS, refused or timed-out connects
+FETCH_UNSUPPORTED = "unsupported"  # Neither a PDF/image nor an accepted HTML page
+FETCH_TOO_LARGE = "too_large"  # Over DOWNLOAD_MAX_BYTES (or HTML_MAX_BYTES for pages)
+FETCH_ERROR = "error"  # Local or unexplained: pool exhausted, disk errors, dropped responses, invalid URLs
+
+# Classes that mean the URL cannot be fetched at all
+DEAD_FAILURES = (FETCH_NOT_FOUND, FETCH_TIMEOUT, FETCH_CONNECTION)
+# Classes recorded in the negative cache
+CACHED_FAILURES = DEAD_FAILURES + (FETCH_UNSUPPORTED, FETCH_TOO_LARGE)
+
+
+def failure_ttl(failure_count: int) -> timedelta:
+    """TTL after the given number of consecutive failures (doubling, capped)."""
+    seconds = settings.url_failure_ttl_seconds * (2 ** (failure_count - 1))
+    return timedelta(seconds=min(seconds, settings.url_failure_max_ttl_seconds))
+
+
+def get_url_failure(db: Session, url: str) -> Optional[UrlFailure]:
+    """The live (unexpired) failure entry for a normalized URL, if any."""
+    if not settings.url_failure_cache_enabled:
+        return None
+    return db.query(UrlFailure).filter(
+        UrlFailure.url == url,
+        UrlFailure.expires_at > datetime.now(timezone.utc)
+    ).first()
+
+
+def record_url_failure(db: Session, url: str, failure: Dict[str, Any]) -> None:
+    """Record a failed fetch of a normalized URL, escalating the TTL of a repeat failure."""
+    if not settings.url_failure_cache_enabled or failure.get('reason') not in CACHED_FAILURES:
+        return
+    entry = db.query(UrlFailure).filter(UrlFailure.url == url).first()
+    if not entry:
+        entry = UrlFailure(url=url, failure_count=0)
+        db.add(entry)
+    entry.failure_class = failure['reason']
+    entry.status_code = failure.get('statusCode')
+    entry.failure_count += 1
+    entry.expires_at = datetime.now(timezone.utc) + failure_ttl(entry.failure_count)
+
+
+def clear_url_failure(db: Session, url: str) -> None:
+    """Forget the failures of a normalized URL after a successful fetch."""
+    db.query(UrlFailure).filter(UrlFailure.url == url).delete(synchronize_session=False)
+
+
+def known_failure_error(entry: UrlFailure) -> Exception:
+    """The error a result fails with when its URL is known to be dead."""
+    status = f" (HTTP {entry.status_code})" if entry.status_code else ""
+    return Exception(
+        f"URL fetch failed {entry.failure_count} time(s), last: {entry.failure_class}{status}; "
+        f"not retried before {entry.expires_at.isoformat()}"
+    )
@@ -0,0 +1,77 @@
+"""
+Background worker for analysis jobs.
+
+All jobs run on one dedicated event loop in a background thread, so
+process-wide controls (the adaptive concurrency limiter, rate limits, shared
+HTTP pool) see every in-flight extraction instead of one job at a time.
+Blocking Gemini SDK calls are pushed to the LLM thread pool and do not stall
+the loop.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Coroutine, Optional
+
+from app.core.http_client import http_clients
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisWorker:
+    """Owns the background event loop that runs analysis jobs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the worker loop thread (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    # Cancel unfinished jobs and release pooled connections
+                    tasks = asyncio.all_tasks(loop)
+                    for task in tasks:
+                        task.cancel()
+                    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                    loop.run_until_complete(http_clients.aclose_loop())
+                    loop.run_until_complete(loop.shutdown_asyncgens())
+                    loop.close()
+
+            self._thread = threading.Thread(target=run, name="analysis-worker", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            logger.info("Analysis worker started")
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the worker loop."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the worker loop; in-flight jobs are cancelled."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        logger.info("Analysis worker stopped")
+
+
+analysis_worker = AnalysisWorker()
@@ -8,6 +8,7 @@ import httpx
 import re
 from typing import Optional, Dict, Any
 from bs4 import BeautifulSoup
+from app.core.http_client import http_clients
 
 
 EDUCATION_BOARD_URL = "http://www.educationboardresults.gov.bd/"
@@ -301,7 +302,8 @@ async def fetch_education_board_result(
         Dictionary with success status, extracted data, and error message if any
     """
     try:
-        async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
+        # Own cookie jar per lookup (CAPTCHA session), shared connection pool
+        async with http_clients.session(follow_redirects=True) as client:
             # First, get the form page to extract CAPTCHA
             response = await client.get(EDUCATION_BOARD_URL)
             if response.status_code != 200:
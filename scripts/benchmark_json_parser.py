@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tolerant JSON parser against the old regex repair chain.
+
+Builds a corpus of malformed model outputs by applying the damage we see from
+Gemini (markdown fences, prose around the JSON, trailing/doubled commas,
+single quotes, raw newlines and stray quotes in strings, Python literals,
+truncation) to base responses, then reports parse time and recovery rate
+(a dict with `universityName` came back) for both parsers.
+
+Base responses come from a directory of recorded raw responses (*.txt / *.json),
+from the `raw_response` column of stored circulars, or from a built-in sample.
+
+Usage:
+    python scripts/benchmark_json_parser.py [--corpus DIR] [--from-db 200] [--departments 40] [--repeat 5]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.modules.requirement_analyzer.tolerant_json import parse_tolerant_json
+
+
+def legacy_parse(response_text: str) -> dict:
+    """The regex repair chain `analyze_circular` used before the tolerant parser."""
+    json_str = response_text.strip()
+    if json_str.startswith('```'):
+        json_str = re.sub(r'^```(?:json)?\s*', '', json_str, flags=re.MULTILINE)
+        json_str = re.sub(r'\s*```\s*$', '', json_str, flags=re.MULTILINE)
+        json_str = json_str.strip()
+
+    json_match = re.search(r'\{[\s\S]*\}', json_str)
+    if json_match:
+        json_str = json_match.group(0)
+
+    def repair_json(json_string):
+        json_string = re.sub(r',(\s*[}\]])', r'\1', json_string)
+        json_string = re.sub(r'([,{[])\s*,', r'\1', json_string)
+        json_string = re.sub(r':\s*"([^"]*?)(?:\n|$)', r': "\1"', json_string)
+        json_string = re.sub(r"'([^']*?)':", r'"\1":', json_string)
+        json_string = re.sub(r":\s*'([^']*?)'", r': "\1"', json_string)
+        return json_string
+
+    try:
+        data = json.loads(json_str)
+    except json.JSONDecodeError:
+        try:
+            data = json.loads(repair_json(json_str))
+        except json.JSONDecodeError:
+            json_match = re.search(r'\{[\s\S]{0,50000}\}', json_str)
+            if not json_match:
+                raise Exception("Could not find JSON object in response")
+            data = json.loads(json_match.group(0))
+
+    if isinstance(data, list):
+        data = data[0]
+    return data
+
+
+def sample_response(departments: int) -> str:
+    """A realistic well-formed extraction with `departments` department entries."""
+    return json.dumps({
+        "universityName": "University of Dhaka",
+        "circularLink": "https://admission.eis.du.ac.bd/circular.pdf",
+        "websiteId": "admission.eis.du.ac.bd",
+        "applicationPeriod": {"start": "20-11-2025", "end": "07-12-2025"},
+        "examDate": "16-01-2026, 17-01-2026",
+        "generalGpaRequirements": {"ssc": 3.0, "hsc": 3.0, "total": 7.0, "with4thSubject": True},
+        "yearRequirements": {"sscYears": ["2021", "2022"], "hscYears": ["2023", "2024"]},
+        "departmentWiseRequirements": [
+            {
+                "departmentName": f"Department {i} (বিজ্ঞান ইউনিট)",
+                "departmentCode": f"D{i:03d}",
+                "minGpaSSC": 3.5,
+                "minGpaHSC": 3.5,
+                "minGpaTotal": 8.0,
+                "requiredSubjects": ["Physics", "Chemistry", "Mathematics"],
+                "specialConditions": "Minimum GPA 3.5 in Mathematics",
+                "seatsTotal": 120,
+                "admissionTestSubjects": ["Physics", "Chemistry", "Mathematics", "Biology"],
+                "admissionTestFormat": "MCQ and Written",
+            }
+            for i in range(departments)
+        ],
+        "applicationFee": "A Unit: 1320, B Unit: 1100, C Unit: 1100",
+        "rawSummary": "Admission test for the 2025-26 session. Applicants need GPA 3.0 in SSC and HSC.",
+        "requiredDocuments": ["SSC transcript", "HSC transcript", "Photo"],
+    }, ensure_ascii=False, indent=2)
+
+
+def _trailing_commas(text: str) -> str:
+    return re.sub(r'(["\d\]}e])(\s*\n\s*[}\]])', r'\1,\2', text)
+
+
+def _single_quotes(text: str) -> str:
+    return re.sub(r'"([A-Za-z]+)":', r"'\1':", text)
+
+
+def _raw_newlines(text: str) -> str:
+    return text.replace('Applicants need', 'Applicants\nneed').replace('Minimum GPA', 'Minimum\nGPA')
+
+
+def _stray_quotes(text: str) -> str:
+    return text.replace('MCQ and Written', 'MCQ and "Written" parts')
+
+
+def _python_literals(text: str) -> str:
+    return text.replace('true', 'True').replace('false', 'False').replace('null', 'None')
+
+
+def _doubled_commas(text: str) -> str:
+    return text.replace('",\n', '",,\n', 5)
+
+
+MUTATIONS = {
+    'valid': lambda text: text,
+    'fenced': lambda text: f"```json\n{text}\n```",
+    'prose': lambda text: f"Here is the extracted data:\n{text}\nLet me know if you need more.",
+    'trailing_commas': _trailing_commas,
+    'doubled_commas': _doubled_commas,
+    'single_quotes': _single_quotes,
+    'raw_newlines': _raw_newlines,
+    'stray_quotes': _stray_quotes,
+    'python_literals': _python_literals,
+    'truncated_90': lambda text: text[:int(len(text) * 0.9)],
+    'truncated_50': lambda text: text[:int(len(text) * 0.5)],
+}
+
+
+def load_base_responses(args) -> list:
+    responses = []
+    if args.corpus:
+        for path in sorted(glob.glob(os.path.join(args.corpus, '*.txt')) + glob.glob(os.path.join(args.corpus, '*.json'))):
+            with open(path, encoding='utf-8') as corpus_file:
+                responses.append(corpus_file.read())
+    if args.from_db:
+        from sqlalchemy import text
+        from app.core.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                text("SELECT raw_response FROM admission_circulars WHERE raw_response IS NOT NULL LIMIT :limit"),
+                {'limit': args.from_db}
+            ).fetchall()
+            responses.extend(row.raw_response for row in rows)
+        finally:
+            db.close()
+    if not responses:
+        responses.append(sample_response(args.departments))
+    return responses
+
+
+def recovered(parse, text: str) -> bool:
+    try:
+        data = parse(text)
+    except Exception:
+        return False
+    return isinstance(data, dict) and bool(data.get('universityName'))
+
+
+def time_parser(parse, corpus: list, repeat: int) -> float:
+    """Mean seconds to run `parse` over the whole corpus (failures included)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            try:
+                parse(text)
+            except Exception:
+                pass
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="Directory of recorded raw model responses (*.txt, *.json)")
+    parser.add_argument("--from-db", type=int, default=0, help="Also load up to N raw responses from admission_circulars")
+    parser.add_argument("--departments", type=int, default=40, help="Departments in the built-in sample response")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    args = parser.parse_args()
+
+    base = load_base_responses(args)
+
+    print("=" * 72)
+    print(f"JSON Parser Benchmark ({len(base)} base responses, {len(MUTATIONS)} damage types)")
+    print("=" * 72)
+    print(f"{'damage':<16} {'legacy ok':>10} {'tolerant ok':>12} {'legacy (ms)':>12} {'tolerant (ms)':>14}")
+
+    totals = {'legacy': [0, 0.0], 'tolerant': [0, 0.0]}
+    for name, mutate in MUTATIONS.items():
+        corpus = [mutate(text) for text in base]
+        legacy_ok = sum(recovered(legacy_parse, text) for text in corpus)
+        tolerant_ok = sum(recovered(parse_tolerant_json, text) for text in corpus)
+        legacy_time = time_parser(legacy_parse, corpus, args.repeat)
+        tolerant_time = time_parser(parse_tolerant_json, corpus, args.repeat)
+        totals['legacy'][0] += legacy_ok
+        totals['legacy'][1] += legacy_time
+        totals['tolerant'][0] += tolerant_ok
+        totals['tolerant'][1] += tolerant_time
+        print(f"{name:<16} {legacy_ok:>6}/{len(corpus):<3} {tolerant_ok:>8}/{len(corpus):<3} "
+              f"{legacy_time * 1000:>12.2f} {tolerant_time * 1000:>14.2f}")
+
+    cases = len(base) * len(MUTATIONS)
+    print("-" * 72)
+    for name, (ok, seconds) in totals.items():
+        print(f"{name:<10} recovery {ok}/{cases} ({ok / cases:.0%}), total parse time {seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
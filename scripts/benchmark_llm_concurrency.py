@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark how wall-clock job time scales with analysis concurrency.
+
+Simulates a job of N URLs whose extraction is a blocking SDK call with a fixed
+latency, scheduled the same way `process_job` does (semaphore + gather).
+Compares calling the SDK directly on the event loop (old behaviour) with
+running it through the LLM thread pool.
+
+Usage:
+    python scripts/benchmark_llm_concurrency.py [--urls 20] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# No real Gemini calls are made, but settings require a key
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from app.modules.requirement_analyzer.llm_client import run_blocking
+
+
+def fake_generate_content(latency: float) -> str:
+    """Stand-in for a blocking `model.generate_content` call."""
+    time.sleep(latency)
+    return "{}"
+
+
+async def run_job(urls: int, concurrency: int, latency: float, use_thread_pool: bool) -> float:
+    """Process `urls` fake extractions with `concurrency` slots and return wall-clock seconds."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def extract() -> None:
+        async with semaphore:
+            if use_thread_pool:
+                await run_blocking(fake_generate_content, latency)
+            else:
+                fake_generate_content(latency)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[extract() for _ in range(urls)])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=20, help="URLs per job")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per extraction")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 5, 10], help="Slot counts to test")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"LLM Concurrency Benchmark ({args.urls} URLs, {args.latency}s per extraction)")
+    print("=" * 60)
+    print(f"{'slots':>6} {'blocking (s)':>14} {'thread pool (s)':>16} {'speedup':>9}")
+
+    for concurrency in args.concurrency:
+        blocking = asyncio.run(run_job(args.urls, concurrency, args.latency, use_thread_pool=False))
+        pooled = asyncio.run(run_job(args.urls, concurrency, args.latency, use_thread_pool=True))
+        print(f"{concurrency:>6} {blocking:>14.2f} {pooled:>16.2f} {blocking / pooled:>8.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Check normalization of parsed circular data against known model outputs.
+
+Each case feeds `normalize_circular` a piece of model output with the usual
+problems (nulls, scalars for lists, Bangla numerals, free-form years and GPA
+values) and compares the normalized fields with the expected values.
+
+Usage:
+    python scripts/check_normalizer.py
+"""
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault("GEMINI_API_KEY", "check")
+
+from app.modules.requirement_analyzer.normalizer import normalize_circular
+
+URL = "https://admission.eis.du.ac.bd/circular.pdf"
+
+# (description, model output, field path -> expected value)
+CASES = [
+    (
+        "missing and null nested objects",
+        {"applicationPeriod": None, "generalGpaRequirements": "n/a"},
+        {
+            "applicationPeriod.start": None,
+            "generalGpaRequirements.total": None,
+            "yearRequirements.sscYears": [],
+            "departmentWiseRequirements": [],
+            "requiredDocuments": [],
+        },
+    ),
+    (
+        "scalars and stray items in lists",
+        {
+            "requiredDocuments": "Photo",
+            "departmentWiseRequirements": [
+                "see annex",
+                {"departmentName": "CSE", "requiredSubjects": ["Physics", ["Math"], 101, None]},
+            ],
+        },
+        {
+            "requiredDocuments": [],
+            "departmentWiseRequirements.0.requiredSubjects": ["Physics", "101"],
+        },
+    ),
+    (
+        "Bangla numerals in text and counts",
+        {
+            "applicationFee": "১৩২০ টাকা",
+            "quotaTribal": "১,২০০",
+            "departmentWiseRequirements": [{"departmentName": "গণিত", "seatsTotal": "১২০ টি"}],
+        },
+        {
+            "applicationFee": "1320 টাকা",
+            "quotaTribal": 1200,
+            "departmentWiseRequirements.0.seatsTotal": 120,
+        },
+    ),
+    (
+        "passing years",
+        {"yearRequirements": {"sscYears": "২০২১-২০২৩", "hscYears": ["2023/24", 2025]}},
+        {
+            "yearRequirements.sscYears": ["2021", "2022", "2023"],
+            "yearRequirements.hscYears": ["2023", "2024", "2025"],
+        },
+    ),
+    (
+        "GPA values",
+        {
+            "generalGpaRequirements": {"ssc": "৩.৫০", "hsc": "GPA 3.00 (out of 5)", "total": 7},
+            "departmentWiseRequirements": [
+                {"departmentName": "CSE", "minGpaTotal": "8.00 - 9.00"},
+                {"departmentName": "EEE", "minGpaTotal": "Total 8.00 (with 4th subject)"},
+                {"departmentName": "গণিত", "minGpaTotal": "৪র্থ বিষয়সহ ৭.৫০"},
+            ],
+        },
+        {
+            "generalGpaRequirements.ssc": 3.5,
+            "generalGpaRequirements.hsc": 3.0,
+            "generalGpaRequirements.total": 7.0,
+            "departmentWiseRequirements.0.minGpaTotal": 8.0,
+            "departmentWiseRequirements.1.minGpaTotal": 8.0,
+            "departmentWiseRequirements.2.minGpaTotal": 7.5,
+        },
+    ),
+]
+
+
+def field(data: dict, path: str):
+    value = data
+    for key in path.split('.'):
+        value = value[int(key)] if isinstance(value, list) else value[key]
+    return value
+
+
+def main():
+    print("=" * 60)
+    print("Normalizer Checks")
+    print("=" * 60)
+
+    failures = 0
+    for description, output, expected in CASES:
+        data = {"universityName": "University of Dhaka", "websiteId": "du.ac.bd", **output}
+        normalized = normalize_circular(data, URL).model_dump()
+        mismatches = [
+            (path, field(normalized, path), value)
+            for path, value in expected.items() if field(normalized, path) != value
+        ]
+        if not mismatches:
+            print(f"  ✅ {description}")
+        for path, actual, value in mismatches:
+            print(f"  ❌ {description}: {path} = {actual!r}, expected {value!r}")
+        failures += len(mismatches)
+
+    print()
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        return 1
+    print("✅ All normalization checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
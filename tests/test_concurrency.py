@@ -0,0 +1,159 @@
+"""
+Tests for the adaptive (AIMD) extraction limiter and the download semaphore.
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.modules.requirement_analyzer import services
+from app.modules.requirement_analyzer.concurrency import (
+    OUTCOME_ERROR, OUTCOME_OK, OUTCOME_OVERLOAD, AdaptiveLimiter, get_fetch_semaphore, is_overload_error
+)
+from app.modules.requirement_analyzer.schemas import AdmissionCircularData
+
+
+def make_limiter(**overrides) -> AdaptiveLimiter:
+    options = dict(initial_limit=4, min_limit=1, max_limit=8, window_size=5)
+    options.update(overrides)
+    return AdaptiveLimiter(**options)
+
+
+def run_window(limiter: AdaptiveLimiter, latency: float, outcome: str = OUTCOME_OK, saturated: bool = True) -> None:
+    """Complete one window of extractions with the given latency."""
+    for _ in range(limiter.window_size):
+        limiter._take_slot()
+        # Saturated: other extractions were waiting for a slot
+        limiter._window_saturated = saturated
+        limiter.release(latency, outcome)
+
+
+def test_grows_by_one_when_saturated_and_healthy():
+    limiter = make_limiter()
+    run_window(limiter, 10.0)
+    assert limiter.limit == 5
+    run_window(limiter, 10.0)
+    assert limiter.limit == 6
+
+
+def test_does_not_grow_below_the_limit():
+    limiter = make_limiter()
+    run_window(limiter, 10.0, saturated=False)
+    assert limiter.limit == 4
+
+
+def test_cuts_on_latency_spike_and_errors():
+    limiter = make_limiter()
+    run_window(limiter, 10.0)
+    run_window(limiter, 30.0)
+    assert limiter.limit == pytest.approx(5 * 0.7)
+
+    limiter = make_limiter()
+    run_window(limiter, 10.0, OUTCOME_ERROR)
+    assert limiter.limit == pytest.approx(4 * 0.7)
+
+
+def test_fast_window_does_not_collapse_the_baseline():
+    # A burst of fast completions (e.g. tiny documents) must not make every
+    # normal extraction after it look like a latency spike
+    limiter = make_limiter()
+    run_window(limiter, 10.0)
+    run_window(limiter, 0.02)
+    assert limiter.baseline_p95 > 8.0
+    run_window(limiter, 10.0)
+    assert limiter.limit == 7
+
+
+def test_overload_cuts_once_per_cooldown():
+    limiter = make_limiter(overload_cooldown_seconds=60.0)
+    for _ in range(3):
+        limiter._take_slot()
+        limiter.release(1.0, OUTCOME_OVERLOAD)
+    assert limiter.limit == pytest.approx(4 * 0.7)
+    assert limiter.overloads == 3
+
+
+def test_limit_stays_within_bounds():
+    limiter = make_limiter(initial_limit=2, min_limit=2, max_limit=3, overload_cooldown_seconds=0.0)
+    for _ in range(5):
+        run_window(limiter, 10.0)
+    assert limiter.limit == 3
+    for _ in range(5):
+        limiter._take_slot()
+        limiter.release(1.0, OUTCOME_OVERLOAD)
+    assert limiter.limit == 2
+
+
+def test_waiters_are_served_in_order():
+    async def main():
+        limiter = make_limiter(initial_limit=1)
+        order = []
+
+        async def worker(name):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(worker(name) for name in "abc"))
+        return order, limiter.in_flight, limiter.completed
+
+    assert asyncio.run(main()) == (["a", "b", "c"], 0, 3)
+
+
+def test_slot_records_overload_errors():
+    class RateLimited(Exception):
+        code = 429
+
+    async def main():
+        limiter = make_limiter()
+        with pytest.raises(RateLimited):
+            async with limiter.slot():
+                raise RateLimited()
+        return limiter
+
+    limiter = asyncio.run(main())
+    assert limiter.overloads == 1 and limiter.failed == 1 and limiter.in_flight == 0
+
+
+def test_is_overload_error():
+    assert is_overload_error(asyncio.TimeoutError())
+    assert is_overload_error(SimpleNamespace(code=503))
+    assert not is_overload_error(ValueError("quota of 429 seats"))
+    assert not is_overload_error(SimpleNamespace(status_code=400))
+
+
+def test_fetch_semaphore_is_created_per_event_loop():
+    async def semaphore():
+        async with get_fetch_semaphore():
+            return get_fetch_semaphore()
+
+    first = asyncio.run(semaphore())
+    second = asyncio.run(semaphore())
+    assert first is not second
+
+
+def test_cache_hits_do_not_take_a_limiter_slot(monkeypatch):
+    limiter = make_limiter()
+    monkeypatch.setattr(services, 'analysis_limiter', limiter)
+    monkeypatch.setattr(services, 'get_extraction_backend', lambda: SimpleNamespace(model_name="test-model"))
+    data = AdmissionCircularData(
+        universityName="DU", circularLink="", websiteId="du.ac.bd",
+        applicationPeriod={}, generalGpaRequirements={},
+        yearRequirements={"sscYears": [], "hscYears": []}, departmentWiseRequirements=[],
+    )
+    cached = {}
+    monkeypatch.setattr(services.extraction_cache, 'get', lambda *key: cached.get(key))
+    monkeypatch.setattr(services.extraction_cache, 'put', lambda *args: cached.setdefault(args[:3], (args[3], args[4])))
+
+    async def extract(*args):
+        return data.model_copy(), "raw"
+
+    monkeypatch.setattr(services, '_extract_circular', extract)
+
+    url = "https://du.ac.bd/circular"
+    asyncio.run(services.analyze_circular(url))
+    assert limiter.completed == 1
+    metrics = {}
+    asyncio.run(services.analyze_circular(url, metrics=metrics))
+    assert metrics['cacheHit'] is True
+    assert limiter.completed == 1
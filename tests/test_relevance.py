@@ -0,0 +1,49 @@
+"""
+Tests for keyword-based page filtering of circular PDFs.
+"""
+from app.core.config import settings
+from app.modules.requirement_analyzer.relevance import score_page, select_dropped_pages
+
+REQUIREMENTS = "Minimum GPA 3.50 in SSC and HSC. Unit A: 120 seats. Passing year 2023 or 2024."
+PAYMENT = "Pay the application fee via bKash or Rocket. Enter the transaction ID and PIN number."
+TABLE = "Physics 4.00 Chemistry 4.00 Mathematics 4.50 CSE 60 EEE 45 ME 40"
+
+
+def test_score_page_counts_requirement_and_boilerplate_hits():
+    relevant, boilerplate = score_page(REQUIREMENTS)
+    assert relevant >= settings.page_filter_min_hits
+    assert boilerplate == 0
+    assert score_page(PAYMENT)[1] >= 3
+
+
+def test_short_boilerplate_terms_match_whole_words_only():
+    assert score_page("Seats are assigned by merit; see the course mapping and the designed routes")[1] == 1
+    assert score_page("Send an SMS and check the map")[1] == 2
+
+
+def test_bangla_keywords():
+    relevant, boilerplate = score_page("ভর্তি পরীক্ষার জন্য ন্যূনতম জিপিএ ৩.৫০")
+    assert relevant >= 3
+    assert score_page("বিকাশ বা রকেটের মাধ্যমে পেমেন্ট করুন")[1] == 3
+
+
+def test_drops_boilerplate_pages():
+    pages = [PAYMENT, REQUIREMENTS, PAYMENT]
+    assert select_dropped_pages(pages, [0, 1, 2]) == [2]
+
+
+def test_keeps_first_page_and_pages_without_hits():
+    # The first page and a continuation of a GPA/seat table are never dropped
+    pages = [PAYMENT, TABLE]
+    assert score_page(TABLE) == (0, 0)
+    assert select_dropped_pages(pages, [0, 1]) == []
+
+
+def test_keeps_pages_without_text():
+    # Only text pages are scored; scanned pages are not in `text_pages`
+    assert select_dropped_pages([REQUIREMENTS, "", PAYMENT], [0, 2]) == [2]
+
+
+def test_extra_keywords(monkeypatch):
+    monkeypatch.setattr(settings, 'page_filter_extra_boilerplate', 'campus tour, cafeteria')
+    assert score_page("Campus tour and cafeteria hours")[1] == 2
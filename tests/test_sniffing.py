@@ -0,0 +1,70 @@
+"""
+Tests for content type sniffing of fetched circular URLs.
+"""
+import asyncio
+
+import pytest
+
+from app.modules.requirement_analyzer.sniffing import SNIFF_BYTES, read_head, resolve_mime_type, sniff_mime_type
+
+
+@pytest.mark.parametrize("head, expected", [
+    (b'%PDF-1.7\n%\xe2\xe3\xcf\xd3', 'application/pdf'),
+    (b'\r\n\r\n%PDF-1.4', 'application/pdf'),  # Junk before the header
+    (b'\x89PNG\r\n\x1a\n\x00\x00', 'image/png'),
+    (b'\xff\xd8\xff\xe0\x00\x10JFIF', 'image/jpeg'),
+    (b'GIF89a\x01\x00', 'image/gif'),
+    (b'RIFF\x24\x00\x00\x00WEBPVP8 ', 'image/webp'),
+    (b'II*\x00\x08\x00', 'image/tiff'),
+    (b'\xef\xbb\xbf  <!DOCTYPE html><html>', 'text/html'),
+    (b'\n<HTML><head>', 'text/html'),
+    (b'PK\x03\x04', None),
+    (b'', None),
+])
+def test_sniff_mime_type(head, expected):
+    assert sniff_mime_type(head) == expected
+
+
+def test_pdf_header_must_be_near_the_start():
+    assert sniff_mime_type(b' ' * SNIFF_BYTES + b'%PDF-1.7') is None
+
+
+@pytest.mark.parametrize("declared, detected, expected", [
+    # Recognized bytes win over the declared type
+    ('application/octet-stream', 'application/pdf', 'application/pdf'),
+    ('text/html', 'application/pdf', 'application/pdf'),
+    ('application/pdf', 'text/html', 'text/html'),
+    # Unrecognized bytes: images and HTML pages by declared type
+    ('image/bmp', None, 'image/bmp'),
+    ('application/xhtml+xml', None, 'text/html'),
+    # A PDF needs its magic bytes
+    ('application/pdf', None, None),
+    ('application/octet-stream', None, None),
+])
+def test_resolve_mime_type(declared, detected, expected):
+    assert resolve_mime_type(declared, detected) == expected
+
+
+def test_junk_declared_as_pdf_is_not_a_document():
+    head = b'<error>Access denied</error>'
+    assert resolve_mime_type('application/pdf', sniff_mime_type(head)) is None
+
+
+def test_read_head_stops_after_sniff_bytes():
+    consumed = []
+
+    async def chunks():
+        for chunk in (b'%PDF-', b'x' * SNIFF_BYTES, b'never read'):
+            consumed.append(chunk)
+            yield chunk
+
+    head = asyncio.run(read_head(chunks()))
+    assert head.startswith(b'%PDF-') and len(head) == SNIFF_BYTES + 5
+    assert len(consumed) == 2
+
+
+def test_read_head_of_short_body():
+    async def chunks():
+        yield b'%PDF'
+
+    assert asyncio.run(read_head(chunks())) == b'%PDF'
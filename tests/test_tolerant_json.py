@@ -0,0 +1,89 @@
+"""
+Tests for the fault-tolerant JSON decoder used on model responses.
+"""
+import json
+
+import pytest
+
+from app.modules.requirement_analyzer.tolerant_json import JsonParseError, parse_tolerant_json
+
+CIRCULAR = {
+    "universityName": "University of Dhaka",
+    "applicationPeriod": {"start": "20-11-2025", "end": None},
+    "generalGpaRequirements": {"ssc": 3.5, "with4thSubject": True},
+    "departmentWiseRequirements": [
+        {"departmentName": "CSE", "requiredSubjects": ["Physics", "Math"], "seatsTotal": 120},
+        {"departmentName": "EEE", "requiredSubjects": [], "seatsTotal": 60},
+    ],
+    "rawSummary": "Applicants need GPA 3.5",
+}
+PRETTY = json.dumps(CIRCULAR, indent=2)
+
+
+@pytest.mark.parametrize("text", [
+    PRETTY,
+    f"```json\n{PRETTY}\n```",
+    f"Here is the extracted data:\n{PRETTY}\nLet me know if you need more.",
+])
+def test_valid_json_with_fences_or_prose(text):
+    assert parse_tolerant_json(text) == CIRCULAR
+
+
+@pytest.mark.parametrize("text", [
+    # Trailing commas
+    PRETTY.replace('120\n', '120,\n').replace('"Math"\n', '"Math",\n'),
+    # Doubled and leading commas
+    PRETTY.replace('"CSE",', '"CSE",,').replace('[\n    {', '[\n    ,{'),
+    # Single quotes
+    PRETTY.replace('"universityName"', "'universityName'").replace('"CSE"', "'CSE'"),
+    # Python literals
+    PRETTY.replace('true', 'True').replace('null', 'None'),
+])
+def test_repairs_common_damage(text):
+    assert parse_tolerant_json(text) == CIRCULAR
+
+
+def test_keeps_raw_newlines_in_strings():
+    text = PRETTY.replace('Applicants need', 'Applicants\nneed')
+    assert parse_tolerant_json(text)['rawSummary'] == "Applicants\nneed GPA 3.5"
+
+
+def test_keeps_stray_quotes_in_strings():
+    text = '{"universityName": "DU", "admissionTestFormat": "MCQ and "Written" parts", "seats": 1}'
+    data = parse_tolerant_json(text)
+    assert data['admissionTestFormat'] == 'MCQ and "Written" parts'
+    assert data['seats'] == 1
+
+
+def test_comma_repair_does_not_change_strings():
+    text = '{"note": "Units A, ]B", "subjects": ["Physics",], "apostrophe": "Master\'s",}'
+    assert parse_tolerant_json(text) == {
+        "note": "Units A, ]B", "subjects": ["Physics"], "apostrophe": "Master's",
+    }
+
+
+def test_single_quote_repair_keeps_apostrophes():
+    text = "{'universityName': \"Bachelor's program\", 'units': ['A', 'B']}"
+    assert parse_tolerant_json(text) == {"universityName": "Bachelor's program", "units": ["A", "B"]}
+
+
+def test_unterminated_string_before_next_key():
+    text = '{"rawSummary": "never closed\n  "universityName": "DU"}'
+    assert parse_tolerant_json(text) == {"rawSummary": "never closed", "universityName": "DU"}
+
+
+def test_truncated_response_keeps_complete_part():
+    text = PRETTY[:PRETTY.index('"EEE"') + 12]
+    data = parse_tolerant_json(text)
+    assert data['universityName'] == "University of Dhaka"
+    # The half-written last department is dropped
+    assert [department['departmentName'] for department in data['departmentWiseRequirements']] == ["CSE"]
+
+
+def test_truncated_inside_string():
+    assert parse_tolerant_json('{"universityName": "University of Dh') == {"universityName": "University of Dh"}
+
+
+def test_no_json_raises():
+    with pytest.raises(JsonParseError):
+        parse_tolerant_json("The circular could not be read.")